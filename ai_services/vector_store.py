@@ -8,6 +8,17 @@ from pathlib import Path
 import json
 from typing import List, Dict, Any
 import os
+import sys
+
+# The rule pack reader lives with the rule engine
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rule_engine"))
+
+try:
+    from rule_pack import load_rules
+    RULE_PACK_SUPPORT = True
+except ImportError:
+    RULE_PACK_SUPPORT = False
+    print("Warning: rule_pack not available. Reading rules from JSON files.")
 
 class RuleVectorStore:
     """Vector store for UDCPR rules."""
@@ -28,6 +39,20 @@ class RuleVectorStore:
         
         print(f"Vector store initialized: {self.collection.count()} rules indexed")
     
+    def _load_rules(self, rules_dir: Path) -> List[Dict[str, Any]]:
+        """Approved rules from the rule pack (or JSON files)."""
+        if RULE_PACK_SUPPORT:
+            return load_rules(rules_dir)
+        
+        rules = []
+        for rule_file in sorted(rules_dir.glob("*.json")):
+            try:
+                with open(rule_file, 'r', encoding='utf-8') as f:
+                    rules.append(json.load(f))
+            except Exception as e:
+                print(f"  ⚠️  Error processing {rule_file.name}: {e}")
+        return rules
+    
     def index_rules(self, rules_directory: str):
         """Index all rules from approved_rules directory."""
         rules_dir = Path(rules_directory)
@@ -36,22 +61,19 @@ class RuleVectorStore:
             print(f"❌ Rules directory not found: {rules_directory}")
             return
         
-        rule_files = list(rules_dir.glob("*.json"))
-        print(f"\nIndexing {len(rule_files)} rules...")
+        rules = self._load_rules(rules_dir)
+        print(f"\nIndexing {len(rules)} rules...")
         
         # Prepare data for batch insertion
         documents = []
         metadatas = []
         ids = []
         
-        for i, rule_file in enumerate(rule_files):
+        for i, rule in enumerate(rules):
             if i % 100 == 0:
-                print(f"  Processing {i}/{len(rule_files)}...")
+                print(f"  Processing {i}/{len(rules)}...")
             
             try:
-                with open(rule_file, 'r', encoding='utf-8') as f:
-                    rule = json.load(f)
-                
                 # Create searchable document text
                 doc_text = self._create_document_text(rule)
                 
@@ -70,7 +92,7 @@ class RuleVectorStore:
                 ids.append(rule.get("rule_id", f"rule_{i}"))
                 
             except Exception as e:
-                print(f"  ⚠️  Error processing {rule_file.name}: {e}")
+                print(f"  ⚠️  Error processing {rule.get('rule_id', f'rule_{i}')}: {e}")
                 continue
         
         # Batch insert into ChromaDB
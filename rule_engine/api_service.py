@@ -2,13 +2,16 @@
 FastAPI service to expose rule engine as REST API.
 This allows the Node.js backend to call the Python rule engine.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, Optional, List
 import uvicorn
 
 from rule_engine import RuleEngine, ProjectInput, EvaluationResult
+from evaluation_context import TraceLevel
+from response_encoding import encode_response
 
 app = FastAPI(title="UDCPR Rule Engine API", version="2.0")
 
@@ -21,9 +24,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize rule engine
+# Initialize rule engine. Evaluations keep their state in a per-call
+# EvaluationContext, so this one instance is shared by all worker threads.
 rule_engine = RuleEngine(rules_db={})
 
+class SweepRequest(BaseModel):
+    """Fixed plot plus the design values to sweep over."""
+    project: ProjectInput
+    proposed_floors: List[int]
+    proposed_height_m: List[float]
+    proposed_built_up_sqm: List[float]
+
+class DeltaRequest(BaseModel):
+    """Previously evaluated project, its /evaluate result and the changed fields."""
+    project: ProjectInput
+    previous: EvaluationResult
+    changes: Dict[str, Any]
+
+def encoded_result(result: EvaluationResult, accept: Optional[str]) -> Response:
+    """Encode an EvaluationResult as JSON (or MessagePack if accepted) in one pass."""
+    content, media_type = encode_response(result, accept)
+    return Response(content=content, media_type=media_type)
+
 @app.get("/")
 def root():
     """Health check endpoint."""
@@ -38,11 +60,16 @@ def health():
     """Health check endpoint."""
     return {"status": "healthy"}
 
-@app.post("/evaluate", response_model=dict)
-def evaluate_project(project: ProjectInput):
+@app.post("/evaluate", response_model=EvaluationResult)
+def evaluate_project(project: ProjectInput, trace_level: TraceLevel = TraceLevel.FULL,
+                     include_timings: bool = False, accept: Optional[str] = Header(None)):
     """
     Evaluate a project against UDCPR rules.
     
+    Pass trace_level=summary or trace_level=off to shrink or drop the
+    calculation traces when only the compliance status is needed, and
+    include_timings=true to get per-phase milliseconds in phase_timings_ms.
+    
     Returns comprehensive evaluation including:
     - FSI calculations with bonuses
     - Setback requirements
@@ -51,36 +78,56 @@ def evaluate_project(project: ProjectInput):
     - TDR analysis
     - Compliance status
     - Calculation traces
+    
+    Send Accept: application/msgpack for a MessagePack body instead of JSON.
     """
     try:
-        result = rule_engine.evaluate_project(project)
+        result = rule_engine.evaluate_project(project, trace_level=trace_level,
+                                              include_timings=include_timings)
         
-        # Convert to dict for JSON serialization
-        return {
-            "project_id": result.project_id,
-            "rule_version": result.rule_version,
-            "evaluated_at": result.evaluated_at.isoformat(),
-            "fsi_result": result.fsi_result,
-            "setback_result": result.setback_result,
-            "parking_result": result.parking_result,
-            "height_result": result.height_result,
-            "tdr_result": result.tdr_result,
-            "compliant": result.compliant,
-            "violations": result.violations,
-            "warnings": result.warnings,
-            "calculation_traces": [
-                {
-                    "step_id": trace.step_id,
-                    "description": trace.description,
-                    "rule_ids": trace.rule_ids,
-                    "inputs": trace.inputs,
-                    "formula": trace.formula,
-                    "result": trace.result,
-                    "units": trace.units
-                }
-                for trace in result.calculation_traces
-            ]
-        }
+        # Serialize straight to bytes, skipping FastAPI's response re-encoding
+        return encoded_result(result, accept)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/evaluate/delta", response_model=EvaluationResult)
+def evaluate_delta(request: DeltaRequest, trace_level: TraceLevel = TraceLevel.FULL,
+                   include_timings: bool = False, accept: Optional[str] = Header(None)):
+    """
+    Re-evaluate a project after a what-if change.
+    
+    Send the project, the /evaluate response for it and the changed fields;
+    only the modules affected by the change are recomputed. Use the same
+    trace_level as the previous evaluation.
+    """
+    try:
+        result = rule_engine.evaluate_delta(
+            request.project, request.previous, request.changes,
+            trace_level=trace_level, include_timings=include_timings
+        )
+        return encoded_result(result, accept)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/sweep")
+def sweep_envelope(request: SweepRequest):
+    """
+    Find the maximum compliant envelope for a plot.
+    
+    Evaluates every combination of the requested floors, heights and
+    built-up areas in one pass and returns the compliance frontier.
+    """
+    try:
+        return rule_engine.sweep_envelope(
+            request.project,
+            request.proposed_floors,
+            request.proposed_height_m,
+            request.proposed_built_up_sqm
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -145,6 +192,54 @@ def get_rules_info():
         ]
     }
 
+@app.get("/rules/decision-tables")
+def get_decision_tables():
+    """Get the per-jurisdiction decision tables currently in use."""
+    return rule_engine.decision_tables.spec
+
+@app.put("/rules/decision-tables")
+def update_decision_tables(spec: Dict[str, Dict[str, Any]]):
+    """
+    Replace the decision tables without a restart.
+    
+    Entries override the UDCPR defaults key by key, so only the changed
+    jurisdictions and tables need to be sent.
+    """
+    try:
+        rule_engine.load_decision_tables(spec)
+        return rule_engine.decision_tables.spec
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/metrics")
+def get_metrics(format: str = "json"):
+    """
+    Get per-phase evaluation latency histograms.
+    
+    Phases are the calculation modules (fsi, setbacks, parking, height,
+    tdr), compliance, total, delta_total and cache_hit. Pass format=prometheus
+    for the Prometheus text exposition format.
+    """
+    if format == "prometheus":
+        return PlainTextResponse(rule_engine.metrics.to_prometheus())
+    if format != "json":
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'prometheus'")
+    return {
+        "phases": rule_engine.metrics.snapshot(),
+        "cache": rule_engine.cache.stats()
+    }
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Get evaluation cache size, hit/miss counters and hit rate."""
+    return rule_engine.cache.stats()
+
+@app.delete("/cache")
+def clear_cache():
+    """Drop every cached evaluation."""
+    rule_engine.cache.clear()
+    return rule_engine.cache.stats()
+
 if __name__ == "__main__":
     print("Starting UDCPR Rule Engine API...")
     print("Access at: http://localhost:5001")
@@ -0,0 +1,66 @@
+"""
+Bonus Table - FSI bonus applicability precomputed for every project condition set
+
+get_all_fsi_bonuses used to scan every bonus rule on every evaluation and
+append one bonus per matching rule, so a TOD project received 0.5 FSI once
+for each clause that mentions TOD. Which rules cite each bonus depends only on
+their text, and a project has five boolean conditions, so BonusTable
+computes at load time the bonus list for all 32 combinations: one entry per
+bonus type, citing every matching rule. An evaluation is one dict lookup that
+returns shared read-only records, so nothing is copied or allocated per call.
+"""
+import itertools
+import re
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+
+_NUMBER = re.compile(r'\d')
+
+# (project condition, bonus type, FSI bonus, which clause texts cite it), in result order
+BONUS_TYPES: Tuple[Tuple[str, str, float, Callable[[str], bool]], ...] = (
+    ('tod_zone', 'TOD Zone', 0.5, lambda text: 'tod' in text and bool(_NUMBER.search(text))),
+    ('redevelopment', 'Redevelopment', 0.3, lambda text: 'redevelopment' in text),
+    ('slum_rehab', 'Slum Rehabilitation', 1.0, lambda text: 'slum' in text or 'sra' in text),
+    ('green_building', 'Green Building', 0.5, lambda text: 'green' in text),
+    ('affordable_housing', 'Affordable Housing', 0.75, lambda text: 'affordable' in text)
+)
+BONUS_CONDITIONS = tuple(condition for condition, _, _, _ in BONUS_TYPES)
+
+class BonusTable:
+    """Applicable FSI bonuses for each combination of the five project conditions"""
+
+    def __init__(self, bonus_rules: Iterable[Mapping[str, Any]]):
+        """bonus_rules: the candidate bonus rules, in load order"""
+        cited: Dict[str, List[Mapping[str, Any]]] = {condition: [] for condition in BONUS_CONDITIONS}
+        texts: Dict[str, str] = {}
+        for rule in bonus_rules:
+            text = rule.get('clause_text', '').lower()
+            for condition, _, _, cites in BONUS_TYPES:
+                if cites(text):
+                    if not cited[condition]:
+                        texts[condition] = text
+                    cited[condition].append(rule)
+
+        # One read-only bonus per type: the first citing rule is the headline citation
+        self.bonuses: Dict[str, Mapping[str, Any]] = {}
+        for condition, bonus_type, value, _ in BONUS_TYPES:
+            rules = cited[condition]
+            if rules:
+                self.bonuses[condition] = MappingProxyType({
+                    'type': bonus_type,
+                    'value': value,
+                    'rule_id': rules[0]['rule_id'],
+                    'rule_ids': tuple(rule['rule_id'] for rule in rules),
+                    'rule_text': texts[condition][:200]
+                })
+
+        self.combinations: Dict[Tuple[bool, ...], Tuple[Mapping[str, Any], ...]] = {
+            key: tuple(self.bonuses[condition] for condition, on in zip(BONUS_CONDITIONS, key)
+                       if on and condition in self.bonuses)
+            for key in itertools.product((False, True), repeat=len(BONUS_CONDITIONS))
+        }
+
+    def lookup(self, project_conditions: Mapping[str, Any]) -> Tuple[Mapping[str, Any], ...]:
+        """Bonuses for a project's conditions (shared read-only records)"""
+        key = tuple(bool(project_conditions.get(condition)) for condition in BONUS_CONDITIONS)
+        return self.combinations[key]
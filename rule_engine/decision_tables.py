@@ -0,0 +1,179 @@
+"""
+Decision Tables - Declarative per-jurisdiction bracket tables for the rule engines
+
+The road-width, plot-area and use-type brackets live here as plain data and are
+compiled once into bisect-based lookups. A replacement table (for example from
+the rules_db document) can be compiled and swapped in without a code change.
+"""
+from bisect import bisect_left, bisect_right
+from copy import deepcopy
+from typing import Any, Dict, List, Mapping, Optional
+import numpy as np
+
+DEFAULT_JURISDICTION = "maharashtra_udcpr"
+
+# Bracket tables use "breaks" plus one more "values" entry than breaks.
+# closed="lower": a value equal to a break falls in the bracket above it (road width >= 12)
+# closed="upper": a value equal to a break falls in the bracket below it (plot area <= 125)
+_UDCPR_2020_TABLE = {
+    # UDCPR 2020 Clause 4.2.1
+    "front_setback_m": {
+        "by": "road_width_m", "closed": "lower",
+        "breaks": [6, 9, 12, 18, 30],
+        "values": [1.0, 1.5, 3.0, 4.5, 6.0, 9.0]
+    },
+    # UDCPR 2020 Clause 4.2.2
+    "side_setback_m": {
+        "by": "plot_area_sqm", "closed": "upper",
+        "breaks": [125, 250, 500],
+        "values": [0.0, 1.0, 1.5, 3.0]
+    },
+    # UDCPR 2020 Clause 4.2.3
+    "rear_setback_m": {
+        "by": "plot_area_sqm", "closed": "upper",
+        "breaks": [125, 250, 500],
+        "values": [1.0, 1.5, 2.0, 3.0]
+    },
+    # UDCPR 2020 Clause 7.2.1
+    "max_height_m": {
+        "by": "road_width_m", "closed": "lower",
+        "breaks": [6, 9, 12, 18, 30],
+        "values": [10.0, 15.0, 24.0, 45.0, 70.0, 100.0]
+    },
+    "max_floors": {
+        "by": "road_width_m", "closed": "lower",
+        "breaks": [6, 9, 12, 18, 30],
+        "values": [3, 4, 7, 14, 21, 30]
+    },
+    # UDCPR 2020 Clause 3.1 - a number, or a plot-area bracket table per use type
+    "base_fsi": {
+        "Residential": {
+            "by": "plot_area_sqm", "closed": "upper",
+            "breaks": [4000],
+            "values": [1.0, 0.8]  # Larger plots have lower FSI
+        },
+        "Commercial": 1.5,
+        "Industrial": 1.0,
+        "Mixed": 1.2,
+        "default": 1.0
+    },
+    # UDCPR 2020 Clause 5.3
+    "parking": {
+        "Residential": {"sqm_per_ecs": 100, "norm": "1 ECS per 100 sqm", "rule_id": "udcpr_2020_5.3.1"},
+        "Commercial": {"sqm_per_ecs": 50, "norm": "1 ECS per 50 sqm", "rule_id": "udcpr_2020_5.3.2"},
+        "Industrial": {"sqm_per_ecs": 150, "norm": "1 ECS per 150 sqm", "rule_id": "udcpr_2020_5.3.3"},
+        "Mixed": {"sqm_per_ecs": 75, "norm": "1 ECS per 75 sqm (mixed use average)", "rule_id": "udcpr_2020_5.3.4"},
+        "default": {"sqm_per_ecs": 100, "norm": "1 ECS per 100 sqm (default)", "rule_id": "udcpr_2020_5.3.1"}
+    },
+    # UDCPR 2020 Clause 7.3
+    "min_floor_height_m": {
+        "Commercial": 3.0,
+        "default": 2.75
+    }
+}
+
+# Mumbai DCPR starts from the UDCPR brackets until its own values are tabulated
+DEFAULT_DECISION_TABLES: Dict[str, Dict[str, Any]] = {
+    "maharashtra_udcpr": _UDCPR_2020_TABLE,
+    "mumbai_dcpr": deepcopy(_UDCPR_2020_TABLE)
+}
+
+class BracketLookup:
+    """Compiled bracket ladder: O(log n) value lookup for a measurement"""
+    __slots__ = ("breaks", "values", "closed", "_side", "_break_array", "_value_array")
+
+    def __init__(self, breaks: List[float], values: List[Any], closed: str = "lower"):
+        if closed not in ("lower", "upper"):
+            raise ValueError(f"Bracket closed must be 'lower' or 'upper', got {closed!r}")
+        if len(values) != len(breaks) + 1:
+            raise ValueError(f"Bracket table needs {len(breaks) + 1} values for {len(breaks)} breaks")
+        if list(breaks) != sorted(breaks):
+            raise ValueError("Bracket breaks must be in ascending order")
+        self.breaks = [float(b) for b in breaks]
+        self.values = list(values)
+        self.closed = closed
+        self._side = "right" if closed == "lower" else "left"
+        self._break_array = np.array(self.breaks)
+        self._value_array = np.array(self.values)
+
+    @classmethod
+    def constant(cls, value: Any) -> "BracketLookup":
+        """Lookup that returns the same value for every measurement"""
+        return cls([], [value])
+
+    def lookup(self, x: float) -> Any:
+        """Value for the bracket containing x"""
+        if self.closed == "lower":
+            return self.values[bisect_right(self.breaks, x)]
+        return self.values[bisect_left(self.breaks, x)]
+
+    def lookup_array(self, xs: np.ndarray) -> np.ndarray:
+        """Vectorized lookup for an array of measurements"""
+        return self._value_array[np.searchsorted(self._break_array, xs, side=self._side)]
+
+def _compile_bracket(spec: Any) -> BracketLookup:
+    if isinstance(spec, Mapping):
+        return BracketLookup(spec["breaks"], spec["values"], spec.get("closed", "lower"))
+    return BracketLookup.constant(spec)
+
+class JurisdictionTable:
+    """Compiled decision table for one jurisdiction"""
+
+    def __init__(self, spec: Mapping[str, Any]):
+        try:
+            self.front_setback_m = _compile_bracket(spec["front_setback_m"])
+            self.side_setback_m = _compile_bracket(spec["side_setback_m"])
+            self.rear_setback_m = _compile_bracket(spec["rear_setback_m"])
+            self.max_height_m = _compile_bracket(spec["max_height_m"])
+            self.max_floors = _compile_bracket(spec["max_floors"])
+            self._base_fsi = {use: _compile_bracket(v) for use, v in spec["base_fsi"].items()}
+            self._parking = {use: dict(v) for use, v in spec["parking"].items()}
+            self._min_floor_height = dict(spec["min_floor_height_m"])
+            for key in ("_base_fsi", "_parking", "_min_floor_height"):
+                if "default" not in getattr(self, key):
+                    raise ValueError(f"Use-type table {key.strip('_')} needs a 'default' entry")
+        except KeyError as e:
+            raise ValueError(f"Decision table is missing {e}")
+
+    def base_fsi(self, use_type: str) -> BracketLookup:
+        """Plot-area lookup of base FSI for a use type"""
+        return self._base_fsi.get(use_type, self._base_fsi["default"])
+
+    def parking_norm(self, use_type: str) -> Dict[str, Any]:
+        """Parking norm (sqm_per_ecs, norm, rule_id) for a use type"""
+        return self._parking.get(use_type, self._parking["default"])
+
+    def min_floor_height(self, use_type: str) -> float:
+        """Minimum floor-to-floor height for a use type"""
+        return self._min_floor_height.get(use_type, self._min_floor_height["default"])
+
+class DecisionTables:
+    """Compiled decision tables for every configured jurisdiction"""
+
+    def __init__(self, spec: Mapping[str, Mapping[str, Any]]):
+        self.spec = deepcopy(dict(spec))
+        self.by_jurisdiction = {
+            jurisdiction: JurisdictionTable(table) for jurisdiction, table in self.spec.items()
+        }
+
+    def for_jurisdiction(self, jurisdiction: str) -> JurisdictionTable:
+        """Table for a jurisdiction, falling back to the UDCPR table"""
+        table = self.by_jurisdiction.get(jurisdiction)
+        if table is None:
+            table = self.by_jurisdiction[DEFAULT_JURISDICTION]
+        return table
+
+def compile_decision_tables(spec: Optional[Mapping[str, Mapping[str, Any]]] = None) -> DecisionTables:
+    """
+    Compile a per-jurisdiction table spec into bisect-based lookups.
+
+    Entries in spec override the defaults key by key, so a spec only needs
+    the jurisdictions and tables it changes.
+    """
+    merged = deepcopy(DEFAULT_DECISION_TABLES)
+    for jurisdiction, table in (spec or {}).items():
+        if not isinstance(table, Mapping):
+            raise ValueError(f"Decision table for {jurisdiction} must be a mapping")
+        base = merged.get(jurisdiction, merged[DEFAULT_JURISDICTION])
+        merged[jurisdiction] = {**base, **deepcopy(dict(table))}
+    return DecisionTables(merged)
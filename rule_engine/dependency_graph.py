@@ -0,0 +1,66 @@
+"""
+Dependency Graph - Which RuleEngine modules depend on which inputs
+
+Each calculation module reads a fixed set of ProjectInput fields and, for TDR,
+the result of another module. Given the fields a user changed, the graph says
+which modules must be recomputed; the rest of a previous evaluation can be reused.
+"""
+from typing import Dict, FrozenSet, Iterable, Set, Tuple
+
+# Modules in evaluation order (a module only depends on modules before it)
+MODULE_ORDER: Tuple[str, ...] = ("fsi", "setbacks", "parking", "height", "tdr")
+
+# ProjectInput fields each module reads. jurisdiction selects the decision table,
+# so every module that uses a bracket lookup depends on it.
+MODULE_INPUTS: Dict[str, FrozenSet[str]] = {
+    "fsi": frozenset({
+        "jurisdiction", "plot_area_sqm", "use_type", "proposed_built_up_sqm",
+        "tod_zone", "redevelopment", "slum_rehab"
+    }),
+    "setbacks": frozenset({
+        "jurisdiction", "plot_area_sqm", "frontage_m", "road_width_m", "corner_plot",
+        "proposed_height_m"  # Side setback grows with building height
+    }),
+    "parking": frozenset({
+        "jurisdiction", "plot_area_sqm", "use_type", "proposed_built_up_sqm"
+    }),
+    "height": frozenset({
+        "jurisdiction", "road_width_m", "tod_zone", "use_type",
+        "proposed_floors", "proposed_height_m"
+    }),
+    "tdr": frozenset({"plot_area_sqm"})
+}
+
+# Module results each module consumes
+MODULE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "fsi": (),
+    "setbacks": (),
+    "parking": (),
+    "height": (),
+    "tdr": ("fsi",)  # TDR loads against base and permissible FSI
+}
+
+# Calculation trace step_id prefixes written by each module
+MODULE_TRACE_PREFIXES: Dict[str, str] = {
+    "fsi": "fsi_",
+    "setbacks": "setback_",
+    "parking": "parking_",
+    "height": "height_",
+    "tdr": "tdr_"
+}
+
+def affected_modules(changed_fields: Iterable[str]) -> Set[str]:
+    """Modules that read any changed field, plus every module downstream of them"""
+    changed = set(changed_fields)
+    affected = {module for module, fields in MODULE_INPUTS.items() if fields & changed}
+    for module in MODULE_ORDER:
+        if any(dependency in affected for dependency in MODULE_DEPENDENCIES[module]):
+            affected.add(module)
+    return affected
+
+def module_for_step(step_id: str) -> str:
+    """Module that wrote a calculation trace step"""
+    for module, prefix in MODULE_TRACE_PREFIXES.items():
+        if step_id.startswith(prefix):
+            return module
+    raise ValueError(f"Unknown calculation step: {step_id}")
@@ -0,0 +1,108 @@
+"""
+Evaluation Cache - Thread-safe LRU + TTL memo for evaluate_project results
+
+Portals re-submit the same project many times while users toggle views, so
+results are memoized on a canonical hash of the project input and rule version.
+Clearing the cache starts a new generation; results computed against an older
+rule corpus are dropped instead of being stored after the reload.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+import hashlib
+import json
+import time
+
+def project_cache_key(project: Any, rule_version: str, *extra: Any) -> str:
+    """
+    Canonical cache key for a project evaluation.
+
+    The key is a SHA-256 over the project fields serialized as sorted JSON, so
+    field order and equivalent inputs (1000 vs 1000.0) map to the same entry.
+    """
+    payload = {
+        "project": project.model_dump(mode="json"),
+        "rule_version": rule_version,
+        "extra": [str(e) for e in extra]
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class EvaluationCache:
+    """Bounded LRU cache with per-entry time-to-live and hit/miss counters"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        max_size=0 disables caching; ttl_seconds=None keeps entries until evicted.
+        """
+        if max_size < 0:
+            raise ValueError(f"Cache max_size must be >= 0, got {max_size}")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Pass the generation read before computing the value; if the cache was
+        cleared in the meantime the value is stale and is not stored.
+        """
+        if self.max_size == 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and start a new generation (call on rule reload)"""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, limits and counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
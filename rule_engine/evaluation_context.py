@@ -0,0 +1,52 @@
+"""
+Evaluation Context - Per-evaluation state shared by RuleEngine and DatabaseDrivenRuleEngine
+
+Each evaluate_project call gets its own EvaluationContext, so one loaded engine
+holds no per-request state and can serve concurrent requests from a thread pool.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional
+import time
+
+class TraceLevel(str, Enum):
+    """How much of the calculation trace an evaluation records"""
+    OFF = "off"            # No trace steps (bulk and internal callers)
+    SUMMARY = "summary"    # One headline step per module result
+    FULL = "full"          # Every step, including bonuses and relaxations
+
+    def includes(self, level: "TraceLevel") -> bool:
+        """Check whether steps of the given level are recorded at this level"""
+        members = list(TraceLevel)
+        return members.index(self) >= members.index(TraceLevel(level))
+
+@dataclass
+class EvaluationContext:
+    """Traces and intermediate module results for a single evaluation"""
+    trace_level: TraceLevel = TraceLevel.FULL
+    traces: List[Any] = field(default_factory=list)
+    results: Dict[str, Any] = field(default_factory=dict)
+    # Decision table pinned on first use, so a table swap never splits an evaluation
+    decision_table: Optional[Any] = None
+    # Rules database snapshot pinned on first use, so a hot reload never splits an evaluation
+    rules_db: Optional[Any] = None
+    # Wall-clock milliseconds per phase (module name, "rules_db", "compliance")
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.trace_level = TraceLevel(self.trace_level)
+
+    def tracing(self, level: TraceLevel) -> bool:
+        """Check whether trace steps of the given level are being recorded"""
+        return self.trace_level.includes(level)
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        """Add the time spent in the block to the phase's total"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.timings[phase] = self.timings.get(phase, 0.0) + elapsed_ms
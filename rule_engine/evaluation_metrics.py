@@ -0,0 +1,105 @@
+"""
+Evaluation Metrics - In-process latency histograms per evaluation phase
+
+The engines record how long each phase of evaluate_project took (every
+calculation module, the rules-database queries, the compliance checks and the
+total). PhaseMetrics aggregates those timings into fixed-bucket histograms that
+the API serves as JSON or in the Prometheus text format.
+"""
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Sequence
+
+# Bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram with interpolated quantiles"""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        """Record one observation"""
+        self.counts[bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0..1) by linear interpolation within its bucket"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= target:
+                if i == len(self.buckets_ms):
+                    return self.max_ms
+                lower = self.buckets_ms[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets_ms[i], self.max_ms)
+                return lower + (upper - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters, quantile estimates and cumulative buckets"""
+        buckets = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets_ms + ["+Inf"], self.counts):
+            cumulative += bucket_count
+            buckets.append({"le": bound, "count": cumulative})
+        return {
+            "count": self.count,
+            "sum_ms": self.sum_ms,
+            "mean_ms": self.sum_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.quantile(0.50),
+            "p90_ms": self.quantile(0.90),
+            "p99_ms": self.quantile(0.99),
+            "buckets": buckets
+        }
+
+class PhaseMetrics:
+    """Thread-safe latency histograms keyed by evaluation phase"""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = Lock()
+
+    def observe(self, timings_ms: Mapping[str, float]) -> None:
+        """Record one evaluation's phase timings"""
+        with self._lock:
+            for phase, value_ms in timings_ms.items():
+                histogram = self._histograms.get(phase)
+                if histogram is None:
+                    histogram = self._histograms[phase] = LatencyHistogram(self.buckets_ms)
+                histogram.observe(value_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Histogram snapshot for every phase seen so far"""
+        with self._lock:
+            return {phase: h.snapshot() for phase, h in sorted(self._histograms.items())}
+
+    def reset(self) -> None:
+        """Drop all recorded observations"""
+        with self._lock:
+            self._histograms.clear()
+
+    def to_prometheus(self, metric: str = "rule_engine_phase_latency_ms") -> str:
+        """Render the histograms in the Prometheus text exposition format"""
+        lines: List[str] = [
+            f"# HELP {metric} Rule engine evaluation phase latency in milliseconds",
+            f"# TYPE {metric} histogram"
+        ]
+        for phase, snapshot in self.snapshot().items():
+            for bucket in snapshot["buckets"]:
+                lines.append(f'{metric}_bucket{{phase="{phase}",le="{bucket["le"]}"}} {bucket["count"]}')
+            lines.append(f'{metric}_sum{{phase="{phase}"}} {snapshot["sum_ms"]}')
+            lines.append(f'{metric}_count{{phase="{phase}"}} {snapshot["count"]}')
+        return "\n".join(lines) + "\n"
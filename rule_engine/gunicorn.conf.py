@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration for the rule engine API with a pre-forked, shared rule corpus
+
+    gunicorn -c rule_engine/gunicorn.conf.py api_service:app
+
+The master loads the app and the rule databases named by PRELOAD_RULES
+('rules', 'enhanced' or 'rules,enhanced'; none by default, since api_service
+does not read the rules database), freezes them out of the GC and forks
+WEB_CONCURRENCY uvicorn workers that share one copy of the corpus (see
+prefork.py). Preload only for the database-driven engine, and pair it with
+RULES_METADATA_ONLY=1. uvicorn --workers spawns fresh interpreters instead,
+so each of its workers loads its own copy.
+"""
+import os
+import sys
+from pathlib import Path
+
+# The app and prefork import the rule engine modules as siblings; rule paths stay
+# relative to the working directory (the repository or image root)
+RULE_ENGINE_DIR = str(Path(__file__).resolve().parent)
+sys.path.insert(0, RULE_ENGINE_DIR)
+
+import prefork
+
+pythonpath = RULE_ENGINE_DIR
+bind = os.environ.get("BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+PRELOAD_TARGETS = prefork.preload_targets()
+
+# Runs in the master before the app is preloaded
+if PRELOAD_TARGETS:
+    prefork.prepare_master()
+
+def when_ready(server):
+    """Load the rule corpus in the master once the app is loaded, then freeze it for fork"""
+    if not PRELOAD_TARGETS:
+        server.log.info("No rule databases preloaded (PRELOAD_RULES is empty)")
+        return
+    loaded = prefork.preload_rule_corpus(PRELOAD_TARGETS)
+    prefork.freeze_for_fork()
+    server.log.info("Preloaded rule databases for forked workers: %s", ", ".join(loaded))
+
+def post_fork(server, worker):
+    """Let each worker collect its own garbage again"""
+    prefork.after_fork()
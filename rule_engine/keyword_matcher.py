@@ -0,0 +1,79 @@
+"""
+Keyword Matcher - Shared multi-keyword substring matching for rule filters
+
+Rule classification and the ad-hoc filters in scripts tested keywords one
+`in` scan at a time, often rebuilding str(rule).lower() for every keyword.
+KeywordMatcher and KeywordClassifier take the whole keyword set at once, so
+each text is built once and every keyword (or label) is answered in one call.
+
+A single compiled alternation (or a trie regex) over the text measured 2-3x
+slower than per-keyword `in` scans at every set size up to 240 keywords over
+the rule records: CPython's re steps through every position, while `in` runs
+the C fast search. The matcher therefore keeps `in` scans and plans them
+once per keyword set to skip the ones that cannot change the answer: a
+keyword containing another keyword is scanned only if that one was found
+("additional fsi" needs "fsi"), and a classifier stops scanning a label's
+keywords once the label is found.
+"""
+from typing import Dict, FrozenSet, Generic, Iterable, Mapping, Set, Tuple, TypeVar
+
+T = TypeVar('T')
+
+def _containment_plan(keywords: Iterable[str]) -> Tuple[Tuple[str, FrozenSet[str]], ...]:
+    """(keyword, other keywords it contains), shortest keyword first"""
+    keywords = tuple(dict.fromkeys(keywords))
+    if not keywords or not all(keywords):
+        raise ValueError("Keyword sets need at least one non-empty keyword")
+    ordered = sorted(keywords, key=len)
+    return tuple((keyword, frozenset(other for other in ordered if other != keyword and other in keyword))
+                 for keyword in ordered)
+
+class KeywordMatcher:
+    """Substring matcher for a fixed set of keywords (match against lowercased text)"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._plan = _containment_plan(keywords)
+        self.keywords: Tuple[str, ...] = tuple(keyword for keyword, _ in self._plan)
+        # Any match implies a match of one of the keywords that contain no other
+        self._minimal = tuple(keyword for keyword, contained in self._plan if not contained)
+
+    def found(self, text: str) -> FrozenSet[str]:
+        """Keywords occurring in text"""
+        found: Set[str] = set()
+        for keyword, contained in self._plan:
+            if contained <= found and keyword in text:
+                found.add(keyword)
+        return frozenset(found)
+
+    def any_in(self, text: str) -> bool:
+        """Whether any keyword occurs in text"""
+        return any(keyword in text for keyword in self._minimal)
+
+class KeywordClassifier(Generic[T]):
+    """Labels with at least one keyword occurring in a text"""
+
+    def __init__(self, keywords_by_label: Mapping[T, Iterable[str]]):
+        labels: Dict[str, Set[T]] = {}
+        for label, keywords in keywords_by_label.items():
+            for keyword in keywords:
+                labels.setdefault(keyword, set()).add(label)
+        self._plan = tuple((keyword, contained, frozenset(labels[keyword]))
+                           for keyword, contained in _containment_plan(labels))
+        self.labels: FrozenSet[T] = frozenset(keywords_by_label)
+
+    def classify(self, text: str) -> FrozenSet[T]:
+        """Labels of the keywords occurring in text"""
+        found: Set[T] = set()
+        absent: Set[str] = set()
+        for keyword, contained, labels in self._plan:
+            if not absent.isdisjoint(contained):
+                # Contains a keyword that is not in the text
+                absent.add(keyword)
+            elif labels <= found:
+                # Nothing left to learn; its absence is unknown, so it blocks nothing
+                continue
+            elif keyword in text:
+                found |= labels
+            else:
+                absent.add(keyword)
+        return frozenset(found)
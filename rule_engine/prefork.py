@@ -0,0 +1,78 @@
+"""
+Prefork - Share one loaded rule corpus between pre-forked worker processes
+
+Every worker that calls get_rules_database() or get_enhanced_rules_database()
+parses and indexes its own copy of the corpus. Under a pre-forking server
+(gunicorn with preload_app, see gunicorn.conf.py) the master can load the
+databases once and fork workers that inherit them copy-on-write.
+
+Inherited pages stay shared only while nothing writes to them. CPython's
+cyclic GC writes to the header of every tracked object it examines, so one
+collection in a worker would copy almost the whole corpus. The master
+therefore disables the GC before loading, moves everything it loaded to the
+permanent generation with gc.freeze() before forking, and each worker
+re-enables the GC for its own objects. Reference counts still change on the
+rules a worker touches, so those pages are copied on first use; the keyword
+index postings and ranking feature arrays are not refcounted per element.
+With RULES_METADATA_ONLY=1 most rule text lives in the memory-mapped rule
+pack, which workers share through the page cache.
+
+Nothing is preloaded by default: api_service runs the hardcoded RuleEngine,
+which never reads the rules database. A service running the database-driven
+engine sets PRELOAD_RULES=rules (and 'enhanced' if it uses the enhanced
+database), together with RULES_METADATA_ONLY=1 so the shared pages hold
+metadata rather than full rule dicts.
+
+A hot reload in a worker builds a private snapshot; reload by restarting the
+workers (gunicorn HUP) to keep the corpus shared.
+"""
+import gc
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+import sys
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Databases preloaded when PRELOAD_RULES is not set (api_service reads none)
+DEFAULT_PRELOAD = ()
+
+def preload_targets(value: Optional[str] = None) -> tuple:
+    """
+    Databases named by PRELOAD_RULES (or value): a comma-separated list of
+    'rules' and 'enhanced'; empty for none.
+    """
+    if value is None:
+        value = os.environ.get("PRELOAD_RULES")
+    if value is None:
+        return DEFAULT_PRELOAD
+    targets = tuple(name.strip() for name in value.split(",") if name.strip())
+    unknown = set(targets) - {"rules", "enhanced"}
+    if unknown:
+        raise ValueError(f"Unknown PRELOAD_RULES entries: {', '.join(sorted(unknown))}")
+    return targets
+
+def prepare_master() -> None:
+    """Stop the cyclic GC in the master so loading leaves no freed holes in shared pages"""
+    gc.disable()
+
+def preload_rule_corpus(targets: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Load the rules database singletons (all of PRELOAD_RULES by default)"""
+    targets = preload_targets() if targets is None else tuple(targets)
+    loaded = {}
+    if "rules" in targets:
+        from rules_database import get_rules_database
+        loaded["rules"] = get_rules_database()
+    if "enhanced" in targets:
+        from rules_database_v2 import get_enhanced_rules_database
+        loaded["enhanced"] = get_enhanced_rules_database()
+    return loaded
+
+def freeze_for_fork() -> None:
+    """Move every object alive in the master to the permanent GC generation"""
+    gc.freeze()
+
+def after_fork() -> None:
+    """Re-enable the GC in a worker; frozen objects stay out of its collections"""
+    gc.enable()
@@ -0,0 +1,50 @@
+"""
+Response Encoding - Single-pass JSON and optional MessagePack for evaluation results
+
+pydantic-core serializes an EvaluationResult (including every calculation trace)
+straight to JSON bytes, so the API no longer builds an intermediate dict per
+trace and has FastAPI re-encode it. Internal callers that send
+``Accept: application/msgpack`` get the more compact MessagePack encoding when
+msgpack is installed.
+"""
+from typing import Optional, Tuple
+from pydantic import BaseModel
+
+try:
+    import msgpack
+    MSGPACK_SUPPORT = True
+except ImportError:
+    MSGPACK_SUPPORT = False
+    print("Warning: msgpack not installed. MessagePack responses disabled.")
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+def encode_json(model: BaseModel) -> bytes:
+    """Serialize a pydantic model to JSON bytes in one pass"""
+    return model.__pydantic_serializer__.to_json(model)
+
+def encode_msgpack(model: BaseModel) -> bytes:
+    """Serialize a pydantic model to MessagePack (JSON-compatible types)"""
+    if not MSGPACK_SUPPORT:
+        raise RuntimeError("msgpack is not installed")
+    return msgpack.packb(model.model_dump(mode="json"), use_bin_type=True)
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """Check whether an Accept header asks for MessagePack"""
+    if not accept:
+        return False
+    media_types = [part.split(";")[0].strip().lower() for part in accept.split(",")]
+    return any(media_type in MSGPACK_MEDIA_TYPES for media_type in media_types)
+
+def encode_response(model: BaseModel, accept: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Encode a model for an HTTP response.
+
+    Returns (body, media_type): MessagePack when the Accept header asks for it
+    and msgpack is installed, otherwise JSON.
+    """
+    if MSGPACK_SUPPORT and wants_msgpack(accept):
+        return encode_msgpack(model), MSGPACK_MEDIA_TYPE
+    return encode_json(model), JSON_MEDIA_TYPE
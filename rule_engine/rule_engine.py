@@ -2,9 +2,38 @@
 UDCPR Master - Deterministic Rule Engine
 Computes FSI, Setbacks, Parking, Height, TDR, TOD with calculation traces.
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Mapping, Sequence, Tuple
 from pydantic import BaseModel
 from datetime import datetime
+from pathlib import Path
+import sys
+import time
+import numpy as np
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from evaluation_context import TraceLevel, EvaluationContext
+from decision_tables import DEFAULT_JURISDICTION, JurisdictionTable, compile_decision_tables
+from evaluation_cache import EvaluationCache, project_cache_key
+from dependency_graph import MODULE_ORDER, affected_modules, module_for_step
+from evaluation_metrics import PhaseMetrics
+
+# Columns accepted by RuleEngine.evaluate_batch, with defaults for optional ones
+BATCH_REQUIRED_COLUMNS = (
+    "plot_area_sqm", "road_width_m", "frontage_m", "use_type",
+    "proposed_floors", "proposed_height_m", "proposed_built_up_sqm"
+)
+BATCH_OPTIONAL_COLUMNS = {
+    "jurisdiction": DEFAULT_JURISDICTION,
+    "corner_plot": False,
+    "tod_zone": False,
+    "redevelopment": False,
+    "slum_rehab": False
+}
+
+# Upper bound on grid points evaluated by a single RuleEngine.sweep_envelope call
+MAX_SWEEP_POINTS = 250_000
 
 class CalculationStep(BaseModel):
     """Single step in calculation trace."""
@@ -59,27 +88,152 @@ class EvaluationResult(BaseModel):
     
     # Calculation traces
     calculation_traces: List[CalculationStep]
+    
+    # Milliseconds per phase, when requested with include_timings
+    phase_timings_ms: Optional[Dict[str, float]] = None
 
 class RuleEngine:
     """Main rule engine for UDCPR calculations."""
     
-    def __init__(self, rules_db: Dict[str, Any]):
-        """Initialize with rules from MongoDB."""
+    def __init__(self, rules_db: Dict[str, Any], cache_size: int = 1024,
+                 cache_ttl_seconds: Optional[float] = 300.0):
+        """
+        Initialize with rules from MongoDB.
+        
+        An optional ``decision_tables`` entry in ``rules_db`` overrides the
+        default per-jurisdiction bracket tables (see decision_tables.py).
+        Results of ``evaluate_project`` are memoized in an LRU cache of
+        ``cache_size`` entries (0 disables it) for ``cache_ttl_seconds``.
+        """
         self.rules = rules_db
-        self.traces: List[CalculationStep] = []
+        self.decision_tables = compile_decision_tables((rules_db or {}).get("decision_tables"))
+        self.cache = EvaluationCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+        self.metrics = PhaseMetrics()
     
-    def evaluate_project(self, project: ProjectInput, rule_version: str = "latest") -> EvaluationResult:
-        """Main evaluation entry point."""
-        self.traces = []
-        
+    def load_decision_tables(self, spec: Dict[str, Any]) -> None:
+        """
+        Compile and swap in new decision tables.
+        
+        The compiled tables replace the old ones in a single assignment, and
+        each evaluation pins its table on first use, so in-flight evaluations
+        finish on the tables they started with.
+        """
+        self.decision_tables = compile_decision_tables(spec)
+        self.rules = {**self.rules, "decision_tables": spec}
+        self.cache.clear()
+    
+    def _decision_table(self, project: ProjectInput, ctx: EvaluationContext) -> JurisdictionTable:
+        """Decision table for the project's jurisdiction, pinned for the evaluation."""
+        if ctx.decision_table is None:
+            ctx.decision_table = self.decision_tables.for_jurisdiction(project.jurisdiction)
+        return ctx.decision_table
+    
+    def evaluate_project(self, project: ProjectInput, rule_version: str = "latest",
+                         trace_level: TraceLevel = TraceLevel.FULL,
+                         include_timings: bool = False) -> EvaluationResult:
+        """
+        Main evaluation entry point.
+        
+        ``trace_level`` controls the calculation trace: ``full`` records every
+        step, ``summary`` one headline step per module and ``off`` none.
+        
+        Results are served from the evaluation cache when the same project is
+        re-submitted; callers always receive their own copy.
+        
+        Phase timings are always recorded in ``self.metrics``; with
+        ``include_timings`` they are also returned in ``phase_timings_ms``.
+        """
+        trace_level = TraceLevel(trace_level)
+        start = time.perf_counter()
+        key = project_cache_key(project, rule_version, trace_level.value)
+        cached = self.cache.get(key)
+        if cached is not None:
+            result = cached.model_copy(deep=True)
+            timings = {"cache_hit": (time.perf_counter() - start) * 1000}
+            self.metrics.observe(timings)
+            result.phase_timings_ms = timings if include_timings else None
+            return result
+        
+        generation = self.cache.generation
+        ctx = EvaluationContext(trace_level=trace_level)
+        with ctx.timed("total"):
+            result = self._evaluate_project(project, rule_version, ctx)
+        self.cache.put(key, result.model_copy(deep=True), generation=generation)
+        return self._record_timings(result, ctx, include_timings)
+    
+    def _evaluate_project(self, project: ProjectInput, rule_version: str,
+                          ctx: EvaluationContext) -> EvaluationResult:
+        """Run every module and the compliance checks for one project."""
         # Run all modules
-        fsi_result = self.calculate_fsi(project)
-        setback_result = self.calculate_setbacks(project)
-        parking_result = self.calculate_parking(project)
-        height_result = self.calculate_height(project)
-        tdr_result = self.calculate_tdr(project, fsi_result)
+        for module in MODULE_ORDER:
+            with ctx.timed(module):
+                ctx.results[module] = self._run_module(module, project, ctx)
+        
+        return self._build_result(rule_version, ctx)
+    
+    def _record_timings(self, result: EvaluationResult, ctx: EvaluationContext,
+                        include_timings: bool) -> EvaluationResult:
+        """Feed the phase timings to the metrics and optionally into the result."""
+        self.metrics.observe(ctx.timings)
+        result.phase_timings_ms = dict(ctx.timings) if include_timings else None
+        return result
+    
+    def evaluate_delta(self, project: ProjectInput, previous: EvaluationResult,
+                       changes: Dict[str, Any], trace_level: TraceLevel = TraceLevel.FULL,
+                       include_timings: bool = False) -> EvaluationResult:
+        """
+        Re-evaluate a project after some of its fields changed.
+        
+        ``previous`` must be the result of evaluating ``project`` on this
+        engine at the same ``trace_level``. Only the modules that read a
+        changed field (see dependency_graph.py), and the modules downstream of
+        them, are recomputed; the other module results and their calculation
+        traces are carried over from ``previous``.
+        """
+        unknown = set(changes) - set(ProjectInput.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown project fields: {', '.join(sorted(unknown))}")
+        updated = ProjectInput(**{**project.model_dump(), **changes})
+        changed_fields = [name for name in changes if getattr(updated, name) != getattr(project, name)]
+        stale = affected_modules(changed_fields)
+        
+        ctx = EvaluationContext(trace_level=trace_level)
+        previous_results = {
+            "fsi": previous.fsi_result,
+            "setbacks": previous.setback_result,
+            "parking": previous.parking_result,
+            "height": previous.height_result,
+            "tdr": previous.tdr_result
+        }
+        # Timed as "delta_total" so full evaluations keep their own "total"
+        with ctx.timed("delta_total"):
+            for module in MODULE_ORDER:
+                if module in stale:
+                    with ctx.timed(module):
+                        ctx.results[module] = self._run_module(module, updated, ctx)
+                else:
+                    ctx.results[module] = previous_results[module]
+                    ctx.traces.extend(
+                        step for step in previous.calculation_traces
+                        if module_for_step(step.step_id) == module
+                    )
+            result = self._build_result(previous.rule_version, ctx)
+        
+        return self._record_timings(result, ctx, include_timings)
+    
+    def _run_module(self, module: str, project: ProjectInput, ctx: EvaluationContext) -> Dict[str, Any]:
+        """Run one calculation module, reading its dependencies from ctx.results."""
+        if module == "tdr":
+            return self.calculate_tdr(project, ctx.results["fsi"], ctx)
+        return getattr(self, f"calculate_{module}")(project, ctx)
+    
+    def _check_compliance(self, ctx: EvaluationContext) -> Tuple[List[str], List[str]]:
+        """Violations and warnings for the module results in ctx."""
+        fsi_result = ctx.results["fsi"]
+        setback_result = ctx.results["setbacks"]
+        parking_result = ctx.results["parking"]
+        height_result = ctx.results["height"]
         
-        # Check compliance
         violations = []
         warnings = []
         
@@ -107,34 +261,240 @@ class RuleEngine:
         if setback_result["open_space_percent"] < setback_result["min_open_space_required_percent"]:
             violations.append(f"Insufficient open space: {setback_result['open_space_percent']:.1f}% < {setback_result['min_open_space_required_percent']:.1f}% required (UDCPR 4.3)")
         
+        return violations, warnings
+    
+    def _build_result(self, rule_version: str, ctx: EvaluationContext) -> EvaluationResult:
+        """Assemble the EvaluationResult from the module results in ctx."""
+        with ctx.timed("compliance"):
+            violations, warnings = self._check_compliance(ctx)
+        
         return EvaluationResult(
             project_id="temp",
             rule_version=rule_version,
             evaluated_at=datetime.now(),
-            fsi_result=fsi_result,
-            setback_result=setback_result,
-            parking_result=parking_result,
-            height_result=height_result,
-            tdr_result=tdr_result,
+            fsi_result=ctx.results["fsi"],
+            setback_result=ctx.results["setbacks"],
+            parking_result=ctx.results["parking"],
+            height_result=ctx.results["height"],
+            tdr_result=ctx.results["tdr"],
             compliant=len(violations) == 0,
             violations=violations,
             warnings=warnings,
-            calculation_traces=self.traces
+            calculation_traces=ctx.traces
+        )
+    
+    def evaluate_batch(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate many projects at once from columnar ProjectInput fields.
+        
+        Each key of ``columns`` is a ProjectInput field name mapped to a list or
+        NumPy array with one entry per project; scalars are broadcast. Returns a
+        dict of NumPy arrays, one entry per project. No traces are produced.
+        """
+        missing = [name for name in BATCH_REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Missing batch columns: {', '.join(missing)}")
+        
+        names = list(BATCH_REQUIRED_COLUMNS) + list(BATCH_OPTIONAL_COLUMNS)
+        values = [columns.get(name, BATCH_OPTIONAL_COLUMNS.get(name)) for name in names]
+        try:
+            arrays = np.broadcast_arrays(*[np.atleast_1d(v) for v in values])
+        except ValueError:
+            raise ValueError("Batch columns must all have the same length")
+        arrays = {name: array.ravel() for name, array in zip(names, arrays)}
+        
+        plot_area = arrays["plot_area_sqm"].astype(float)
+        road_width = arrays["road_width_m"].astype(float)
+        frontage = arrays["frontage_m"].astype(float)
+        use_type = arrays["use_type"].astype(str)
+        floors = arrays["proposed_floors"].astype(int)
+        height = arrays["proposed_height_m"].astype(float)
+        built_up = arrays["proposed_built_up_sqm"].astype(float)
+        corner_plot = arrays["corner_plot"].astype(bool)
+        tod_zone = arrays["tod_zone"].astype(bool)
+        redevelopment = arrays["redevelopment"].astype(bool)
+        slum_rehab = arrays["slum_rehab"].astype(bool)
+        
+        jurisdiction = arrays["jurisdiction"].astype(str)
+        
+        # Bracket lookups, once per jurisdiction and per use type within it
+        n = plot_area.size
+        front = np.empty(n)
+        side_base = np.empty(n)
+        rear = np.empty(n)
+        max_height = np.empty(n)
+        max_floors = np.empty(n, dtype=int)
+        base_fsi = np.empty(n)
+        sqm_per_ecs = np.empty(n)
+        min_floor_height = np.empty(n)
+        decision_tables = self.decision_tables
+        for code in np.unique(jurisdiction):
+            table = decision_tables.for_jurisdiction(code)
+            in_jurisdiction = jurisdiction == code
+            front[in_jurisdiction] = table.front_setback_m.lookup_array(road_width[in_jurisdiction])
+            side_base[in_jurisdiction] = table.side_setback_m.lookup_array(plot_area[in_jurisdiction])
+            rear[in_jurisdiction] = table.rear_setback_m.lookup_array(plot_area[in_jurisdiction])
+            max_height[in_jurisdiction] = table.max_height_m.lookup_array(road_width[in_jurisdiction])
+            max_floors[in_jurisdiction] = table.max_floors.lookup_array(road_width[in_jurisdiction])
+            for use in np.unique(use_type[in_jurisdiction]):
+                rows = in_jurisdiction & (use_type == use)
+                base_fsi[rows] = table.base_fsi(use).lookup_array(plot_area[rows])
+                sqm_per_ecs[rows] = table.parking_norm(use)["sqm_per_ecs"]
+                min_floor_height[rows] = table.min_floor_height(use)
+        
+        # FSI (UDCPR Clause 3.1)
+        bonus_fsi = tod_zone * 0.5 + redevelopment * 0.3 + slum_rehab * 1.0
+        permissible_fsi = base_fsi + bonus_fsi
+        proposed_fsi = built_up / plot_area
+        fsi_utilization = np.divide(proposed_fsi * 100, permissible_fsi,
+                                    out=np.zeros_like(proposed_fsi), where=permissible_fsi > 0)
+        
+        # Setbacks (UDCPR Clause 4.2)
+        front = np.where(corner_plot, front * 0.75, front)
+        side = side_base + np.where(height > 10, (height - 10) / 3.0, 0.0)
+        total_setback_area = (front + rear) * frontage + (side * 2) * (plot_area / frontage)
+        open_space_percent = (total_setback_area / plot_area) * 100
+        
+        # Parking (UDCPR Clause 5.3)
+        required_ecs = np.ceil(built_up / sqm_per_ecs).astype(int)
+        total_parking_area = required_ecs * 25.0
+        available_for_parking = plot_area * 0.3
+        parking_deficit = np.maximum(0, total_parking_area - available_for_parking)
+        
+        # Height (UDCPR Clause 7.2)
+        max_height = np.where(tod_zone, max_height * 1.5, max_height)
+        max_floors = np.where(tod_zone, (max_floors * 1.5).astype(int), max_floors)
+        avg_floor_height = np.divide(height, floors, out=np.full(height.shape, 3.0), where=floors > 0)
+        floor_height_adequate = avg_floor_height >= min_floor_height
+        
+        # TDR (UDCPR Clause 10.2)
+        can_receive_tdr = plot_area >= 1000
+        max_tdr_loadable = np.where(can_receive_tdr, base_fsi * 0.20, 0.0)
+        tdr_needed = np.maximum(0, proposed_fsi - permissible_fsi)
+        
+        # Compliance, mirroring evaluate_project
+        fsi_violation = proposed_fsi > permissible_fsi
+        height_violation = height > max_height
+        floor_height_violation = ~floor_height_adequate
+        open_space_violation = open_space_percent < 20.0
+        
+        return {
+            "base_fsi": base_fsi,
+            "bonus_fsi": bonus_fsi,
+            "permissible_fsi": permissible_fsi,
+            "permissible_built_up_sqm": plot_area * permissible_fsi,
+            "proposed_fsi": proposed_fsi,
+            "fsi_utilization_percent": fsi_utilization,
+            "front_m": front,
+            "side_m": side,
+            "rear_m": rear,
+            "total_setback_area_sqm": total_setback_area,
+            "open_space_percent": open_space_percent,
+            "required_ecs": required_ecs,
+            "total_parking_area_sqm": total_parking_area,
+            "parking_deficit_sqm": parking_deficit,
+            "mechanical_parking_allowed": required_ecs > 20,
+            "permissible_height_m": max_height,
+            "permissible_floors": max_floors,
+            "avg_floor_height_m": avg_floor_height,
+            "floor_height_adequate": floor_height_adequate,
+            "can_receive_tdr": can_receive_tdr,
+            "max_tdr_loadable_fsi": max_tdr_loadable,
+            "tdr_needed_fsi": tdr_needed,
+            "tdr_can_solve_deficit": (tdr_needed > 0) & (tdr_needed <= max_tdr_loadable),
+            "fsi_violation": fsi_violation,
+            "height_violation": height_violation,
+            "floor_height_violation": floor_height_violation,
+            "open_space_violation": open_space_violation,
+            "low_fsi_utilization_warning": ~fsi_violation & (fsi_utilization < 50),
+            "parking_deficit_warning": parking_deficit > 0,
+            "compliant": ~(fsi_violation | height_violation | floor_height_violation | open_space_violation)
+        }
+    
+    def sweep_envelope(self, project: ProjectInput, floors: Sequence[int],
+                       heights_m: Sequence[float], built_up_sqm: Sequence[float]) -> Dict[str, Any]:
+        """
+        Find the compliant building envelope for a fixed plot.
+        
+        Evaluates every combination of the given floors, heights and built-up
+        areas in one batch and returns the compliance frontier: the compliant
+        (height, built-up) combinations that no other compliant combination
+        beats on both axes, plus the overall maxima.
+        """
+        floor_values = np.unique(np.asarray(floors, dtype=int))
+        height_values = np.unique(np.asarray(heights_m, dtype=float))
+        built_up_values = np.unique(np.asarray(built_up_sqm, dtype=float))
+        
+        if min(floor_values.size, height_values.size, built_up_values.size) == 0:
+            raise ValueError("Sweep needs at least one value for floors, height and built-up area")
+        grid_size = floor_values.size * height_values.size * built_up_values.size
+        if grid_size > MAX_SWEEP_POINTS:
+            raise ValueError(f"Sweep grid has {grid_size} points, limit is {MAX_SWEEP_POINTS}")
+        
+        floor_grid, height_grid, built_up_grid = np.meshgrid(
+            floor_values, height_values, built_up_values, indexing="ij"
+        )
+        columns = project.model_dump()
+        columns.update(
+            proposed_floors=floor_grid.ravel(),
+            proposed_height_m=height_grid.ravel(),
+            proposed_built_up_sqm=built_up_grid.ravel()
         )
+        batch = self.evaluate_batch(columns)
+        
+        # compliant[f, h, b] for floors f, height h and built-up b
+        compliant = batch["compliant"].reshape(floor_grid.shape)
+        compliant_by_height = compliant.any(axis=0)
+        
+        frontier = []
+        best_built_up = -np.inf
+        # Walk heights from tallest down; a lower height is only on the frontier
+        # if it allows more built-up area than every taller compliant option
+        for h in range(height_values.size - 1, -1, -1):
+            built_up_ok = compliant_by_height[h]
+            if not built_up_ok.any():
+                continue
+            b = built_up_values.size - 1 - int(np.argmax(built_up_ok[::-1]))
+            if built_up_values[b] <= best_built_up:
+                continue
+            best_built_up = built_up_values[b]
+            f = floor_values.size - 1 - int(np.argmax(compliant[::-1, h, b]))
+            frontier.append({
+                "proposed_floors": int(floor_values[f]),
+                "proposed_height_m": float(height_values[h]),
+                "proposed_built_up_sqm": float(built_up_values[b]),
+                "proposed_fsi": float(built_up_values[b] / project.plot_area_sqm)
+            })
+        frontier.reverse()
+        
+        compliant_count = int(compliant.sum())
+        return {
+            "grid_size": grid_size,
+            "compliant_count": compliant_count,
+            "max_compliant_built_up_sqm": frontier[0]["proposed_built_up_sqm"] if frontier else None,
+            "max_compliant_height_m": frontier[-1]["proposed_height_m"] if frontier else None,
+            "max_compliant_floors": int(floor_grid[compliant].max()) if compliant_count else None,
+            "permissible_fsi": float(batch["permissible_fsi"][0]),
+            "permissible_height_m": float(batch["permissible_height_m"][0]),
+            "frontier": frontier
+        }
     
-    def calculate_fsi(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_fsi(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate FSI (Floor Space Index) based on UDCPR 2020 rules."""
-        # Base FSI based on zone and plot area (UDCPR Clause 3.1)
-        base_fsi = self._get_base_fsi(project)
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
         
-        self.traces.append(CalculationStep(
-            step_id="fsi_base",
-            description=f"Base FSI for {project.use_type} zone",
-            rule_ids=["udcpr_2020_3.1.1"],
-            inputs={"use_type": project.use_type, "plot_area_sqm": project.plot_area_sqm},
-            result=base_fsi,
-            units="ratio"
-        ))
+        # Base FSI based on zone and plot area (UDCPR Clause 3.1)
+        base_fsi = self._get_base_fsi(project, ctx)
+        
+        if ctx.tracing(TraceLevel.FULL):
+            ctx.traces.append(CalculationStep(
+                step_id="fsi_base",
+                description=f"Base FSI for {project.use_type} zone",
+                rule_ids=["udcpr_2020_3.1.1"],
+                inputs={"use_type": project.use_type, "plot_area_sqm": project.plot_area_sqm},
+                result=base_fsi,
+                units="ratio"
+            ))
         
         # Calculate bonuses
         bonus_fsi = 0.0
@@ -145,42 +505,45 @@ class RuleEngine:
             tod_bonus = 0.5
             bonus_fsi += tod_bonus
             bonus_details.append(f"TOD Zone: +{tod_bonus}")
-            self.traces.append(CalculationStep(
-                step_id="fsi_tod_bonus",
-                description="TOD zone FSI bonus (within 500m of transit station)",
-                rule_ids=["udcpr_2020_6.1.5"],
-                inputs={"tod_zone": True},
-                result=tod_bonus,
-                units="ratio"
-            ))
+            if ctx.tracing(TraceLevel.FULL):
+                ctx.traces.append(CalculationStep(
+                    step_id="fsi_tod_bonus",
+                    description="TOD zone FSI bonus (within 500m of transit station)",
+                    rule_ids=["udcpr_2020_6.1.5"],
+                    inputs={"tod_zone": True},
+                    result=tod_bonus,
+                    units="ratio"
+                ))
         
         # Redevelopment bonus (UDCPR Clause 8.2.3)
         if project.redevelopment:
             redev_bonus = 0.3
             bonus_fsi += redev_bonus
             bonus_details.append(f"Redevelopment: +{redev_bonus}")
-            self.traces.append(CalculationStep(
-                step_id="fsi_redevelopment_bonus",
-                description="Redevelopment project FSI bonus",
-                rule_ids=["udcpr_2020_8.2.3"],
-                inputs={"redevelopment": True},
-                result=redev_bonus,
-                units="ratio"
-            ))
+            if ctx.tracing(TraceLevel.FULL):
+                ctx.traces.append(CalculationStep(
+                    step_id="fsi_redevelopment_bonus",
+                    description="Redevelopment project FSI bonus",
+                    rule_ids=["udcpr_2020_8.2.3"],
+                    inputs={"redevelopment": True},
+                    result=redev_bonus,
+                    units="ratio"
+                ))
         
         # Slum rehabilitation bonus (UDCPR Clause 9.1.2)
         if project.slum_rehab:
             slum_bonus = 1.0
             bonus_fsi += slum_bonus
             bonus_details.append(f"Slum Rehab: +{slum_bonus}")
-            self.traces.append(CalculationStep(
-                step_id="fsi_slum_rehab_bonus",
-                description="Slum rehabilitation FSI bonus",
-                rule_ids=["udcpr_2020_9.1.2"],
-                inputs={"slum_rehab": True},
-                result=slum_bonus,
-                units="ratio"
-            ))
+            if ctx.tracing(TraceLevel.FULL):
+                ctx.traces.append(CalculationStep(
+                    step_id="fsi_slum_rehab_bonus",
+                    description="Slum rehabilitation FSI bonus",
+                    rule_ids=["udcpr_2020_9.1.2"],
+                    inputs={"slum_rehab": True},
+                    result=slum_bonus,
+                    units="ratio"
+                ))
         
         # Premium FSI (can be purchased up to 20% of base)
         premium_fsi_available = base_fsi * 0.20
@@ -189,15 +552,16 @@ class RuleEngine:
         permissible_built_up = project.plot_area_sqm * permissible_fsi
         proposed_fsi = project.proposed_built_up_sqm / project.plot_area_sqm
         
-        self.traces.append(CalculationStep(
-            step_id="fsi_total",
-            description="Total permissible FSI",
-            rule_ids=["udcpr_2020_3.1.8"],
-            inputs={"base_fsi": base_fsi, "bonus_fsi": bonus_fsi},
-            formula="base_fsi + bonus_fsi",
-            result=permissible_fsi,
-            units="ratio"
-        ))
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="fsi_total",
+                description="Total permissible FSI",
+                rule_ids=["udcpr_2020_3.1.8"],
+                inputs={"base_fsi": base_fsi, "bonus_fsi": bonus_fsi},
+                formula="base_fsi + bonus_fsi",
+                result=permissible_fsi,
+                units="ratio"
+            ))
         
         return {
             "base_fsi": base_fsi,
@@ -211,35 +575,24 @@ class RuleEngine:
             "fsi_utilization_percent": (proposed_fsi / permissible_fsi * 100) if permissible_fsi > 0 else 0
         }
     
-    def _get_base_fsi(self, project: ProjectInput) -> float:
+    def _get_base_fsi(self, project: ProjectInput, ctx: EvaluationContext) -> float:
         """Get base FSI based on use type and plot area."""
         # UDCPR 2020 Clause 3.1 - Base FSI
-        if project.use_type == "Residential":
-            if project.plot_area_sqm <= 300:
-                return 1.0
-            elif project.plot_area_sqm <= 4000:
-                return 1.0
-            else:
-                return 0.8  # Larger plots have lower FSI
-        elif project.use_type == "Commercial":
-            return 1.5
-        elif project.use_type == "Industrial":
-            return 1.0
-        elif project.use_type == "Mixed":
-            return 1.2
-        else:
-            return 1.0
+        table = self._decision_table(project, ctx)
+        return table.base_fsi(project.use_type).lookup(project.plot_area_sqm)
     
-    def calculate_setbacks(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_setbacks(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate required setbacks based on UDCPR 2020 Clause 4.2."""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
+        
         # Front setback based on road width (UDCPR Clause 4.2.1)
-        front = self._calculate_front_setback(project)
+        front = self._calculate_front_setback(project, ctx)
         
         # Side setbacks based on plot area and height (UDCPR Clause 4.2.2)
-        side = self._calculate_side_setback(project)
+        side = self._calculate_side_setback(project, ctx)
         
         # Rear setback (UDCPR Clause 4.2.3)
-        rear = self._calculate_rear_setback(project)
+        rear = self._calculate_rear_setback(project, ctx)
         
         # Calculate total open space
         plot_perimeter = 2 * (project.frontage_m + (project.plot_area_sqm / project.frontage_m))
@@ -255,123 +608,84 @@ class RuleEngine:
             "min_open_space_required_percent": 20.0  # UDCPR minimum
         }
     
-    def _calculate_front_setback(self, project: ProjectInput) -> float:
+    def _calculate_front_setback(self, project: ProjectInput, ctx: EvaluationContext) -> float:
         """Calculate front setback based on road width."""
         # UDCPR 2020 Clause 4.2.1
-        if project.road_width_m >= 30:
-            front = 9.0
-        elif project.road_width_m >= 18:
-            front = 6.0
-        elif project.road_width_m >= 12:
-            front = 4.5
-        elif project.road_width_m >= 9:
-            front = 3.0
-        elif project.road_width_m >= 6:
-            front = 1.5
-        else:
-            front = 1.0
+        front = self._decision_table(project, ctx).front_setback_m.lookup(project.road_width_m)
         
         # Corner plot relaxation (UDCPR Clause 4.5.3)
         if project.corner_plot:
             front = front * 0.75
-            self.traces.append(CalculationStep(
-                step_id="setback_corner_relaxation",
-                description="Corner plot setback relaxation (25% reduction)",
-                rule_ids=["udcpr_2020_4.5.3"],
-                inputs={"corner_plot": True, "original_setback": front / 0.75},
+            if ctx.tracing(TraceLevel.FULL):
+                ctx.traces.append(CalculationStep(
+                    step_id="setback_corner_relaxation",
+                    description="Corner plot setback relaxation (25% reduction)",
+                    rule_ids=["udcpr_2020_4.5.3"],
+                    inputs={"corner_plot": True, "original_setback": front / 0.75},
+                    result=front,
+                    units="m"
+                ))
+        
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="setback_front",
+                description=f"Front setback for road width {project.road_width_m}m",
+                rule_ids=["udcpr_2020_4.2.1"],
+                inputs={"road_width_m": project.road_width_m, "corner_plot": project.corner_plot},
                 result=front,
                 units="m"
             ))
         
-        self.traces.append(CalculationStep(
-            step_id="setback_front",
-            description=f"Front setback for road width {project.road_width_m}m",
-            rule_ids=["udcpr_2020_4.2.1"],
-            inputs={"road_width_m": project.road_width_m, "corner_plot": project.corner_plot},
-            result=front,
-            units="m"
-        ))
-        
         return front
     
-    def _calculate_side_setback(self, project: ProjectInput) -> float:
+    def _calculate_side_setback(self, project: ProjectInput, ctx: EvaluationContext) -> float:
         """Calculate side setback based on plot area and building height."""
         # UDCPR 2020 Clause 4.2.2
-        if project.plot_area_sqm <= 125:
-            side = 0.0  # No side setback for very small plots
-        elif project.plot_area_sqm <= 250:
-            side = 1.0
-        elif project.plot_area_sqm <= 500:
-            side = 1.5
-        else:
-            side = 3.0
+        side = self._decision_table(project, ctx).side_setback_m.lookup(project.plot_area_sqm)
         
         # Additional setback for height (1m per 3m of height above 10m)
         if project.proposed_height_m > 10:
             additional = (project.proposed_height_m - 10) / 3.0
             side += additional
         
-        self.traces.append(CalculationStep(
-            step_id="setback_side",
-            description=f"Side setback for plot area {project.plot_area_sqm} sqm and height {project.proposed_height_m}m",
-            rule_ids=["udcpr_2020_4.2.2"],
-            inputs={"plot_area_sqm": project.plot_area_sqm, "height_m": project.proposed_height_m},
-            result=side,
-            units="m"
-        ))
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="setback_side",
+                description=f"Side setback for plot area {project.plot_area_sqm} sqm and height {project.proposed_height_m}m",
+                rule_ids=["udcpr_2020_4.2.2"],
+                inputs={"plot_area_sqm": project.plot_area_sqm, "height_m": project.proposed_height_m},
+                result=side,
+                units="m"
+            ))
         
         return side
     
-    def _calculate_rear_setback(self, project: ProjectInput) -> float:
+    def _calculate_rear_setback(self, project: ProjectInput, ctx: EvaluationContext) -> float:
         """Calculate rear setback."""
         # UDCPR 2020 Clause 4.2.3 - Rear setback is typically same as side
-        if project.plot_area_sqm <= 125:
-            rear = 1.0  # Minimum rear setback
-        elif project.plot_area_sqm <= 250:
-            rear = 1.5
-        elif project.plot_area_sqm <= 500:
-            rear = 2.0
-        else:
-            rear = 3.0
-        
-        self.traces.append(CalculationStep(
-            step_id="setback_rear",
-            description=f"Rear setback for plot area {project.plot_area_sqm} sqm",
-            rule_ids=["udcpr_2020_4.2.3"],
-            inputs={"plot_area_sqm": project.plot_area_sqm},
-            result=rear,
-            units="m"
-        ))
+        rear = self._decision_table(project, ctx).rear_setback_m.lookup(project.plot_area_sqm)
+        
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="setback_rear",
+                description=f"Rear setback for plot area {project.plot_area_sqm} sqm",
+                rule_ids=["udcpr_2020_4.2.3"],
+                inputs={"plot_area_sqm": project.plot_area_sqm},
+                result=rear,
+                units="m"
+            ))
         
         return rear
     
-    def calculate_parking(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_parking(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate required parking based on UDCPR 2020 Clause 5.3."""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
+        
         # Parking norms based on use type (UDCPR Clause 5.3)
-        if project.use_type == "Residential":
-            # 1 ECS per 100 sqm for residential
-            required_ecs = project.proposed_built_up_sqm / 100
-            norm = "1 ECS per 100 sqm"
-            rule_id = "udcpr_2020_5.3.1"
-        elif project.use_type == "Commercial":
-            # 1 ECS per 50 sqm for commercial
-            required_ecs = project.proposed_built_up_sqm / 50
-            norm = "1 ECS per 50 sqm"
-            rule_id = "udcpr_2020_5.3.2"
-        elif project.use_type == "Industrial":
-            # 1 ECS per 150 sqm for industrial
-            required_ecs = project.proposed_built_up_sqm / 150
-            norm = "1 ECS per 150 sqm"
-            rule_id = "udcpr_2020_5.3.3"
-        elif project.use_type == "Mixed":
-            # Weighted average for mixed use
-            required_ecs = project.proposed_built_up_sqm / 75
-            norm = "1 ECS per 75 sqm (mixed use average)"
-            rule_id = "udcpr_2020_5.3.4"
-        else:
-            required_ecs = project.proposed_built_up_sqm / 100
-            norm = "1 ECS per 100 sqm (default)"
-            rule_id = "udcpr_2020_5.3.1"
+        parking_norm = self._decision_table(project, ctx).parking_norm(project.use_type)
+        required_ecs = project.proposed_built_up_sqm / parking_norm["sqm_per_ecs"]
+        norm = parking_norm["norm"]
+        rule_id = parking_norm["rule_id"]
         
         # Round up to nearest integer
         required_ecs = int(required_ecs) + (1 if required_ecs % 1 > 0 else 0)
@@ -387,14 +701,15 @@ class RuleEngine:
         # Mechanical parking option (UDCPR Clause 5.3.8)
         mechanical_parking_allowed = required_ecs > 20
         
-        self.traces.append(CalculationStep(
-            step_id="parking_calc",
-            description=f"Parking requirement: {norm}",
-            rule_ids=[rule_id],
-            inputs={"use_type": project.use_type, "built_up_sqm": project.proposed_built_up_sqm},
-            result=required_ecs,
-            units="ECS"
-        ))
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="parking_calc",
+                description=f"Parking requirement: {norm}",
+                rule_ids=[rule_id],
+                inputs={"use_type": project.use_type, "built_up_sqm": project.proposed_built_up_sqm},
+                result=required_ecs,
+                units="ECS"
+            ))
         
         return {
             "required_ecs": required_ecs,
@@ -407,56 +722,45 @@ class RuleEngine:
             "parking_floors_needed": int(total_parking_area / project.plot_area_sqm) + 1
         }
     
-    def calculate_height(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_height(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate permissible height based on UDCPR 2020 Clause 7.2."""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
+        
         # Height based on road width (UDCPR Clause 7.2.1)
-        if project.road_width_m >= 30:
-            max_height = 100.0
-            max_floors = 30
-        elif project.road_width_m >= 18:
-            max_height = 70.0
-            max_floors = 21
-        elif project.road_width_m >= 12:
-            max_height = 45.0
-            max_floors = 14
-        elif project.road_width_m >= 9:
-            max_height = 24.0
-            max_floors = 7
-        elif project.road_width_m >= 6:
-            max_height = 15.0
-            max_floors = 4
-        else:
-            max_height = 10.0
-            max_floors = 3
+        table = self._decision_table(project, ctx)
+        max_height = table.max_height_m.lookup(project.road_width_m)
+        max_floors = table.max_floors.lookup(project.road_width_m)
         
         # TOD zone height bonus (UDCPR Clause 6.1.6)
         if project.tod_zone:
             max_height = max_height * 1.5
             max_floors = int(max_floors * 1.5)
-            self.traces.append(CalculationStep(
-                step_id="height_tod_bonus",
-                description="TOD zone height bonus (50% increase)",
-                rule_ids=["udcpr_2020_6.1.6"],
-                inputs={"tod_zone": True, "base_height": max_height / 1.5},
-                result=max_height,
-                units="m"
-            ))
+            if ctx.tracing(TraceLevel.FULL):
+                ctx.traces.append(CalculationStep(
+                    step_id="height_tod_bonus",
+                    description="TOD zone height bonus (50% increase)",
+                    rule_ids=["udcpr_2020_6.1.6"],
+                    inputs={"tod_zone": True, "base_height": max_height / 1.5},
+                    result=max_height,
+                    units="m"
+                ))
         
         # Calculate floor-to-floor height
         avg_floor_height = project.proposed_height_m / project.proposed_floors if project.proposed_floors > 0 else 3.0
         
         # Check if floor height is adequate (min 2.75m for residential, 3.0m for commercial)
-        min_floor_height = 3.0 if project.use_type == "Commercial" else 2.75
+        min_floor_height = table.min_floor_height(project.use_type)
         floor_height_adequate = avg_floor_height >= min_floor_height
         
-        self.traces.append(CalculationStep(
-            step_id="height_calc",
-            description=f"Maximum permissible height for road width {project.road_width_m}m",
-            rule_ids=["udcpr_2020_7.2.1"],
-            inputs={"road_width_m": project.road_width_m},
-            result=max_height,
-            units="m"
-        ))
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="height_calc",
+                description=f"Maximum permissible height for road width {project.road_width_m}m",
+                rule_ids=["udcpr_2020_7.2.1"],
+                inputs={"road_width_m": project.road_width_m},
+                result=max_height,
+                units="m"
+            ))
         
         return {
             "permissible_height_m": max_height,
@@ -469,8 +773,11 @@ class RuleEngine:
             "height_utilization_percent": (project.proposed_height_m / max_height * 100) if max_height > 0 else 0
         }
 
-    def calculate_tdr(self, project: ProjectInput, fsi_result: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_tdr(self, project: ProjectInput, fsi_result: Dict[str, Any],
+                      ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate TDR (Transfer of Development Rights) based on UDCPR 2020 Clause 10."""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
+        
         # TDR is applicable for road widening, heritage conservation, etc.
         # For this implementation, we'll calculate potential TDR if applicable
         
@@ -492,18 +799,19 @@ class RuleEngine:
         # Check if TDR can solve the FSI deficit
         tdr_can_solve_deficit = tdr_needed > 0 and tdr_needed <= max_tdr_loadable
         
-        self.traces.append(CalculationStep(
-            step_id="tdr_analysis",
-            description="TDR eligibility and requirement analysis",
-            rule_ids=["udcpr_2020_10.2.1", "udcpr_2020_10.2.3"],
-            inputs={
-                "plot_area_sqm": project.plot_area_sqm,
-                "can_receive_tdr": can_receive_tdr,
-                "fsi_gap": fsi_gap
-            },
-            result=max_tdr_loadable,
-            units="FSI ratio"
-        ))
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="tdr_analysis",
+                description="TDR eligibility and requirement analysis",
+                rule_ids=["udcpr_2020_10.2.1", "udcpr_2020_10.2.3"],
+                inputs={
+                    "plot_area_sqm": project.plot_area_sqm,
+                    "can_receive_tdr": can_receive_tdr,
+                    "fsi_gap": fsi_gap
+                },
+                result=max_tdr_loadable,
+                units="FSI ratio"
+            ))
         
         return {
             "tdr_eligible": tdr_eligible,
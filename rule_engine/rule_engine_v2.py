@@ -7,13 +7,19 @@ from pydantic import BaseModel
 from datetime import datetime
 import sys
 import os
+import time
 from pathlib import Path
 
 # Add parent directory to path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-from rules_database import get_rules_database
+from rules_database import RulesDatabase
+from rule_versions import VersionedRuleStore
+from evaluation_context import TraceLevel, EvaluationContext
+from decision_tables import JurisdictionTable, compile_decision_tables
+from evaluation_cache import EvaluationCache, project_cache_key
+from evaluation_metrics import PhaseMetrics
 
 class CalculationStep(BaseModel):
     """Single step in calculation trace."""
@@ -70,51 +76,115 @@ class EvaluationResult(BaseModel):
     
     # Calculation traces
     calculation_traces: List[CalculationStep]
+    
+    # Milliseconds per phase, when requested with include_timings
+    phase_timings_ms: Optional[Dict[str, float]] = None
 
 class DatabaseDrivenRuleEngine:
     """Rule engine that uses actual extracted regulations"""
     
-    def __init__(self):
+    def __init__(self, decision_tables: Optional[Dict[str, Any]] = None,
+                 cache_size: int = 1024, cache_ttl_seconds: Optional[float] = 300.0,
+                 rule_store: Optional[VersionedRuleStore] = None):
         """Initialize with rules database"""
-        self.db = get_rules_database()
-        self.traces: List[CalculationStep] = []
+        # Current rules plus archived versions that evaluations can be pinned to
+        self.rule_store = rule_store if rule_store is not None else VersionedRuleStore()
+        self.decision_tables = compile_decision_tables(decision_tables)
+        self.cache = EvaluationCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+        self.metrics = PhaseMetrics()
         print(f"âœ“ Rule engine initialized with {self.db.get_statistics()['total_rules']} regulations")
     
-    def evaluate_project(self, project: ProjectInput, rule_version: str = "database_v1") -> EvaluationResult:
-        """Main evaluation entry point using database"""
-        self.traces = []
-        
-        print(f"\n=== Evaluating Project ===")
-        print(f"Use Type: {project.use_type}")
-        print(f"Plot Area: {project.plot_area_sqm} sqm")
-        print(f"Jurisdiction: {project.jurisdiction}")
+    @property
+    def db(self) -> RulesDatabase:
+        """The current rules database snapshot (picks up reloads)"""
+        return self.rule_store.current()
+    
+    def evaluate_project(self, project: ProjectInput, rule_version: str = "database_v1",
+                         trace_level: TraceLevel = TraceLevel.FULL,
+                         include_timings: bool = False) -> EvaluationResult:
+        """
+        Main evaluation entry point using database
+        
+        trace_level: 'full' records every step and prints diagnostics,
+        'summary' one headline step per module, 'off' nothing
+        
+        rule_version picks the rules to evaluate against: an archived version
+        id, or 'latest'/'database_v1' for the current corpus (ValueError if
+        the version was never archived)
+        
+        Repeat submissions are served from the evaluation cache; entries are
+        keyed by the generation of the rules snapshot they were computed
+        against, so a reload never serves results of the old rules
+        
+        Phase timings (modules, rules_db queries, compliance, total) are always
+        recorded in self.metrics; include_timings also returns them
+        """
+        trace_level = TraceLevel(trace_level)
+        # Pin the rules snapshot for this evaluation; a reload does not affect it
+        rules_db = self.rule_store.get(rule_version)
+        
+        start = time.perf_counter()
+        key = project_cache_key(project, rule_version, trace_level.value, rules_db.generation)
+        cached = self.cache.get(key)
+        if cached is not None:
+            result = cached.model_copy(deep=True)
+            timings = {"cache_hit": (time.perf_counter() - start) * 1000}
+            self.metrics.observe(timings)
+            result.phase_timings_ms = timings if include_timings else None
+            return result
+        
+        generation = self.cache.generation
+        ctx = EvaluationContext(trace_level=trace_level, rules_db=rules_db)
+        with ctx.timed("total"):
+            result = self._evaluate_project(project, rule_version, ctx)
+        # generation only guards against an explicit cache clear during the evaluation
+        self.cache.put(key, result.model_copy(deep=True), generation=generation)
+        
+        self.metrics.observe(ctx.timings)
+        result.phase_timings_ms = dict(ctx.timings) if include_timings else None
+        return result
+    
+    def _evaluate_project(self, project: ProjectInput, rule_version: str,
+                          ctx: EvaluationContext) -> EvaluationResult:
+        """Run every module against the database rules"""
+        if ctx.tracing(TraceLevel.FULL):
+            print(f"\n=== Evaluating Project ===")
+            print(f"Use Type: {project.use_type}")
+            print(f"Plot Area: {project.plot_area_sqm} sqm")
+            print(f"Jurisdiction: {project.jurisdiction}")
         
         # Run all modules with database
-        fsi_result = self.calculate_fsi(project)
-        setback_result = self.calculate_setbacks(project)
-        parking_result = self.calculate_parking(project)
-        height_result = self.calculate_height(project)
-        tdr_result = self.calculate_tdr(project, fsi_result)
+        with ctx.timed("fsi"):
+            fsi_result = ctx.results["fsi"] = self.calculate_fsi(project, ctx)
+        with ctx.timed("setbacks"):
+            setback_result = ctx.results["setbacks"] = self.calculate_setbacks(project, ctx)
+        with ctx.timed("parking"):
+            parking_result = ctx.results["parking"] = self.calculate_parking(project, ctx)
+        with ctx.timed("height"):
+            height_result = ctx.results["height"] = self.calculate_height(project, ctx)
+        with ctx.timed("tdr"):
+            tdr_result = ctx.results["tdr"] = self.calculate_tdr(project, fsi_result, ctx)
         
         # Check compliance
-        violations = []
-        warnings = []
-        
-        # FSI compliance
-        if fsi_result["proposed_fsi"] > fsi_result["permissible_fsi"]:
-            excess = fsi_result["proposed_fsi"] - fsi_result["permissible_fsi"]
-            violations.append(f"FSI exceeds limit by {excess:.2f}: {fsi_result['proposed_fsi']:.2f} > {fsi_result['permissible_fsi']:.2f}")
-        elif fsi_result["fsi_utilization_percent"] < 50:
-            warnings.append(f"Low FSI utilization: {fsi_result['fsi_utilization_percent']:.1f}% - Consider optimizing design")
-        
-        # Height compliance
-        if height_result["proposed_height_m"] > height_result["permissible_height_m"]:
-            excess = height_result["proposed_height_m"] - height_result["permissible_height_m"]
-            violations.append(f"Height exceeds limit by {excess:.1f}m: {height_result['proposed_height_m']:.1f}m > {height_result['permissible_height_m']:.1f}m")
-        
-        # Parking compliance
-        if parking_result.get("parking_deficit_sqm", 0) > 0:
-            warnings.append(f"Parking deficit: {parking_result['parking_deficit_sqm']:.0f} sqm - Consider mechanical parking")
+        with ctx.timed("compliance"):
+            violations = []
+            warnings = []
+        
+            # FSI compliance
+            if fsi_result["proposed_fsi"] > fsi_result["permissible_fsi"]:
+                excess = fsi_result["proposed_fsi"] - fsi_result["permissible_fsi"]
+                violations.append(f"FSI exceeds limit by {excess:.2f}: {fsi_result['proposed_fsi']:.2f} > {fsi_result['permissible_fsi']:.2f}")
+            elif fsi_result["fsi_utilization_percent"] < 50:
+                warnings.append(f"Low FSI utilization: {fsi_result['fsi_utilization_percent']:.1f}% - Consider optimizing design")
+        
+            # Height compliance
+            if height_result["proposed_height_m"] > height_result["permissible_height_m"]:
+                excess = height_result["proposed_height_m"] - height_result["permissible_height_m"]
+                violations.append(f"Height exceeds limit by {excess:.1f}m: {height_result['proposed_height_m']:.1f}m > {height_result['permissible_height_m']:.1f}m")
+        
+            # Parking compliance
+            if parking_result.get("parking_deficit_sqm", 0) > 0:
+                warnings.append(f"Parking deficit: {parking_result['parking_deficit_sqm']:.0f} sqm - Consider mechanical parking")
         
         return EvaluationResult(
             project_id="temp",
@@ -128,28 +198,31 @@ class DatabaseDrivenRuleEngine:
             compliant=len(violations) == 0,
             violations=violations,
             warnings=warnings,
-            calculation_traces=self.traces
+            calculation_traces=ctx.traces
         )
     
-    def calculate_fsi(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_fsi(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate FSI using database regulations"""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
         
         # Get base FSI from database
-        base_fsi_data = self.db.get_base_fsi(project.use_type, project.plot_area_sqm, project.jurisdiction)
+        with ctx.timed("rules_db"):
+            base_fsi_data = self._rules_db(ctx).get_base_fsi(project.use_type, project.plot_area_sqm, project.jurisdiction)
         base_fsi = base_fsi_data['base_fsi']
         
-        self.traces.append(CalculationStep(
-            step_id="fsi_base_database",
-            description=f"Base FSI for {project.use_type} from regulations database",
-            rule_ids=base_fsi_data['applied_rules'],
-            inputs={"use_type": project.use_type, "plot_area_sqm": project.plot_area_sqm},
-            result=base_fsi,
-            units="ratio"
-        ))
-        
-        print(f"\nâœ“ Base FSI: {base_fsi} (from {base_fsi_data['source']})")
-        print(f"  Applied Rules: {base_fsi_data['applied_rules']}")
-        print(f"  Rule Text: {base_fsi_data['rule_text'][:100]}...")
+        if ctx.tracing(TraceLevel.FULL):
+            ctx.traces.append(CalculationStep(
+                step_id="fsi_base_database",
+                description=f"Base FSI for {project.use_type} from regulations database",
+                rule_ids=base_fsi_data['applied_rules'],
+                inputs={"use_type": project.use_type, "plot_area_sqm": project.plot_area_sqm},
+                result=base_fsi,
+                units="ratio"
+            ))
+            
+            print(f"\nâœ“ Base FSI: {base_fsi} (from {base_fsi_data['source']})")
+            print(f"  Applied Rules: {base_fsi_data['applied_rules']}")
+            print(f"  Rule Text: {base_fsi_data['rule_text'][:100]}...")
         
         # Calculate bonuses from database
         bonus_fsi = 0.0
@@ -163,22 +236,24 @@ class DatabaseDrivenRuleEngine:
             'affordable_housing': project.affordable_housing
         }
         
-        applicable_bonuses = self.db.get_all_fsi_bonuses(project_conditions)
+        with ctx.timed("rules_db"):
+            applicable_bonuses = self._rules_db(ctx).get_all_fsi_bonuses(project_conditions)
         
         for bonus in applicable_bonuses:
             bonus_fsi += bonus['value']
             bonus_details.append(f"{bonus['type']}: +{bonus['value']}")
             
-            self.traces.append(CalculationStep(
-                step_id=f"fsi_bonus_{bonus['type'].lower().replace(' ', '_')}",
-                description=f"{bonus['type']} FSI bonus from regulations",
-                rule_ids=[bonus['rule_id']],
-                inputs=project_conditions,
-                result=bonus['value'],
-                units="ratio"
-            ))
-        
-        if applicable_bonuses:
+            if ctx.tracing(TraceLevel.FULL):
+                ctx.traces.append(CalculationStep(
+                    step_id=f"fsi_bonus_{bonus['type'].lower().replace(' ', '_')}",
+                    description=f"{bonus['type']} FSI bonus from regulations",
+                    rule_ids=bonus['rule_ids'],
+                    inputs=project_conditions,
+                    result=bonus['value'],
+                    units="ratio"
+                ))
+        
+        if applicable_bonuses and ctx.tracing(TraceLevel.FULL):
             print(f"\nâœ“ FSI Bonuses: {bonus_fsi}")
             for detail in bonus_details:
                 print(f"  {detail}")
@@ -190,15 +265,16 @@ class DatabaseDrivenRuleEngine:
         permissible_built_up = project.plot_area_sqm * permissible_fsi
         proposed_fsi = project.proposed_built_up_sqm / project.plot_area_sqm
         
-        self.traces.append(CalculationStep(
-            step_id="fsi_total",
-            description="Total permissible FSI",
-            rule_ids=base_fsi_data['applied_rules'],
-            inputs={"base_fsi": base_fsi, "bonus_fsi": bonus_fsi},
-            formula="base_fsi + bonus_fsi",
-            result=permissible_fsi,
-            units="ratio"
-        ))
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="fsi_total",
+                description="Total permissible FSI",
+                rule_ids=base_fsi_data['applied_rules'],
+                inputs={"base_fsi": base_fsi, "bonus_fsi": bonus_fsi},
+                formula="base_fsi + bonus_fsi",
+                result=permissible_fsi,
+                units="ratio"
+            ))
         
         return {
             "base_fsi": base_fsi,
@@ -214,27 +290,31 @@ class DatabaseDrivenRuleEngine:
             "fsi_utilization_percent": (proposed_fsi / permissible_fsi * 100) if permissible_fsi > 0 else 0
         }
     
-    def calculate_parking(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_parking(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate parking using database regulations"""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
         
         # Get parking requirements from database
-        parking_data = self.db.get_parking_requirement(project.use_type, project.proposed_built_up_sqm)
+        with ctx.timed("rules_db"):
+            parking_data = self._rules_db(ctx).get_parking_requirement(project.use_type, project.proposed_built_up_sqm)
         
         required_ecs = parking_data['required_ecs']
         norm = parking_data['norm']
         
-        self.traces.append(CalculationStep(
-            step_id="parking_calc_database",
-            description=f"Parking requirement from regulations: {norm}",
-            rule_ids=parking_data['applied_rules'],
-            inputs={"use_type": project.use_type, "built_up_sqm": project.proposed_built_up_sqm},
-            result=required_ecs,
-            units="ECS"
-        ))
+        if ctx.tracing(TraceLevel.SUMMARY):
+            ctx.traces.append(CalculationStep(
+                step_id="parking_calc_database",
+                description=f"Parking requirement from regulations: {norm}",
+                rule_ids=parking_data['applied_rules'],
+                inputs={"use_type": project.use_type, "built_up_sqm": project.proposed_built_up_sqm},
+                result=required_ecs,
+                units="ECS"
+            ))
         
-        print(f"\nâœ“ Parking: {required_ecs} ECS ({norm})")
-        print(f"  Applied Rules: {parking_data['applied_rules']}")
-        print(f"  Source: {parking_data['source']}")
+        if ctx.tracing(TraceLevel.FULL):
+            print(f"\nâœ“ Parking: {required_ecs} ECS ({norm})")
+            print(f"  Applied Rules: {parking_data['applied_rules']}")
+            print(f"  Source: {parking_data['source']}")
         
         # Calculate parking area (1 ECS = 25 sqm including circulation)
         area_per_ecs = 25.0
@@ -260,18 +340,22 @@ class DatabaseDrivenRuleEngine:
             "parking_floors_needed": int(total_parking_area / project.plot_area_sqm) + 1
         }
     
-    def calculate_setbacks(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_setbacks(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate setbacks (using simplified logic for now, can be enhanced with database)"""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
         
         # Query setback rules from database
-        setback_rules = self.db.query_setback_rules(project.zone, project.plot_area_sqm)
+        with ctx.timed("rules_db"):
+            setback_rules = self._rules_db(ctx).query_setback_rules(project.zone, project.plot_area_sqm)
         
-        print(f"\nâœ“ Found {len(setback_rules)} setback rules in database")
+        if ctx.tracing(TraceLevel.FULL):
+            print(f"\nâœ“ Found {len(setback_rules)} setback rules in database")
         
         # For now, use simplified logic (can be enhanced to parse rules)
-        front = self._calculate_front_setback(project)
-        side = self._calculate_side_setback(project)
-        rear = self._calculate_rear_setback(project)
+        table = self._decision_table(project, ctx)
+        front = self._calculate_front_setback(project, table)
+        side = self._calculate_side_setback(project, table)
+        rear = self._calculate_rear_setback(project, table)
         
         # Calculate total open space
         plot_perimeter = 2 * (project.frontage_m + (project.plot_area_sqm / project.frontage_m))
@@ -288,36 +372,30 @@ class DatabaseDrivenRuleEngine:
             "setback_rules_found": len(setback_rules)
         }
     
-    def _calculate_front_setback(self, project: ProjectInput) -> float:
+    def _rules_db(self, ctx: EvaluationContext) -> RulesDatabase:
+        """Rules database snapshot, pinned for the evaluation"""
+        if ctx.rules_db is None:
+            ctx.rules_db = self.db
+        return ctx.rules_db
+    
+    def _decision_table(self, project: ProjectInput, ctx: EvaluationContext) -> JurisdictionTable:
+        """Decision table for the project's jurisdiction, pinned for the evaluation"""
+        if ctx.decision_table is None:
+            ctx.decision_table = self.decision_tables.for_jurisdiction(project.jurisdiction)
+        return ctx.decision_table
+    
+    def _calculate_front_setback(self, project: ProjectInput, table: JurisdictionTable) -> float:
         """Calculate front setback based on road width"""
-        if project.road_width_m >= 30:
-            front = 9.0
-        elif project.road_width_m >= 18:
-            front = 6.0
-        elif project.road_width_m >= 12:
-            front = 4.5
-        elif project.road_width_m >= 9:
-            front = 3.0
-        elif project.road_width_m >= 6:
-            front = 1.5
-        else:
-            front = 1.0
+        front = table.front_setback_m.lookup(project.road_width_m)
         
         if project.corner_plot:
             front = front * 0.75
         
         return front
     
-    def _calculate_side_setback(self, project: ProjectInput) -> float:
+    def _calculate_side_setback(self, project: ProjectInput, table: JurisdictionTable) -> float:
         """Calculate side setback"""
-        if project.plot_area_sqm <= 125:
-            side = 0.0
-        elif project.plot_area_sqm <= 250:
-            side = 1.0
-        elif project.plot_area_sqm <= 500:
-            side = 1.5
-        else:
-            side = 3.0
+        side = table.side_setback_m.lookup(project.plot_area_sqm)
         
         if project.proposed_height_m > 10:
             additional = (project.proposed_height_m - 10) / 3.0
@@ -325,46 +403,25 @@ class DatabaseDrivenRuleEngine:
         
         return side
     
-    def _calculate_rear_setback(self, project: ProjectInput) -> float:
+    def _calculate_rear_setback(self, project: ProjectInput, table: JurisdictionTable) -> float:
         """Calculate rear setback"""
-        if project.plot_area_sqm <= 125:
-            rear = 1.0
-        elif project.plot_area_sqm <= 250:
-            rear = 1.5
-        elif project.plot_area_sqm <= 500:
-            rear = 2.0
-        else:
-            rear = 3.0
-        
-        return rear
+        return table.rear_setback_m.lookup(project.plot_area_sqm)
     
-    def calculate_height(self, project: ProjectInput) -> Dict[str, Any]:
+    def calculate_height(self, project: ProjectInput, ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate height (using simplified logic for now, can be enhanced with database)"""
+        ctx = ctx or EvaluationContext(trace_level=TraceLevel.OFF)
         
         # Query height rules from database
-        height_rules = self.db.query_height_rules(project.zone, project.road_width_m)
-        
-        print(f"\nâœ“ Found {len(height_rules)} height rules in database")
-        
-        # For now, use simplified logic
-        if project.road_width_m >= 30:
-            max_height = 100.0
-            max_floors = 30
-        elif project.road_width_m >= 18:
-            max_height = 70.0
-            max_floors = 21
-        elif project.road_width_m >= 12:
-            max_height = 45.0
-            max_floors = 14
-        elif project.road_width_m >= 9:
-            max_height = 24.0
-            max_floors = 7
-        elif project.road_width_m >= 6:
-            max_height = 15.0
-            max_floors = 4
-        else:
-            max_height = 10.0
-            max_floors = 3
+        with ctx.timed("rules_db"):
+            height_rules = self._rules_db(ctx).query_height_rules(project.zone, project.road_width_m)
+        
+        if ctx.tracing(TraceLevel.FULL):
+            print(f"\nâœ“ Found {len(height_rules)} height rules in database")
+        
+        # Height brackets from the jurisdiction's decision table
+        table = self._decision_table(project, ctx)
+        max_height = table.max_height_m.lookup(project.road_width_m)
+        max_floors = table.max_floors.lookup(project.road_width_m)
         
         # TOD zone height bonus
         if project.tod_zone:
@@ -375,7 +432,7 @@ class DatabaseDrivenRuleEngine:
         avg_floor_height = project.proposed_height_m / project.proposed_floors if project.proposed_floors > 0 else 3.0
         
         # Check if floor height is adequate
-        min_floor_height = 3.0 if project.use_type == "Commercial" else 2.75
+        min_floor_height = table.min_floor_height(project.use_type)
         floor_height_adequate = avg_floor_height >= min_floor_height
         
         return {
@@ -390,7 +447,8 @@ class DatabaseDrivenRuleEngine:
             "height_rules_found": len(height_rules)
         }
     
-    def calculate_tdr(self, project: ProjectInput, fsi_result: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_tdr(self, project: ProjectInput, fsi_result: Dict[str, Any],
+                      ctx: Optional[EvaluationContext] = None) -> Dict[str, Any]:
         """Calculate TDR"""
         tdr_eligible = False
         tdr_fsi_available = 0.0
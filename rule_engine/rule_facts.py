@@ -0,0 +1,177 @@
+"""
+Rule Facts - Numeric values extracted from the approved rules at load time
+
+The enhanced lookups and the validation layer used to run their FSI, parking,
+setback and height regexes against candidate clause texts on every query. The
+fact table runs them once per rule when the corpus loads and keeps each value
+with the context it was found in, keyed by rule id and category, so queries
+only pick from pre-extracted values.
+
+Facts of a category are stored in the order the original extractors
+considered them, so "first fact of the preferred context" reproduces their
+results exactly.
+"""
+import re
+import sys
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Container, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from keyword_matcher import KeywordClassifier
+
+class FactCategory(str, Enum):
+    """What a numeric fact measures"""
+    FSI = "fsi"
+    PARKING = "parking"
+    SETBACK = "setback"
+    HEIGHT = "height"
+
+@dataclass(frozen=True)
+class RuleFact:
+    """One numeric value found in a rule's clause text"""
+    value: float
+    context: str  # How the value was stated, e.g. 'basic', 'maximum', 'per_ecs', 'front'
+
+# FSI: "FSI shall be X", "basic FSI X", "FSI up to X"; 'mention' is any number after "FSI"
+_FSI_PATTERNS = (
+    ('explicit', re.compile(r'fsi\s+(?:permissible\s+)?(?:shall\s+be|is|of)\s+(\d+\.?\d*)')),
+    ('basic', re.compile(r'(?:basic|base)\s+fsi\s+(?:of\s+)?(\d+\.?\d*)')),
+    ('maximum', re.compile(r'fsi\s+up\s+to\s+(\d+\.?\d*)'))
+)
+_FSI_MENTION = re.compile(r'fsi.*?(\d+\.?\d*)')
+FSI_RANGE = (0.1, 10.0)
+
+# Parking: "1 ECS per X sqm" / "X sqm per ECS"; 'mention' is "1 ECS per X" without units
+_PARKING_PATTERNS = (
+    ('per_ecs', re.compile(r'1\s+(?:ecs|equivalent\s+car\s+space)\s+per\s+(\d+)\s*(?:sq\.?\s*m|sqm)')),
+    ('per_ecs', re.compile(r'(\d+)\s*(?:sq\.?\s*m|sqm)\s+per\s+(?:ecs|equivalent\s+car\s+space)'))
+)
+_ECS_MENTION = re.compile(r'1\s+ecs\s+per\s+(\d+)')
+
+_SETBACK_PATTERNS = tuple(
+    (side, re.compile(side + r'\s+(?:setback|margin)\s+(?:of\s+)?(\d+\.?\d*)\s*(?:m|meter)'))
+    for side in ('front', 'side', 'rear')
+)
+
+_HEIGHT_PATTERNS = (
+    ('maximum', re.compile(r'maximum\s+height\s+(?:of\s+)?(\d+\.?\d*)\s*(?:m|meter)')),
+    ('not_exceed', re.compile(r'height\s+shall\s+not\s+exceed\s+(\d+\.?\d*)\s*(?:m|meter)')),
+    ('up_to', re.compile(r'up\s+to\s+(\d+\.?\d*)\s*(?:m|meter)\s+height'))
+)
+
+# Keywords a clause text must contain for a category's patterns to be tried
+FACT_KEYWORDS = {
+    FactCategory.FSI: ('fsi',),
+    FactCategory.PARKING: ('ecs', 'equivalent'),
+    FactCategory.SETBACK: ('setback', 'margin'),
+    FactCategory.HEIGHT: ('height',)
+}
+_FACT_CLASSIFIER = KeywordClassifier(FACT_KEYWORDS)
+
+def _matches(patterns: Iterable[Tuple[str, Any]], text: str) -> List[RuleFact]:
+    return [RuleFact(float(match), context)
+            for context, pattern in patterns
+            for match in pattern.findall(text)]
+
+def extract_facts(clause_text: str) -> Dict[FactCategory, Tuple[RuleFact, ...]]:
+    """All numeric facts in a clause text, by category (categories without facts omitted)"""
+    text = (clause_text or '').lower()
+    facts: Dict[FactCategory, List[RuleFact]] = {}
+    mentioned = _FACT_CLASSIFIER.classify(text)
+
+    if FactCategory.FSI in mentioned:
+        low, high = FSI_RANGE
+        fsi = [f for f in _matches(_FSI_PATTERNS, text) if low <= f.value <= high]
+        fsi += [RuleFact(float(m), 'mention') for m in _FSI_MENTION.findall(text)]
+        facts[FactCategory.FSI] = fsi
+    if FactCategory.PARKING in mentioned:
+        parking = _matches(_PARKING_PATTERNS, text)
+        parking += [RuleFact(float(m), 'mention') for m in _ECS_MENTION.findall(text)]
+        facts[FactCategory.PARKING] = parking
+    if FactCategory.SETBACK in mentioned:
+        facts[FactCategory.SETBACK] = _matches(_SETBACK_PATTERNS, text)
+    if FactCategory.HEIGHT in mentioned:
+        facts[FactCategory.HEIGHT] = _matches(_HEIGHT_PATTERNS, text)
+
+    return {category: tuple(values) for category, values in facts.items() if values}
+
+def first_fact(facts: Iterable[RuleFact], contexts: Iterable[str]) -> Optional[RuleFact]:
+    """First fact stated in any of the contexts, trying contexts in preference order"""
+    facts = tuple(facts)
+    for context in contexts:
+        for fact in facts:
+            if fact.context == context:
+                return fact
+    return None
+
+def select_fsi(facts: Iterable[RuleFact]) -> Optional[Tuple[float, str]]:
+    """Base FSI as (value, context): an explicit or basic statement before a maximum"""
+    facts = [f for f in facts if f.context != 'mention']
+    for fact in facts:
+        if fact.context in ('basic', 'explicit'):
+            return (fact.value, fact.context)
+    return (facts[0].value, facts[0].context) if facts else None
+
+def select_parking_ratio(facts: Iterable[RuleFact]) -> Optional[Tuple[float, str]]:
+    """Parking ratio as (sqm per ECS, 'per_ecs')"""
+    fact = first_fact(facts, ('per_ecs',))
+    return (fact.value, fact.context) if fact else None
+
+def select_setbacks(facts: Iterable[RuleFact]) -> Dict[str, Optional[float]]:
+    """First front, side and rear setback (None where not stated)"""
+    facts = tuple(facts)
+    setbacks = {}
+    for side in ('front', 'side', 'rear'):
+        fact = first_fact(facts, (side,))
+        setbacks[side] = fact.value if fact else None
+    return setbacks
+
+def select_height_limit(facts: Iterable[RuleFact]) -> Optional[Tuple[float, str]]:
+    """Height limit as (metres, context), preferring maximum, then not_exceed, then up_to"""
+    fact = first_fact(facts, ('maximum', 'not_exceed', 'up_to'))
+    return (fact.value, fact.context) if fact else None
+
+class RuleFactTable:
+    """Numeric facts of every rule, keyed by rule id and category"""
+
+    def __init__(self):
+        self._facts: Dict[Tuple[str, FactCategory], Tuple[RuleFact, ...]] = {}
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[Mapping[str, Any]], previous: Optional["RuleFactTable"] = None,
+                   unchanged: Container[int] = ()) -> "RuleFactTable":
+        """
+        Extract the facts of every rule with a rule_id.
+
+        Rules whose id() is in unchanged are rule objects carried over from the
+        load previous was built from, and keep their facts from it.
+        """
+        table = cls()
+        for rule in rules:
+            rule_id = rule.get('rule_id')
+            if rule_id is None:
+                continue
+            if previous is not None and id(rule) in unchanged:
+                for category in FactCategory:
+                    facts = previous._facts.get((rule_id, category))
+                    if facts:
+                        table._facts[(rule_id, category)] = facts
+                continue
+            for category, facts in extract_facts(rule.get('clause_text', '')).items():
+                table._facts[(rule_id, category)] = facts
+        return table
+
+    def get(self, rule_id: str, category: FactCategory) -> Tuple[RuleFact, ...]:
+        """Facts of one category for a rule, in extraction order (empty if none)"""
+        return self._facts.get((rule_id, category), ())
+
+    def values(self, rule_id: str, category: FactCategory, context: str) -> List[float]:
+        """Values of a rule's facts stated in one context"""
+        return [fact.value for fact in self.get(rule_id, category) if fact.context == context]
+
+    def __len__(self) -> int:
+        return sum(len(facts) for facts in self._facts.values())
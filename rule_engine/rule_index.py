@@ -0,0 +1,170 @@
+"""
+Rule Index - Inverted keyword index over the approved rules
+
+The category queries used to lowercase and concatenate title and clause text
+for every rule on every call. The index does that once at load time and keeps
+token -> rule-position posting lists, so a keyword query touches only the rules
+that can match.
+
+Each rule is also classified once into a RuleCategory bitmask, so category
+counts and filters no longer stringify the whole rule dict per call.
+
+Queries keep the original substring semantics ('all' still matches "shall"):
+tokens are maximal runs of word characters, so a word-only keyword can only
+occur inside a single token, and its matches are the union of the postings of
+every vocabulary token containing it. Keywords with several words are narrowed
+with the posting lists of each word and then verified against the text.
+"""
+import re
+import sys
+from array import array
+from enum import IntFlag
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Sequence, Set
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from keyword_matcher import KeywordClassifier
+
+_TOKEN = re.compile(r"\w+")
+
+# Distinct keywords whose matches are memoized (category keywords, use types, searches)
+MAX_CACHED_KEYWORDS = 4096
+
+class RuleCategory(IntFlag):
+    """Regulation categories a rule mentions anywhere in its record"""
+    NONE = 0
+    FSI = 1
+    PARKING = 2
+    SETBACK = 4
+    HEIGHT = 8
+    BONUS = 16
+    COVERAGE = 32
+
+# Substrings of str(rule).lower() that put a rule in each category
+CATEGORY_KEYWORDS = {
+    RuleCategory.FSI: ('fsi',),
+    RuleCategory.PARKING: ('parking',),
+    RuleCategory.SETBACK: ('setback',),
+    RuleCategory.HEIGHT: ('height',),
+    RuleCategory.BONUS: ('bonus', 'additional fsi', 'premium fsi', 'tod', 'redevelopment',
+                         'slum', 'green building', 'affordable', 'heritage'),
+    RuleCategory.COVERAGE: ('coverage',)
+}
+_CATEGORY_CLASSIFIER = KeywordClassifier(CATEGORY_KEYWORDS)
+
+def classify_rule(rule: Dict[str, Any]) -> int:
+    """
+    Category bitmask for a rule.
+
+    Matches against the whole record (title, clause text, source_pdf, parsed
+    fields), as the per-call str(rule) scans it replaces did.
+    """
+    mask = 0
+    for category in _CATEGORY_CLASSIFIER.classify(str(rule).lower()):
+        mask |= int(category)
+    return mask
+
+def count_by_category(masks: Iterable[int]) -> Dict[RuleCategory, int]:
+    """Number of rules in each category"""
+    bits = [(category, int(category)) for category in CATEGORY_KEYWORDS]
+    counts = [0] * len(bits)
+    for mask in masks:
+        for i, (_, bit) in enumerate(bits):
+            if mask & bit:
+                counts[i] += 1
+    return {category: count for (category, _), count in zip(bits, counts)}
+
+def rule_search_text(rule: Mapping[str, Any]) -> str:
+    """Lowercased title + clause text that keyword queries match against"""
+    return ((rule.get('title') or '') + ' ' + (rule.get('clause_text') or '')).lower()
+
+class SearchTexts(Sequence):
+    """rule_search_text of each rule, derived on access instead of stored"""
+
+    def __init__(self, rules: Sequence[Mapping[str, Any]]):
+        self.rules = rules
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [rule_search_text(rule) for rule in self.rules[position]]
+        return rule_search_text(self.rules[position])
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+class KeywordIndex:
+    """Token -> rule position postings with substring-exact keyword lookup"""
+
+    def __init__(self, texts: Sequence[str]):
+        self.texts: Sequence[str] = list(texts)
+        postings: Dict[str, List[int]] = {}
+        for position, text in enumerate(self.texts):
+            for token in set(_TOKEN.findall(text)):
+                postings.setdefault(token, []).append(position)
+        # Unsigned int arrays: 4 bytes per entry, and no per-entry objects to refcount
+        self.postings: Dict[str, Sequence[int]] = {token: array('I', positions)
+                                                   for token, positions in postings.items()}
+        self._fragment_cache: Dict[str, FrozenSet[int]] = {}
+        self._keyword_cache: Dict[str, FrozenSet[int]] = {}
+
+    @classmethod
+    def from_rules(cls, rules: Sequence[Dict[str, Any]]) -> "KeywordIndex":
+        """Build the index over rule_search_text of each rule"""
+        return cls([rule_search_text(rule) for rule in rules])
+
+    def read_texts_from(self, rules: Sequence[Mapping[str, Any]]) -> None:
+        """
+        Drop the stored texts and derive them from rules when a query needs
+        them (multi-word and punctuation keywords only). rules must be in the
+        same order as the texts the index was built from.
+        """
+        self.texts = SearchTexts(rules)
+
+    def _containing_fragment(self, fragment: str) -> FrozenSet[int]:
+        """Rules with a token that contains fragment (a run of word characters)"""
+        matches = self._fragment_cache.get(fragment)
+        if matches is None:
+            exact = self.postings.get(fragment, ())
+            matches = set(exact)
+            for token, positions in self.postings.items():
+                if fragment in token and token != fragment:
+                    matches.update(positions)
+            matches = frozenset(matches)
+            if len(self._fragment_cache) < MAX_CACHED_KEYWORDS:
+                self._fragment_cache[fragment] = matches
+        return matches
+
+    def containing(self, keyword: str) -> FrozenSet[int]:
+        """Positions of rules whose text contains keyword as a substring"""
+        keyword = keyword.lower()
+        matches = self._keyword_cache.get(keyword)
+        if matches is not None:
+            return matches
+
+        fragments = _TOKEN.findall(keyword)
+        if not fragments:
+            # Punctuation-only keyword: nothing to look up, scan the texts
+            matches = frozenset(i for i, text in enumerate(self.texts) if keyword in text)
+        else:
+            # Most selective fragment first keeps the intersections small
+            candidate_sets = sorted((self._containing_fragment(f) for f in fragments), key=len)
+            candidates: Set[int] = set(candidate_sets[0])
+            for other in candidate_sets[1:]:
+                candidates &= other
+            if fragments == [keyword]:
+                matches = frozenset(candidates)
+            else:
+                matches = frozenset(i for i in candidates if keyword in self.texts[i])
+
+        if len(self._keyword_cache) < MAX_CACHED_KEYWORDS:
+            self._keyword_cache[keyword] = matches
+        return matches
+
+    def any_of(self, keywords: Iterable[str]) -> Set[int]:
+        """Positions of rules containing at least one of the keywords"""
+        matches: Set[int] = set()
+        for keyword in keywords:
+            matches |= self.containing(keyword)
+        return matches
@@ -0,0 +1,385 @@
+"""
+Rule Pack - The approved rule corpus packed into one checksummed file
+
+Loading approved_rules used to open and parse thousands of pretty-printed JSON
+files. build_rule_pack writes the same rules into a single file:
+
+    header   magic, format version, rule count, index offset/length, sha256
+    payload  one JSON array of compact rule records
+    index    JSON: per rule [rule_id, offset, length, source file number] into
+             the payload, plus a manifest of the source files (name, size, mtime_ns)
+
+The payload is one JSON array, so loading every rule is a single json.loads over
+the memory-mapped file, and the offset index still allows reading one record.
+The checksum covers payload and index; a corrupt pack, or one whose manifest no
+longer matches the rules directory, is ignored and load_rules falls back to the
+JSON files.
+
+A pack also backs metadata-only rule tables: LazyRule keeps a few resident
+fields per rule in memory and parses the rest of the record from the mapped
+file when a caller reads it, with a bounded cache of recently read records.
+
+Reloads are incremental: open_rules can take the RuleSources of the previous
+load and re-parses only the JSON files whose size or mtime changed, carrying
+the rule dicts of every other file over as the same objects.
+
+Build (or rebuild after approving rules) from the repository root:
+
+    python rule_engine/rule_pack.py
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+PACK_MAGIC = b"UDCPRPAK"
+PACK_VERSION = 2
+PACK_SUFFIX = ".pack"
+
+# magic, version, rule count, index offset, index length, sha256(payload + index)
+_HEADER = struct.Struct("<8sIIQQ32s")
+
+# Fields a LazyRule keeps in memory; everything else is read from the pack
+RESIDENT_FIELDS = ('rule_id', 'jurisdiction', 'clause_number')
+
+# Parsed records kept per pack for LazyRule reads
+RECORD_CACHE_SIZE = 1024
+
+PathLike = Union[str, Path]
+RecordType = Callable[[Dict[str, Any]], Any]
+
+class RulePackError(Exception):
+    """Raised when a rule pack is missing, corrupt or of an unknown format"""
+    pass
+
+@dataclass
+class RuleSource:
+    """Rules read from one JSON file, with the file's size and mtime when it was read"""
+    size: int
+    mtime_ns: int
+    rules: List[Dict[str, Any]]
+
+    def is_current(self, size: int, mtime_ns: int) -> bool:
+        """True if the file still has the size and mtime its rules were read at"""
+        return self.size == size and self.mtime_ns == mtime_ns
+
+def default_pack_path(rules_dir: PathLike) -> Path:
+    """Pack file next to the rules directory (approved_rules -> approved_rules.pack)"""
+    rules_dir = Path(rules_dir)
+    return rules_dir.parent / (rules_dir.name + PACK_SUFFIX)
+
+def source_manifest(rules_dir: PathLike) -> List[List[Any]]:
+    """[name, size, mtime_ns] of every rule JSON file, sorted by name"""
+    manifest = []
+    with os.scandir(rules_dir) as entries:
+        for entry in entries:
+            # Same files as Path.glob("*.json"), which skips hidden names
+            if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file():
+                stat = entry.stat()
+                manifest.append([entry.name, stat.st_size, stat.st_mtime_ns])
+    manifest.sort()
+    return manifest
+
+def read_rule_file(json_file: PathLike) -> List[Dict[str, Any]]:
+    """
+    Parse one rule JSON file (a rule or a list of rules).
+
+    Failures are reported, and the file (or the non-rule items in it) skipped.
+    """
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Error loading {json_file}: {e}")
+        return []
+    rules = []
+    for rule in (data if isinstance(data, list) else [data]):
+        if isinstance(rule, dict):
+            rules.append(rule)
+        else:
+            print(f"Error loading {json_file}: expected a rule object, got {type(rule).__name__}")
+    return rules
+
+def read_rule_files(rules_dir: PathLike) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+    """Parse the rule JSON files in name order, yielding (file, rule)"""
+    rules_dir = Path(rules_dir)
+    for json_file in sorted(rules_dir.glob("*.json")):
+        for rule in read_rule_file(json_file):
+            yield json_file, rule
+
+def build_rule_pack(rules_dir: PathLike, pack_path: Optional[PathLike] = None) -> Path:
+    """
+    Pack every rule JSON file in rules_dir into pack_path.
+
+    The pack is written to a temporary file and renamed into place, so readers
+    never see a partially written pack.
+    """
+    rules_dir = Path(rules_dir)
+    pack_path = Path(pack_path) if pack_path else default_pack_path(rules_dir)
+    manifest = source_manifest(rules_dir)
+
+    records: List[bytes] = []
+    owners: List[Tuple[Optional[str], int]] = []
+    for file_number, (name, _, _) in enumerate(manifest):
+        for rule in read_rule_file(rules_dir / name):
+            records.append(json.dumps(rule, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            owners.append((rule.get('rule_id'), file_number))
+
+    # Payload is a JSON array; entries point at each record inside it
+    entries = []
+    offset = _HEADER.size + 1
+    for (rule_id, file_number), record in zip(owners, records):
+        entries.append([rule_id, offset, len(record), file_number])
+        offset += len(record) + 1
+    payload = b"[" + b",".join(records) + b"]"
+
+    index = json.dumps({
+        "source_dir": rules_dir.name,
+        "files": manifest,
+        "rules": entries
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    digest = hashlib.sha256(payload + index).digest()
+    header = _HEADER.pack(PACK_MAGIC, PACK_VERSION, len(records),
+                          _HEADER.size + len(payload), len(index), digest)
+
+    tmp_path = pack_path.with_name(pack_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+        f.write(index)
+    os.replace(tmp_path, pack_path)
+    return pack_path
+
+class RulePack:
+    """Read-only view of a memory-mapped rule pack"""
+
+    def __init__(self, pack_path: PathLike, verify_checksum: bool = True,
+                 record_cache_size: int = RECORD_CACHE_SIZE):
+        self.path = Path(pack_path)
+        self.cached_record = lru_cache(maxsize=record_cache_size)(self.record)
+        try:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise RulePackError(f"Cannot open rule pack {self.path}: {e}") from e
+
+        try:
+            self._read_header(verify_checksum)
+        except RulePackError:
+            self.close()
+            raise
+
+    def _read_header(self, verify_checksum: bool) -> None:
+        if len(self._mmap) < _HEADER.size:
+            raise RulePackError(f"{self.path} is too short to be a rule pack")
+        magic, version, count, index_offset, index_length, digest = _HEADER.unpack_from(self._mmap)
+        if magic != PACK_MAGIC:
+            raise RulePackError(f"{self.path} is not a rule pack")
+        if version != PACK_VERSION:
+            raise RulePackError(f"{self.path} has unsupported pack version {version}")
+        if index_offset + index_length != len(self._mmap):
+            raise RulePackError(f"{self.path} is truncated")
+        if verify_checksum and hashlib.sha256(self._mmap[_HEADER.size:]).digest() != digest:
+            raise RulePackError(f"{self.path} failed its checksum")
+
+        index = json.loads(self._mmap[index_offset:index_offset + index_length])
+        self.source_dir: str = index["source_dir"]
+        self.files: List[List[Any]] = index["files"]
+        self.entries: List[List[Any]] = index["rules"]
+        if len(self.entries) != count:
+            raise RulePackError(f"{self.path} index does not match its rule count")
+        self._payload = (_HEADER.size, index_offset)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def rule_ids(self) -> List[Optional[str]]:
+        """rule_id of every packed rule, in pack order"""
+        return [entry[0] for entry in self.entries]
+
+    def record(self, position: int) -> Dict[str, Any]:
+        """Parse the rule at position from its offset"""
+        _, offset, length, _ = self.entries[position]
+        return json.loads(self._mmap[offset:offset + length])
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Parse every rule in one pass over the payload"""
+        start, end = self._payload
+        return json.loads(self._mmap[start:end])
+
+    def sources(self, rules: List[Dict[str, Any]]) -> Dict[str, RuleSource]:
+        """
+        Group rules, which must be this pack's records in pack order, by the
+        source file they were packed from.
+        """
+        sources = {name: RuleSource(size, mtime_ns, []) for name, size, mtime_ns in self.files}
+        for entry, rule in zip(self.entries, rules):
+            sources[self.files[entry[3]][0]].rules.append(rule)
+        return sources
+
+    def metadata_only(self, rules: List[Dict[str, Any]]) -> List["LazyRule"]:
+        """
+        LazyRule views of rules, which must be this pack's records in pack order
+        (as returned by load_all).
+        """
+        return [LazyRule({field: rule[field] for field in RESIDENT_FIELDS if field in rule}, self, position)
+                for position, rule in enumerate(rules)]
+
+    def matches(self, rules_dir: PathLike) -> bool:
+        """True if the pack was built from the current contents of rules_dir"""
+        return self.files == source_manifest(rules_dir)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "RulePack":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class LazyRule(Mapping):
+    """
+    Read-only rule record whose resident fields stay in memory.
+
+    Any other field (clause text, source_pdf, parsed, ...) is parsed from the
+    pack on access, so it behaves like the rule dict, including str(rule).
+    """
+    __slots__ = ('_resident', '_pack', '_position')
+
+    def __init__(self, resident: Dict[str, Any], pack: RulePack, position: int):
+        self._resident = resident
+        self._pack = pack
+        self._position = position
+
+    def record(self) -> Dict[str, Any]:
+        """The full rule record (shared; do not modify)"""
+        return self._pack.cached_record(self._position)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._resident:
+            return self._resident[key]
+        return self.record()[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._resident:
+            return self._resident[key]
+        return self.record().get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._resident or key in self.record()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.record())
+
+    def __len__(self) -> int:
+        return len(self.record())
+
+    def __repr__(self) -> str:
+        return repr(self.record())
+
+def open_current_pack(rules_dir: PathLike, pack_path: Optional[PathLike] = None) -> Optional[RulePack]:
+    """
+    Open the pack for rules_dir if it exists, is intact and is up to date.
+
+    Returns None (after reporting why) when the JSON files should be read instead.
+    """
+    pack_path = Path(pack_path) if pack_path else default_pack_path(rules_dir)
+    if not pack_path.exists():
+        return None
+    try:
+        pack = RulePack(pack_path)
+    except RulePackError as e:
+        print(f"Warning: {e}. Loading rules from JSON files.")
+        return None
+    if not pack.matches(rules_dir):
+        print(f"Warning: {pack_path} is out of date with {rules_dir}. Loading rules from JSON files.")
+        pack.close()
+        return None
+    return pack
+
+def read_changed_rules(rules_dir: PathLike, previous: Mapping,
+                       record_type: Optional[RecordType] = None
+                       ) -> Tuple[List[Dict[str, Any]], Dict[str, RuleSource], int]:
+    """
+    All rules in rules_dir, re-parsing only files that are new or whose size or
+    mtime differ from their previous RuleSource. Rules of unchanged files are
+    the previous rule objects. Also returns how many files were parsed.
+
+    record_type, if given, converts each newly parsed rule dict.
+    """
+    rules_dir = Path(rules_dir)
+    rules: List[Dict[str, Any]] = []
+    sources: Dict[str, RuleSource] = {}
+    reparsed = 0
+    for name, size, mtime_ns in source_manifest(rules_dir):
+        source = previous.get(name)
+        if source is None or not source.is_current(size, mtime_ns):
+            parsed = read_rule_file(rules_dir / name)
+            if record_type is not None:
+                parsed = [record_type(rule) for rule in parsed]
+            source = RuleSource(size, mtime_ns, parsed)
+            reparsed += 1
+        sources[name] = source
+        rules.extend(source.rules)
+    return rules, sources, reparsed
+
+def open_rules(rules_dir: PathLike, pack_path: Optional[PathLike] = None,
+               previous: Optional[Mapping] = None, record_type: Optional[RecordType] = None
+               ) -> Tuple[List[Dict[str, Any]], Optional[RulePack], Dict[str, RuleSource]]:
+    """
+    All approved rules in rules_dir, in file-name order, the open pack they
+    came from (None when they were parsed from the JSON files) and the rules
+    grouped by source file name.
+
+    With the sources of a previous load, only changed files are re-parsed and
+    the pack is not read. record_type, if given, converts each parsed rule
+    dict (e.g. to a compact Rule record).
+    """
+    if previous:
+        rules, sources, reparsed = read_changed_rules(rules_dir, previous, record_type)
+        print(f"Re-parsed {reparsed} changed rule files of {len(sources)}")
+        return rules, None, sources
+    pack = open_current_pack(rules_dir, pack_path)
+    if pack is not None:
+        rules = pack.load_all()
+        if record_type is not None:
+            rules = [record_type(rule) for rule in rules]
+        return rules, pack, pack.sources(rules)
+    rules, sources, _ = read_changed_rules(rules_dir, {}, record_type)
+    return rules, None, sources
+
+def load_rules(rules_dir: PathLike, pack_path: Optional[PathLike] = None) -> List[Dict[str, Any]]:
+    """
+    All approved rules in rules_dir, in file-name order.
+
+    Reads the packed corpus when an up-to-date pack exists, otherwise parses
+    the individual JSON files. Both give the same rules in the same order.
+    """
+    rules, pack, _ = open_rules(rules_dir, pack_path)
+    if pack is not None:
+        pack.close()
+    return rules
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pack the approved rule JSON files into one file")
+    parser.add_argument("rules_dir", nargs="?", default="udcpr_master_data/approved_rules",
+                        help="Directory of approved rule JSON files")
+    parser.add_argument("--output", help="Pack file (default: <rules_dir>.pack)")
+    args = parser.parse_args(argv)
+
+    pack_path = build_rule_pack(args.rules_dir, args.output)
+    with RulePack(pack_path) as pack:
+        print(f"Packed {len(pack)} rules from {args.rules_dir} into {pack_path} "
+              f"({pack_path.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
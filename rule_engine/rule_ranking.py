@@ -0,0 +1,151 @@
+"""
+Rule Ranking - Precomputed ranking features and vectorized top-k selection
+
+EnhancedRulesDatabase.rank_rules used to rebuild each candidate's lowercase
+text, re-run the plot-area regex and count keywords in Python for every query,
+then sort the whole list when callers kept only the first 5 or 10. The
+features those scores depend on are fixed per rule, so RankingFeatures
+computes them once at load time as arrays aligned with the rule list:
+
+    jurisdiction   integer code of the lowercased jurisdiction
+    keyword_count  how many of 'fsi', 'permissible', 'basic' the text contains
+    general        text contains 'all' or 'general'
+    mentions       every "<number> sq" plot area, flattened with its owner row
+
+Use-type presence comes from the keyword index (memoized per use type). A
+query scores all candidate rows in one NumPy expression and selects the top k
+with np.partition before ordering just those rows. The order matches the
+original stable sort on (priority, -relevance_score).
+"""
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rule_index import KeywordIndex
+
+PLOT_MENTION = re.compile(r'(\d+)\s*sq')
+STATIC_KEYWORDS = ('fsi', 'permissible', 'basic')
+GENERAL_KEYWORDS = ('all', 'general')
+
+USE_TYPE_SCORE = 10.0
+JURISDICTION_SCORE = 5.0
+PLOT_AREA_SCORE = 3.0
+KEYWORD_SCORE = 0.5
+PLOT_AREA_WINDOW = 0.2  # Mentioned plot area within 20% of the project's
+
+# Priority values (RulePriority 1-4)
+EXACT_MATCH, JURISDICTION_MATCH, GENERAL, FALLBACK = 1, 2, 3, 4
+
+# Larger than any relevance score, so priority * stride - score orders like (priority, -score)
+_PRIORITY_STRIDE = 1000.0
+
+# Use types whose presence masks are kept
+MAX_CACHED_USE_TYPES = 256
+
+class RankingFeatures:
+    """Per-rule ranking features, aligned with the rule list they were built from"""
+
+    def __init__(self, rules: Sequence[Mapping[str, Any]], index: Optional[KeywordIndex] = None):
+        self.index = index if index is not None else KeywordIndex.from_rules(rules)
+        self.size = len(rules)
+
+        self.jurisdiction_codes: Dict[str, int] = {}
+        codes = [self.jurisdiction_codes.setdefault(rule.get('jurisdiction', '').lower(),
+                                                    len(self.jurisdiction_codes))
+                 for rule in rules]
+        self.jurisdiction = np.array(codes, dtype=np.int32)
+
+        self.keyword_count = np.zeros(self.size, dtype=np.int32)
+        for keyword in STATIC_KEYWORDS:
+            self.keyword_count += self.mask(self.index.containing(keyword))
+        self.general = self.mask(self.index.any_of(GENERAL_KEYWORDS))
+
+        values: List[float] = []
+        owners: List[int] = []
+        for row in range(self.size):
+            for mention in PLOT_MENTION.findall(self.index.texts[row]):
+                values.append(float(mention))
+                owners.append(row)
+        self.mention_values = np.array(values, dtype=np.float64)
+        self.mention_owner = np.array(owners, dtype=np.int64)
+        self._mention_levels = np.unique(self.mention_values)
+        self._use_type_masks: Dict[str, np.ndarray] = {}
+
+    def mask(self, positions: Iterable[int]) -> np.ndarray:
+        """Boolean row mask of a set of rule positions"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[np.fromiter(positions, dtype=np.int64)] = True
+        return mask
+
+    def use_type_mask(self, use_type_lower: str) -> np.ndarray:
+        """Rows whose text contains the use type"""
+        mask = self._use_type_masks.get(use_type_lower)
+        if mask is None:
+            mask = self.mask(self.index.containing(use_type_lower))
+            if len(self._use_type_masks) < MAX_CACHED_USE_TYPES:
+                self._use_type_masks[use_type_lower] = mask
+        return mask
+
+    def plot_area_matches(self, rows: np.ndarray, plot_area: Optional[float]) -> np.ndarray:
+        """Which rows mention a plot area within the window of plot_area"""
+        matched = np.zeros(len(rows), dtype=bool)
+        if not plot_area or len(self.mention_values) == 0:
+            return matched
+        hits = np.abs(self.mention_values - plot_area) < plot_area * PLOT_AREA_WINDOW
+        matched_rows = np.zeros(self.size, dtype=bool)
+        matched_rows[self.mention_owner[hits]] = True
+        return matched_rows[rows]
+
+    def plot_area_bucket(self, plot_area: Optional[float]) -> Optional[bytes]:
+        """
+        Cache key for a plot area: equal for two plot areas exactly when they
+        fall within the window of the same mentioned plot areas, and so rank
+        every rule the same way.
+        """
+        if not plot_area:
+            return None
+        hits = np.abs(self._mention_levels - plot_area) < plot_area * PLOT_AREA_WINDOW
+        return np.packbits(hits).tobytes()
+
+    def first_plot_area_match(self, row: int, plot_area: float) -> Optional[float]:
+        """First plot area mentioned by a rule that is within the window"""
+        start, end = np.searchsorted(self.mention_owner, [row, row + 1])
+        for value in self.mention_values[start:end]:
+            if abs(value - plot_area) < plot_area * PLOT_AREA_WINDOW:
+                return float(value)
+        return None
+
+    def rank(self, rows: np.ndarray, use_type_lower: str, jurisdiction_lower: str,
+             plot_area: Optional[float] = None,
+             top_k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rank candidate rows.
+
+        Returns (rows, priorities, scores) of the top_k best rows (all rows when
+        top_k is None), best first, ties in candidate order.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        uses = self.use_type_mask(use_type_lower)[rows]
+        code = self.jurisdiction_codes.get(jurisdiction_lower, -1)
+        in_jurisdiction = self.jurisdiction[rows] == code
+
+        priorities = np.where(in_jurisdiction & uses, EXACT_MATCH,
+                              np.where(in_jurisdiction, JURISDICTION_MATCH,
+                                       np.where(self.general[rows], GENERAL, FALLBACK)))
+        scores = (uses * USE_TYPE_SCORE
+                  + in_jurisdiction * JURISDICTION_SCORE
+                  + self.plot_area_matches(rows, plot_area) * PLOT_AREA_SCORE
+                  + (self.keyword_count[rows] + uses) * KEYWORD_SCORE)
+
+        keys = priorities * _PRIORITY_STRIDE - scores
+        order = np.arange(len(rows))
+        if top_k is not None and top_k < len(rows):
+            if top_k <= 0:
+                order = order[:0]
+            else:
+                # Everything tied with the k-th key is a candidate; the stable order decides
+                kth = np.partition(keys, top_k - 1)[top_k - 1]
+                order = np.flatnonzero(keys <= kth)
+        order = order[np.lexsort((order, keys[order]))][:top_k]
+        return rows[order], priorities[order], scores[order]
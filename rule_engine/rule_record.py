@@ -0,0 +1,105 @@
+"""
+Rule Record - Compact, read-only rule records
+
+Every loaded rule used to be a plain dict of 15-18 keys whose enum-like
+values ('maharashtra_udcpr', 'extracted_from_docx', 'docx_direct',
+'auto_approve_script', 'auto_approved', the long source_pdf filename, ...)
+were separate string objects in each of thousands of rules. Rule stores the
+known fields in __slots__ and interns the enum-like strings, so every rule
+shares one copy of each and carries no per-rule hash table. A nested string
+equal to the clause text (source_pdf.text_snippet usually is) shares the
+clause text's string object.
+
+Rule is a read-only Mapping with the original key order: rule['clause_text'],
+rule.get(...), `in`, iteration, dict(rule), == against a dict and str(rule)
+all behave as they did for the dict.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Known rule fields, stored in slots; anything else goes in a per-rule dict
+FIELDS = ('rule_id', 'title', 'jurisdiction', 'version', 'clause_number', 'clause_text',
+          'chapter', 'section', 'parsed', 'examples', 'ambiguous', 'ambiguity_reason',
+          'source_pdf', 'created_at', 'extraction_method', 'approved_at', 'approved_by',
+          'verification_status')
+
+# Fields (and nested source_pdf / parsed fields) whose few distinct strings are interned
+INTERNED_FIELDS = frozenset(('jurisdiction', 'version', 'chapter', 'section', 'extraction_method',
+                             'approved_by', 'verification_status'))
+INTERNED_NESTED_FIELDS = {
+    'source_pdf': frozenset(('filename', 'page')),
+    'parsed': frozenset(('type',))
+}
+
+_FIELD_SET = frozenset(FIELDS)
+
+# One shared tuple per distinct key order
+_key_orders: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+def _interned(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+class Rule(Mapping):
+    """Read-only rule record with slotted fields and the key order of its source dict"""
+    __slots__ = FIELDS + ('_keys', '_extra')
+
+    def __init__(self, record: Mapping):
+        keys = tuple(record)
+        object.__setattr__(self, '_keys', _key_orders.setdefault(keys, keys))
+        extra: Optional[Dict[str, Any]] = None
+        clause_text = record.get('clause_text')
+        for key, value in record.items():
+            if key not in _FIELD_SET:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            if key in INTERNED_FIELDS:
+                value = _interned(value)
+            elif type(value) is dict and key in INTERNED_NESTED_FIELDS:
+                nested = INTERNED_NESTED_FIELDS[key]
+                value = {k: _interned(v) if k in nested else
+                         clause_text if type(v) is str and v == clause_text else v
+                         for k, v in value.items()}
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, '_extra', extra)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Rule records are read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The rule as a plain dict, in its original key order"""
+        return {key: self[key] for key in self._keys}
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        return (Rule, (self.to_dict(),))
@@ -0,0 +1,110 @@
+"""
+Rule Versions - Several published rule corpora served side by side
+
+publish_to_mongo.py records a version_id for every publish and archives the
+approved rule files it published under rule_versions/<version_id>/ (copied
+with their mtimes). VersionedRuleStore keeps a bounded set of those archived
+corpora loaded as immutable RulesDatabase snapshots next to the current one,
+so an evaluation can be pinned to the rules a project was originally checked
+against without a separate deployment.
+
+An archived version is loaded from the current snapshot: rule files whose
+name, size and mtime are unchanged since that publish are not re-parsed, and
+their rule dicts, category masks and facts are shared with it.
+"""
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional
+import sys
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rule_pack import PathLike, source_manifest
+from rules_database import RulesDatabase, get_rules_database
+
+DEFAULT_VERSIONS_DIR = "udcpr_master_data/rule_versions"
+
+# Version names that always mean the currently loaded corpus
+CURRENT_VERSIONS = ("latest", "database_v1")
+
+# Archived versions kept loaded at once
+MAX_LOADED_VERSIONS = 4
+
+def archive_rule_version(rules_dir: PathLike, version_id: str,
+                         versions_dir: PathLike = DEFAULT_VERSIONS_DIR) -> Path:
+    """
+    Copy the rule JSON files of rules_dir to versions_dir/version_id.
+
+    Files keep their mtimes, so unchanged files still match the current corpus
+    when the version is loaded. The archive is written under a temporary name
+    and renamed into place.
+    """
+    rules_dir = Path(rules_dir)
+    target = Path(versions_dir) / version_id
+    if target.exists():
+        raise ValueError(f"Rule version {version_id} is already archived")
+    tmp_dir = target.with_name(target.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name, _, _ in source_manifest(rules_dir):
+        shutil.copy2(rules_dir / name, tmp_dir / name)
+    tmp_dir.rename(target)
+    return target
+
+class VersionedRuleStore:
+    """Current rules database plus archived rule versions loaded on demand"""
+
+    def __init__(self, versions_dir: PathLike = DEFAULT_VERSIONS_DIR,
+                 current: Callable[[], RulesDatabase] = get_rules_database,
+                 max_loaded: int = MAX_LOADED_VERSIONS):
+        """current returns the snapshot that CURRENT_VERSIONS resolve to"""
+        if max_loaded < 1:
+            raise ValueError(f"max_loaded must be >= 1, got {max_loaded}")
+        self.versions_dir = Path(versions_dir)
+        self.current = current
+        self.max_loaded = max_loaded
+        self._loaded: "OrderedDict[str, RulesDatabase]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def versions(self) -> List[str]:
+        """Archived version ids, oldest first (version ids are timestamped)"""
+        if not self.versions_dir.is_dir():
+            return []
+        return sorted(p.name for p in self.versions_dir.iterdir()
+                      if p.is_dir() and not p.name.endswith(".tmp"))
+
+    def loaded_versions(self) -> List[str]:
+        """Archived versions currently held in memory, least recently used first"""
+        with self._lock:
+            return list(self._loaded)
+
+    def get(self, version: Optional[str] = None) -> RulesDatabase:
+        """
+        Rules database snapshot for a version (the current one for None or a
+        CURRENT_VERSIONS name).
+
+        Raises ValueError for a version that was never archived.
+        """
+        if version is None or version in CURRENT_VERSIONS:
+            return self.current()
+
+        with self._lock:
+            db = self._loaded.get(version)
+            if db is not None:
+                self._loaded.move_to_end(version)
+                return db
+
+            version_dir = self.versions_dir / version
+            # A version id is a directory name, never a path
+            if Path(version).name != version or not version_dir.is_dir():
+                raise ValueError(f"Unknown rule version: {version}")
+            current = self.current()
+            db = RulesDatabase(str(version_dir), previous=current)
+            self._loaded[version] = db
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+            return db
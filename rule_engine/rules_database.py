@@ -2,54 +2,101 @@
 Rules Database - Load and query extracted UDCPR/Mumbai DCPR regulations
 Replaces hardcoded logic with actual regulation data
 """
-import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-import re
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Sequence
+import os
+import sys
+import threading
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rule_index import KeywordIndex, RuleCategory, classify_rule, count_by_category
+from rule_pack import RuleSource, open_rules
+from rule_record import Rule
+from rule_facts import FactCategory, RuleFactTable
+from bonus_table import BonusTable
+
+BONUS_KEYWORDS = ['bonus', 'additional fsi', 'premium fsi', 'tod', 'redevelopment',
+                  'slum', 'green building', 'affordable', 'heritage']
 
 class RulesDatabase:
     """Database of extracted regulations with query capabilities"""
     
-    def __init__(self, rules_dir: str = "udcpr_master_data/approved_rules"):
+    def __init__(self, rules_dir: str = "udcpr_master_data/approved_rules", metadata_only: bool = False,
+                 previous: Optional["RulesDatabase"] = None):
         self.rules_dir = Path(rules_dir)
+        # Keep only resident rule fields in memory and read the rest from the rule pack
+        self.metadata_only = metadata_only
+        self.pack = None
         self.rules: List[Dict[str, Any]] = []
         self.rules_by_id: Dict[str, Dict[str, Any]] = {}
-        self.load_all_rules()
+        self.index = KeywordIndex([])
+        self.category_masks: List[int] = []
+        self.facts = RuleFactTable()
+        self.bonus_table = BonusTable([])
+        self.sources: Dict[str, RuleSource] = {}  # Rule file name -> rules read from it
+        # Bumped on every (re)load so caches of derived results can invalidate;
+        # a snapshot built from a previous one continues its count
+        self.generation = previous.generation if previous is not None else 0
+        self.load_all_rules(previous)
     
-    def load_all_rules(self):
-        """Load all approved rules from JSON files"""
+    def load_all_rules(self, previous: Optional["RulesDatabase"] = None):
+        """
+        Load (or reload) all approved rules from the rule pack or JSON files
+        
+        On a reload, or when building from a previous snapshot, only the rule
+        files that changed are re-parsed; rules of the other files are carried
+        over with their category masks and facts
+        """
         print(f"Loading rules from {self.rules_dir}...")
         
-        for json_file in self.rules_dir.glob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    rule = json.load(f)
-                    self.rules.append(rule)
-                    self.rules_by_id[rule['rule_id']] = rule
-            except Exception as e:
-                print(f"Error loading {json_file}: {e}")
+        previous = previous if previous is not None else self
+        # Metadata-only rules are views into a pack, and a SQLite snapshot keeps no
+        # rule sources, so loads from or into those start from scratch
+        reusable = not self.metadata_only and previous.pack is None and bool(previous.sources)
+        # Rules are compact read-only Rule records unless they are views into the pack
+        rules, pack, sources = open_rules(self.rules_dir, previous=previous.sources if reusable else None,
+                                          record_type=None if self.metadata_only else Rule)
+        carried = {id(rule): position for position, rule in enumerate(previous.rules)} if reusable else {}
+        index = KeywordIndex.from_rules(rules)
+        category_masks = [previous.category_masks[carried[id(rule)]] if id(rule) in carried
+                          else classify_rule(rule) for rule in rules]
+        facts = RuleFactTable.from_rules(rules, previous.facts, carried)
+        bonus_table = BonusTable(rules[i] for i in sorted(index.any_of(BONUS_KEYWORDS)))
+        if pack is not None and self.metadata_only:
+            rules = pack.metadata_only(rules)
+            index.read_texts_from(rules)
+        elif pack is not None:
+            pack.close()
+            pack = None
+        rules_by_id = {rule['rule_id']: rule for rule in rules if 'rule_id' in rule}
+        
+        self.rules = rules
+        self.rules_by_id = rules_by_id
+        self.index = index
+        self.category_masks = category_masks
+        self.facts = facts
+        self.bonus_table = bonus_table
+        self.sources = sources
+        # Previous pack stays mapped until rules handed out from it are released
+        self.pack = pack
+        self.generation += 1
         
         print(f"Loaded {len(self.rules)} regulations")
     
+    def _rules_at(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Rules at index positions, in load order"""
+        return [self.rules[i] for i in sorted(positions)]
+    
     def query_fsi_rules(self, use_type: str, plot_area: float = None, 
                         jurisdiction: str = "maharashtra_udcpr") -> List[Dict[str, Any]]:
         """Query FSI-related rules"""
-        results = []
+        # Must contain FSI, and the use type (or 'all')
+        fsi_rules = self.index.any_of(['fsi', 'floor space index'])
+        use_rules = self.index.any_of([use_type.lower(), 'all'])
         
-        # Search for FSI rules matching criteria
-        for rule in self.rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            
-            # Must contain FSI
-            if 'fsi' not in text and 'floor space index' not in text:
-                continue
-            
-            # Check use type
-            use_lower = use_type.lower()
-            if use_lower in text or 'all' in text:
-                results.append(rule)
-        
-        return results
+        return self._rules_at(fsi_rules & use_rules)
     
     def get_base_fsi(self, use_type: str, plot_area: float, 
                      jurisdiction: str = "maharashtra_udcpr") -> Dict[str, Any]:
@@ -63,24 +110,20 @@ class RulesDatabase:
         applied_rules = []
         
         for rule in fsi_rules:
+            # Numbers following "FSI" in the clause text, extracted at load time
+            fsi_mentions = self.facts.values(rule.get('rule_id'), FactCategory.FSI, 'mention')
+            if not fsi_mentions:
+                continue
             text = rule.get('clause_text', '')
             
-            # Look for FSI values in text
-            # Pattern: "FSI... 1.0" or "FSI... 2.0" or "FSI shall be 1.5"
-            fsi_matches = re.findall(r'FSI.*?(\d+\.?\d*)', text, re.IGNORECASE)
-            
-            for match in fsi_matches:
-                try:
-                    fsi_val = float(match)
-                    if 0.1 <= fsi_val <= 5.0:  # Reasonable FSI range
-                        fsi_values.append({
-                            'value': fsi_val,
-                            'rule_id': rule['rule_id'],
-                            'rule_text': text[:200]
-                        })
-                        applied_rules.append(rule['rule_id'])
-                except ValueError:
-                    continue
+            for fsi_val in fsi_mentions:
+                if 0.1 <= fsi_val <= 5.0:  # Reasonable FSI range
+                    fsi_values.append({
+                        'value': fsi_val,
+                        'rule_id': rule['rule_id'],
+                        'rule_text': text[:200]
+                    })
+                    applied_rules.append(rule['rule_id'])
         
         # Determine base FSI
         if use_type.lower() == "commercial":
@@ -149,21 +192,11 @@ class RulesDatabase:
     
     def query_parking_rules(self, use_type: str) -> List[Dict[str, Any]]:
         """Query parking-related rules"""
-        results = []
+        # Must contain parking or ECS, and the use type (or 'all')
+        parking_rules = self.index.any_of(['parking', 'ecs'])
+        use_rules = self.index.any_of([use_type.lower(), 'all'])
         
-        for rule in self.rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            
-            # Must contain parking or ECS
-            if 'parking' not in text and 'ecs' not in text:
-                continue
-            
-            # Check use type
-            use_lower = use_type.lower()
-            if use_lower in text or 'all' in text:
-                results.append(rule)
-        
-        return results
+        return self._rules_at(parking_rules & use_rules)
     
     def get_parking_requirement(self, use_type: str, built_up_area: float) -> Dict[str, Any]:
         """Get parking requirements from actual regulations"""
@@ -172,13 +205,12 @@ class RulesDatabase:
         
         # Look for ECS ratios in rules
         for rule in parking_rules:
-            text = rule.get('clause_text', '')
-            
-            # Pattern: "1 ECS per 100" or "1 ECS per 50"
-            ecs_matches = re.findall(r'1\s+ECS\s+per\s+(\d+)', text, re.IGNORECASE)
+            # "1 ECS per 100" or "1 ECS per 50", extracted at load time
+            ecs_matches = self.facts.values(rule.get('rule_id'), FactCategory.PARKING, 'mention')
             
             if ecs_matches:
-                ratio = float(ecs_matches[0])
+                text = rule.get('clause_text', '')
+                ratio = ecs_matches[0]
                 required_ecs = built_up_area / ratio
                 
                 return {
@@ -221,155 +253,92 @@ class RulesDatabase:
     
     def query_setback_rules(self, zone: str, plot_area: float = None) -> List[Dict[str, Any]]:
         """Query setback-related rules"""
-        results = []
-        
-        for rule in self.rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            
-            # Must contain setback or margin
-            if 'setback' not in text and 'margin' not in text and 'building line' not in text:
-                continue
-            
-            results.append(rule)
-        
-        return results
+        # Must contain setback or margin
+        return self._rules_at(self.index.any_of(['setback', 'margin', 'building line']))
     
     def query_height_rules(self, zone: str, road_width: float = None) -> List[Dict[str, Any]]:
         """Query height-related rules"""
-        results = []
-        
-        for rule in self.rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            
-            # Must contain height or storey
-            if 'height' not in text and 'storey' not in text and 'floor' not in text:
-                continue
-            
-            results.append(rule)
-        
-        return results
+        # Must contain height or storey
+        return self._rules_at(self.index.any_of(['height', 'storey', 'floor']))
     
     def query_bonus_rules(self) -> List[Dict[str, Any]]:
         """Query FSI bonus-related rules"""
-        results = []
-        
-        for rule in self.rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            
-            # Look for bonus keywords
-            bonus_keywords = ['bonus', 'additional fsi', 'premium fsi', 'tod', 'redevelopment', 
-                            'slum', 'green building', 'affordable', 'heritage']
-            
-            if any(keyword in text for keyword in bonus_keywords):
-                results.append(rule)
-        
-        return results
+        # Look for bonus keywords
+        return self._rules_at(self.index.any_of(BONUS_KEYWORDS))
     
-    def get_all_fsi_bonuses(self, project_conditions: Dict[str, bool]) -> List[Dict[str, Any]]:
-        """Get all applicable FSI bonuses from regulations"""
-        
-        bonus_rules = self.query_bonus_rules()
-        applicable_bonuses = []
+    def get_all_fsi_bonuses(self, project_conditions: Dict[str, bool]) -> Sequence[Mapping[str, Any]]:
+        """
+        Get all applicable FSI bonuses from regulations
         
-        for rule in bonus_rules:
-            text = rule.get('clause_text', '').lower()
-            
-            # TOD bonus
-            if project_conditions.get('tod_zone') and 'tod' in text:
-                # Extract bonus value
-                bonus_matches = re.findall(r'(\d+\.?\d*)', text)
-                if bonus_matches:
-                    applicable_bonuses.append({
-                        'type': 'TOD Zone',
-                        'value': 0.5,  # Standard TOD bonus
-                        'rule_id': rule['rule_id'],
-                        'rule_text': text[:200]
-                    })
-            
-            # Redevelopment bonus
-            if project_conditions.get('redevelopment') and 'redevelopment' in text:
-                applicable_bonuses.append({
-                    'type': 'Redevelopment',
-                    'value': 0.3,
-                    'rule_id': rule['rule_id'],
-                    'rule_text': text[:200]
-                })
-            
-            # Slum rehabilitation
-            if project_conditions.get('slum_rehab') and ('slum' in text or 'sra' in text):
-                applicable_bonuses.append({
-                    'type': 'Slum Rehabilitation',
-                    'value': 1.0,
-                    'rule_id': rule['rule_id'],
-                    'rule_text': text[:200]
-                })
-            
-            # Green building
-            if project_conditions.get('green_building') and 'green' in text:
-                applicable_bonuses.append({
-                    'type': 'Green Building',
-                    'value': 0.5,
-                    'rule_id': rule['rule_id'],
-                    'rule_text': text[:200]
-                })
-            
-            # Affordable housing
-            if project_conditions.get('affordable_housing') and 'affordable' in text:
-                applicable_bonuses.append({
-                    'type': 'Affordable Housing',
-                    'value': 0.75,
-                    'rule_id': rule['rule_id'],
-                    'rule_text': text[:200]
-                })
-        
-        return applicable_bonuses
+        One bonus per type, citing every matching rule in rule_ids, looked up
+        from the table built at load time (shared read-only records)
+        """
+        return self.bonus_table.lookup(project_conditions)
     
     def search_rules(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search rules by keyword"""
-        results = []
-        query_lower = query.lower()
-        
-        for rule in self.rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            
-            if query_lower in text:
-                results.append(rule)
-                
-                if len(results) >= limit:
-                    break
-        
-        return results
+        matches = sorted(self.index.containing(query))
+        return [self.rules[i] for i in matches[:limit]]
     
     def get_rule_by_id(self, rule_id: str) -> Optional[Dict[str, Any]]:
         """Get specific rule by ID"""
         return self.rules_by_id.get(rule_id)
     
+    def rules_in_category(self, category: RuleCategory) -> List[Dict[str, Any]]:
+        """Rules whose category mask includes any of the given categories"""
+        bits = int(category)
+        return [rule for rule, mask in zip(self.rules, self.category_masks) if mask & bits]
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
-        fsi_count = len([r for r in self.rules if 'fsi' in str(r).lower()])
-        parking_count = len([r for r in self.rules if 'parking' in str(r).lower()])
-        setback_count = len([r for r in self.rules if 'setback' in str(r).lower()])
-        height_count = len([r for r in self.rules if 'height' in str(r).lower()])
+        counts = count_by_category(self.category_masks)
         
         return {
             'total_rules': len(self.rules),
-            'fsi_rules': fsi_count,
-            'parking_rules': parking_count,
-            'setback_rules': setback_count,
-            'height_rules': height_count,
+            'fsi_rules': counts[RuleCategory.FSI],
+            'parking_rules': counts[RuleCategory.PARKING],
+            'setback_rules': counts[RuleCategory.SETBACK],
+            'height_rules': counts[RuleCategory.HEIGHT],
+            'bonus_rules': counts[RuleCategory.BONUS],
+            'coverage_rules': counts[RuleCategory.COVERAGE],
             'jurisdictions': list(set(r.get('jurisdiction', 'unknown') for r in self.rules))
         }
 
 # Singleton instance
 _db_instance = None
+_reload_lock = threading.Lock()
 
 def get_rules_database() -> RulesDatabase:
-    """Get or create rules database singleton"""
+    """
+    Get or create rules database singleton.
+
+    Set RULES_METADATA_ONLY=1 to keep only rule metadata resident and read
+    clause text from the rule pack on demand (less memory per worker), or
+    RULES_BACKEND=sqlite to answer queries from the shared SQLite rules file.
+    """
     global _db_instance
     if _db_instance is None:
-        _db_instance = RulesDatabase()
+        if os.environ.get("RULES_BACKEND") == "sqlite":
+            from rules_database_sqlite import SQLiteRulesDatabase
+            _db_instance = SQLiteRulesDatabase()
+        else:
+            _db_instance = RulesDatabase(metadata_only=os.environ.get("RULES_METADATA_ONLY") == "1")
     return _db_instance
 
+def reload_rules_database() -> RulesDatabase:
+    """
+    Build a new rules database snapshot and swap it in as the singleton.
+    
+    The snapshot is built next to the current one, re-parsing only changed rule
+    files, and replaces it in one assignment: callers holding the old snapshot
+    keep reading it until they let it go.
+    """
+    global _db_instance
+    with _reload_lock:
+        current = get_rules_database()
+        _db_instance = type(current)(str(current.rules_dir), current.metadata_only, previous=current)
+        return _db_instance
+
 if __name__ == "__main__":
     # Test the database
     db = RulesDatabase()
@@ -0,0 +1,320 @@
+"""
+SQLite Rules Database - RulesDatabase backed by an indexed SQLite file
+
+RulesDatabase keeps every rule dict, its keyword index, masks and facts in each
+worker's memory. SQLiteRulesDatabase answers the same queries from one local
+SQLite file built from the approved rules:
+
+    rules            position, rule_id, jurisdiction and the JSON record
+    rule_categories  (category, position) for each RuleCategory a rule is in
+    facts            the RuleFactTable rows (rule_id, category, order, context, value)
+    rule_text        FTS5 trigram index over rule_search_text
+
+Worker processes open the file read-only and memory-mapped, so they share its
+pages through the OS page cache instead of each holding a copy of the corpus.
+The trigram tokenizer gives the substring semantics of KeywordIndex ('all'
+still matches "shall"); each FTS match is confirmed with instr(), and keywords
+shorter than a trigram are scanned.
+
+The file sits next to the rules directory (approved_rules.sqlite) and is
+rebuilt when it is missing or its source manifest no longer matches the
+rules directory. Build it ahead of time from the repository root:
+
+    python rule_engine/rules_database_sqlite.py
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+import sys
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rule_index import MAX_CACHED_KEYWORDS, RuleCategory, classify_rule, rule_search_text
+from rule_facts import FactCategory, RuleFact, RuleFactTable
+from rule_pack import RECORD_CACHE_SIZE, PathLike, load_rules, source_manifest
+from rules_database import RulesDatabase
+from bonus_table import BonusTable
+
+SCHEMA_VERSION = 1
+SQLITE_SUFFIX = ".sqlite"
+TRIGRAM = 3  # Shortest keyword the trigram index can look up
+
+# Bytes of the file each connection memory-maps (shared through the page cache)
+MMAP_SIZE = 256 * 1024 * 1024
+
+def _fts5_trigram_available() -> bool:
+    try:
+        with sqlite3.connect(":memory:") as conn:
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+FTS5_TRIGRAM_SUPPORT = _fts5_trigram_available()
+if not FTS5_TRIGRAM_SUPPORT:
+    print(f"Warning: SQLite {sqlite3.sqlite_version} lacks the FTS5 trigram tokenizer "
+          f"(needs 3.34+). SQLite rules database disabled.")
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE rules (
+    position INTEGER PRIMARY KEY,
+    rule_id TEXT,
+    jurisdiction TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX rules_rule_id ON rules (rule_id);
+CREATE INDEX rules_jurisdiction ON rules (jurisdiction);
+CREATE TABLE rule_categories (
+    category INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (category, position)
+) WITHOUT ROWID;
+CREATE TABLE facts (
+    rule_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    context TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (rule_id, category, seq)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE rule_text USING fts5(text, tokenize='trigram');
+"""
+
+def default_sqlite_path(rules_dir: PathLike) -> Path:
+    """Database file next to the rules directory (approved_rules -> approved_rules.sqlite)"""
+    rules_dir = Path(rules_dir)
+    return rules_dir.parent / (rules_dir.name + SQLITE_SUFFIX)
+
+def build_rules_sqlite(rules_dir: PathLike, db_path: Optional[PathLike] = None) -> Path:
+    """
+    Build the SQLite rules database for rules_dir.
+
+    Written to a temporary file and renamed into place, so workers opening the
+    database never see a partial build.
+    """
+    if not FTS5_TRIGRAM_SUPPORT:
+        raise RuntimeError("SQLite FTS5 trigram tokenizer is not available")
+    rules_dir = Path(rules_dir)
+    db_path = Path(db_path) if db_path else default_sqlite_path(rules_dir)
+    manifest = source_manifest(rules_dir)
+    rules = load_rules(rules_dir)
+    facts = RuleFactTable.from_rules(rules)
+
+    tmp_path = db_path.with_name(f"{db_path.name}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("source_dir", rules_dir.name),
+            ("files", json.dumps(manifest))
+        ])
+        conn.executemany("INSERT INTO rules VALUES (?, ?, ?, ?)", (
+            (position, rule.get('rule_id'), rule.get('jurisdiction'), json.dumps(rule, ensure_ascii=False))
+            for position, rule in enumerate(rules)))
+        masks = [classify_rule(rule) for rule in rules]
+        conn.executemany("INSERT INTO rule_categories VALUES (?, ?)", (
+            (int(category), position)
+            for position, mask in enumerate(masks)
+            for category in RuleCategory if mask & category))
+        conn.executemany("INSERT INTO facts VALUES (?, ?, ?, ?, ?)", (
+            (rule_id, category.value, seq, fact.context, fact.value)
+            for (rule_id, category), rule_facts in facts._facts.items()
+            for seq, fact in enumerate(rule_facts)))
+        conn.executemany("INSERT INTO rule_text (rowid, text) VALUES (?, ?)", (
+            (position, rule_search_text(rule)) for position, rule in enumerate(rules)))
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return db_path
+
+def sqlite_matches(db_path: PathLike, rules_dir: PathLike) -> bool:
+    """True if the database exists and was built from the current contents of rules_dir"""
+    try:
+        conn = sqlite3.connect(f"file:{Path(db_path)}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return False
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+    return (meta.get("schema_version") == str(SCHEMA_VERSION)
+            and json.loads(meta.get("files", "null")) == source_manifest(rules_dir))
+
+class FTSKeywordIndex:
+    """KeywordIndex lookups (containing, any_of) answered by the FTS5 trigram table"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._keyword_cache: Dict[str, FrozenSet[int]] = {}
+
+    def containing(self, keyword: str) -> FrozenSet[int]:
+        """Positions of rules whose text contains keyword as a substring"""
+        keyword = keyword.lower()
+        matches = self._keyword_cache.get(keyword)
+        if matches is not None:
+            return matches
+
+        if len(keyword) < TRIGRAM:
+            sql, params = "SELECT rowid FROM rule_text WHERE instr(text, ?) > 0", (keyword,)
+        else:
+            phrase = '"' + keyword.replace('"', '""') + '"'
+            sql = "SELECT rowid FROM rule_text WHERE rule_text MATCH ? AND instr(text, ?) > 0"
+            params = (phrase, keyword)
+        matches = frozenset(row[0] for row in self._connection().execute(sql, params))
+
+        if len(self._keyword_cache) < MAX_CACHED_KEYWORDS:
+            self._keyword_cache[keyword] = matches
+        return matches
+
+    def any_of(self, keywords: Iterable[str]) -> Set[int]:
+        """Positions of rules containing at least one of the keywords"""
+        matches: Set[int] = set()
+        for keyword in keywords:
+            matches |= self.containing(keyword)
+        return matches
+
+class SQLiteFactTable:
+    """RuleFactTable lookups (get, values) answered by the facts table"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def get(self, rule_id: str, category: FactCategory) -> tuple:
+        """Facts of one category for a rule, in extraction order (empty if none)"""
+        rows = self._connection().execute(
+            "SELECT value, context FROM facts WHERE rule_id = ? AND category = ? ORDER BY seq",
+            (rule_id, FactCategory(category).value))
+        return tuple(RuleFact(value, context) for value, context in rows)
+
+    def values(self, rule_id: str, category: FactCategory, context: str) -> List[float]:
+        """Values of a rule's facts stated in one context"""
+        rows = self._connection().execute(
+            "SELECT value FROM facts WHERE rule_id = ? AND category = ? AND context = ? ORDER BY seq",
+            (rule_id, FactCategory(category).value, context))
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+
+class SQLiteRulesDatabase(RulesDatabase):
+    """
+    RulesDatabase whose rules, keyword index and facts live in a SQLite file.
+
+    Rule records are parsed from the file when a query returns them, with a
+    bounded cache of recently returned records (shared; do not modify).
+    """
+
+    def __init__(self, rules_dir: str = "udcpr_master_data/approved_rules", metadata_only: bool = False,
+                 previous: Optional[RulesDatabase] = None, db_path: Optional[PathLike] = None,
+                 record_cache_size: int = RECORD_CACHE_SIZE):
+        """metadata_only is accepted for RulesDatabase compatibility; rules are never resident"""
+        if not FTS5_TRIGRAM_SUPPORT:
+            raise RuntimeError("SQLite FTS5 trigram tokenizer is not available")
+        self.rules_dir = Path(rules_dir)
+        self.db_path = Path(db_path) if db_path else default_sqlite_path(self.rules_dir)
+        self.metadata_only = metadata_only
+        self.pack = None
+        self.sources = {}
+        self._local = threading.local()
+        self.record_cache_size = record_cache_size
+        self.index = FTSKeywordIndex(self._connection)
+        self.facts = SQLiteFactTable(self._connection)
+        # Bumped on every (re)load so caches of derived results can invalidate
+        self.generation = previous.generation if previous is not None else 0
+        self.load_all_rules()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's read-only connection to the current database file"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None or self._local.generation != self.generation:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+            self._local.connection = conn
+            self._local.generation = self.generation
+        return conn
+
+    def load_all_rules(self, previous: Optional[RulesDatabase] = None):
+        """Open the SQLite database, rebuilding it first if the rules changed"""
+        if not sqlite_matches(self.db_path, self.rules_dir):
+            print(f"Building {self.db_path} from {self.rules_dir}...")
+            build_rules_sqlite(self.rules_dir, self.db_path)
+        self.index = FTSKeywordIndex(self._connection)
+        self._record = lru_cache(maxsize=self.record_cache_size)(self._read_record)
+        self.bonus_table = BonusTable(self.query_bonus_rules())
+        self.generation += 1
+        print(f"Loaded {self.get_statistics()['total_rules']} regulations from {self.db_path}")
+
+    def _read_record(self, position: int) -> Dict[str, Any]:
+        row = self._connection().execute("SELECT record FROM rules WHERE position = ?", (position,)).fetchone()
+        return json.loads(row[0])
+
+    def _records(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """Rules at the positions a query selects, in the query's order"""
+        return [self._record(row[0]) for row in self._connection().execute(sql, tuple(params))]
+
+    def _rules_at(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Rules at index positions, in load order"""
+        return [self._record(position) for position in sorted(positions)]
+
+    def search_rules(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search rules by keyword"""
+        return self._rules_at(sorted(self.index.containing(query))[:limit])
+
+    def get_rule_by_id(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        """Get specific rule by ID"""
+        # A repeated rule_id resolves to the last rule loaded, as in RulesDatabase
+        rules = self._records("SELECT position FROM rules WHERE rule_id = ? ORDER BY position DESC LIMIT 1",
+                              (rule_id,))
+        return rules[0] if rules else None
+
+    def rules_in_category(self, category: RuleCategory) -> List[Dict[str, Any]]:
+        """Rules whose category mask includes any of the given categories"""
+        bits = [int(c) for c in RuleCategory if c & category]
+        return self._records(
+            "SELECT DISTINCT position FROM rule_categories "
+            f"WHERE category IN ({', '.join('?' * len(bits))}) ORDER BY position", bits)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics"""
+        conn = self._connection()
+        counts = dict(conn.execute("SELECT category, COUNT(*) FROM rule_categories GROUP BY category"))
+        count = lambda category: counts.get(int(category), 0)
+
+        return {
+            'total_rules': conn.execute("SELECT COUNT(*) FROM rules").fetchone()[0],
+            'fsi_rules': count(RuleCategory.FSI),
+            'parking_rules': count(RuleCategory.PARKING),
+            'setback_rules': count(RuleCategory.SETBACK),
+            'height_rules': count(RuleCategory.HEIGHT),
+            'bonus_rules': count(RuleCategory.BONUS),
+            'coverage_rules': count(RuleCategory.COVERAGE),
+            'jurisdictions': [row[0] or 'unknown' for row in
+                              conn.execute("SELECT DISTINCT jurisdiction FROM rules")]
+        }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the SQLite rules database from the approved rules")
+    parser.add_argument("rules_dir", nargs="?", default="udcpr_master_data/approved_rules",
+                        help="Directory of approved rule JSON files")
+    parser.add_argument("--output", help="Database file (default: <rules_dir>.sqlite)")
+    args = parser.parse_args(argv)
+
+    db_path = build_rules_sqlite(args.rules_dir, args.output)
+    print(f"Built {db_path} from {args.rules_dir} ({db_path.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,25 @@
 Enhanced Rules Database V2 - With jurisdiction filtering, rule ranking, and advanced parsing
 Implements all 4 next steps from database integration
 """
-import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-import re
+from typing import List, Dict, Any, Callable, Hashable, Iterable, Optional, Tuple
+import copy
+import sys
+import threading
 from dataclasses import dataclass
 from enum import Enum
+import numpy as np
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from evaluation_cache import EvaluationCache
+from rule_index import KeywordIndex, RuleCategory, classify_rule, count_by_category
+from rule_ranking import RankingFeatures
+from rule_pack import RuleSource, open_rules
+from rule_record import Rule
+from rule_facts import (FactCategory, RuleFactTable, extract_facts, select_fsi,
+                        select_height_limit, select_parking_ratio, select_setbacks)
 
 class RulePriority(Enum):
     """Rule priority levels"""
@@ -27,31 +40,81 @@ class RankedRule:
 class EnhancedRulesDatabase:
     """Enhanced database with jurisdiction filtering and rule ranking"""
     
-    def __init__(self, rules_dir: str = "udcpr_master_data/approved_rules"):
+    def __init__(self, rules_dir: str = "udcpr_master_data/approved_rules", metadata_only: bool = False,
+                 lookup_cache_size: int = 4096, previous: Optional["EnhancedRulesDatabase"] = None):
         self.rules_dir = Path(rules_dir)
+        # Results of the *_enhanced lookups; only valid for the loaded corpus
+        self.lookup_cache = EvaluationCache(max_size=lookup_cache_size, ttl_seconds=None)
+        # Keep only resident rule fields in memory and read the rest from the rule pack
+        self.metadata_only = metadata_only
+        self.pack = None
         self.rules: List[Dict[str, Any]] = []
         self.rules_by_id: Dict[str, Dict[str, Any]] = {}
         self.rules_by_jurisdiction: Dict[str, List[Dict[str, Any]]] = {}
-        self.load_all_rules()
+        self.category_masks: List[int] = []  # RuleCategory bits, aligned with self.rules
+        self.facts = RuleFactTable()
+        self.index = KeywordIndex([])
+        self.ranking = RankingFeatures([], self.index)
+        self._rows: Dict[int, int] = {}  # id(rule) -> position in self.rules
+        self._jurisdiction_rows: Dict[str, np.ndarray] = {}
+        self.sources: Dict[str, RuleSource] = {}  # Rule file name -> rules read from it
+        self.load_all_rules(previous)
     
-    def load_all_rules(self):
-        """Load all approved rules and index by jurisdiction"""
+    def load_all_rules(self, previous: Optional["EnhancedRulesDatabase"] = None):
+        """
+        Load all approved rules and index by jurisdiction
+        
+        Everything is built before any of it is swapped in. On a reload, or
+        when building from a previous snapshot, only changed rule files are
+        re-parsed and the other rules keep their category masks and facts
+        """
         print(f"Loading rules from {self.rules_dir}...")
         
-        for json_file in self.rules_dir.glob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    rule = json.load(f)
-                    self.rules.append(rule)
-                    self.rules_by_id[rule['rule_id']] = rule
-                    
-                    # Index by jurisdiction
-                    jurisdiction = rule.get('jurisdiction', 'unknown')
-                    if jurisdiction not in self.rules_by_jurisdiction:
-                        self.rules_by_jurisdiction[jurisdiction] = []
-                    self.rules_by_jurisdiction[jurisdiction].append(rule)
-            except Exception as e:
-                print(f"Error loading {json_file}: {e}")
+        previous = previous if previous is not None else self
+        # Metadata-only rules are views into a pack, so those loads start from the pack
+        reusable = not self.metadata_only and previous.pack is None
+        # Rules are compact read-only Rule records unless they are views into the pack
+        rules, pack, sources = open_rules(self.rules_dir, previous=previous.sources if reusable else None,
+                                          record_type=None if self.metadata_only else Rule)
+        carried = {id(rule): row for row, rule in enumerate(previous.rules)} if reusable else {}
+        masks = [previous.category_masks[carried[id(rule)]] if id(rule) in carried
+                 else classify_rule(rule) for rule in rules]
+        facts = RuleFactTable.from_rules(rules, previous.facts, carried)
+        index = KeywordIndex.from_rules(rules)
+        ranking = RankingFeatures(rules, index)
+        if pack is not None and self.metadata_only:
+            rules = pack.metadata_only(rules)
+            index.read_texts_from(rules)
+        elif pack is not None:
+            pack.close()
+            pack = None
+        
+        rules_by_id: Dict[str, Dict[str, Any]] = {}
+        rules_by_jurisdiction: Dict[str, List[Dict[str, Any]]] = {}
+        jurisdiction_rows: Dict[str, List[int]] = {}
+        for row, rule in enumerate(rules):
+            if 'rule_id' in rule:
+                rules_by_id[rule['rule_id']] = rule
+            
+            # Index by jurisdiction
+            jurisdiction = rule.get('jurisdiction', 'unknown')
+            rules_by_jurisdiction.setdefault(jurisdiction, []).append(rule)
+            jurisdiction_rows.setdefault(jurisdiction, []).append(row)
+        
+        self.rules = rules
+        self.rules_by_id = rules_by_id
+        self.rules_by_jurisdiction = rules_by_jurisdiction
+        self.category_masks = masks
+        self.facts = facts
+        self.index = index
+        self.ranking = ranking
+        self._rows = {id(rule): row for row, rule in enumerate(rules)}
+        self._jurisdiction_rows = {j: np.array(rows, dtype=np.int64) for j, rows in jurisdiction_rows.items()}
+        self.sources = sources
+        # Previous pack stays mapped until rules handed out from it are released
+        self.pack = pack
+        
+        self.lookup_cache.clear()
         
         print(f"Loaded {len(self.rules)} regulations")
         print(f"Jurisdictions: {list(self.rules_by_jurisdiction.keys())}")
@@ -77,153 +140,98 @@ class EnhancedRulesDatabase:
     def rank_rules(self, rules: List[Dict[str, Any]], 
                    use_type: str, 
                    jurisdiction: str,
-                   plot_area: float = None) -> List[RankedRule]:
-        """Rank rules by relevance and priority"""
-        ranked = []
+                   plot_area: float = None,
+                   top_k: Optional[int] = None) -> List[RankedRule]:
+        """Rank rules by relevance and priority (only the best top_k if given)"""
+        rows = [self._rows.get(id(rule)) for rule in rules]
+        if any(row is None for row in rows):
+            # Rules from elsewhere: rank them with their own features
+            features = RankingFeatures(rules)
+            return self._rank_rows(features, rules, np.arange(len(rules)), use_type,
+                                   jurisdiction, plot_area, top_k)
+        return self._rank_rows(self.ranking, self.rules, np.array(rows, dtype=np.int64), use_type,
+                               jurisdiction, plot_area, top_k)
+    
+    def _rank_rows(self, features: RankingFeatures, rules: List[Dict[str, Any]], rows: np.ndarray,
+                   use_type: str, jurisdiction: str, plot_area: Optional[float],
+                   top_k: Optional[int]) -> List[RankedRule]:
+        """Rank rows of rules, best first"""
         use_type_lower = use_type.lower()
-        jurisdiction_lower = jurisdiction.lower()
+        rows, priorities, scores = features.rank(rows, use_type_lower, jurisdiction.lower(),
+                                                 plot_area, top_k)
         
-        for rule in rules:
-            rule_text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            rule_jurisdiction = rule.get('jurisdiction', '').lower()
-            
-            # Determine priority
-            if rule_jurisdiction == jurisdiction_lower and use_type_lower in rule_text:
-                priority = RulePriority.EXACT_MATCH
-            elif rule_jurisdiction == jurisdiction_lower:
-                priority = RulePriority.JURISDICTION_MATCH
-            elif 'all' in rule_text or 'general' in rule_text:
-                priority = RulePriority.GENERAL
-            else:
-                priority = RulePriority.FALLBACK
-            
-            # Calculate relevance score
-            relevance_score = 0.0
+        ranked = []
+        uses = features.use_type_mask(use_type_lower)
+        jurisdiction_code = features.jurisdiction_codes.get(jurisdiction.lower(), -1)
+        for row, priority, score in zip(rows.tolist(), priorities.tolist(), scores.tolist()):
             match_reasons = []
-            
-            # Use type match
-            if use_type_lower in rule_text:
-                relevance_score += 10.0
+            if uses[row]:
                 match_reasons.append(f"use_type:{use_type}")
-            
-            # Jurisdiction match
-            if rule_jurisdiction == jurisdiction_lower:
-                relevance_score += 5.0
+            if features.jurisdiction[row] == jurisdiction_code:
                 match_reasons.append(f"jurisdiction:{jurisdiction}")
-            
-            # Plot area specificity
             if plot_area:
-                # Check if rule mentions specific plot sizes
-                plot_mentions = re.findall(r'(\d+)\s*sq', rule_text)
-                if plot_mentions:
-                    for mention in plot_mentions:
-                        mentioned_area = float(mention)
-                        if abs(mentioned_area - plot_area) < plot_area * 0.2:  # Within 20%
-                            relevance_score += 3.0
-                            match_reasons.append(f"plot_area_match:{mentioned_area}")
-                            break
-            
-            # Keyword density
-            keywords = [use_type_lower, 'fsi', 'permissible', 'basic']
-            keyword_count = sum(1 for kw in keywords if kw in rule_text)
-            relevance_score += keyword_count * 0.5
+                mentioned_area = features.first_plot_area_match(row, plot_area)
+                if mentioned_area is not None:
+                    match_reasons.append(f"plot_area_match:{mentioned_area}")
             
             ranked.append(RankedRule(
-                rule=rule,
-                priority=priority,
-                relevance_score=relevance_score,
+                rule=rules[row],
+                priority=RulePriority(priority),
+                relevance_score=score,
                 match_reasons=match_reasons
             ))
         
-        # Sort by priority first, then relevance score
-        ranked.sort(key=lambda x: (x.priority.value, -x.relevance_score))
-        
         return ranked
     
+    def _candidate_rows(self, jurisdiction: str, keywords: Iterable[str]) -> np.ndarray:
+        """Rows of a jurisdiction's rules whose text contains any of the keywords"""
+        rows = self._jurisdiction_rows.get(jurisdiction)
+        if rows is None:
+            return np.zeros(0, dtype=np.int64)
+        return rows[self.ranking.mask(self.index.any_of(keywords))[rows]]
+    
     def extract_fsi_value(self, text: str, use_type: str = None) -> Optional[Tuple[float, str]]:
         """Enhanced FSI value extraction with context awareness"""
-        text_lower = text.lower()
-        
-        # Pattern 1: "FSI shall be X" or "FSI permissible shall be X"
-        pattern1 = r'fsi\s+(?:permissible\s+)?(?:shall\s+be|is|of)\s+(\d+\.?\d*)'
-        matches1 = re.findall(pattern1, text_lower)
-        
-        # Pattern 2: "basic FSI X" or "base FSI X"
-        pattern2 = r'(?:basic|base)\s+fsi\s+(?:of\s+)?(\d+\.?\d*)'
-        matches2 = re.findall(pattern2, text_lower)
-        
-        # Pattern 3: "FSI up to X" (maximum FSI)
-        pattern3 = r'fsi\s+up\s+to\s+(\d+\.?\d*)'
-        matches3 = re.findall(pattern3, text_lower)
-        
-        # Combine all matches
-        all_matches = []
-        
-        for match in matches1:
-            try:
-                val = float(match)
-                if 0.1 <= val <= 10.0:
-                    all_matches.append((val, 'explicit'))
-            except ValueError:
-                continue
-        
-        for match in matches2:
-            try:
-                val = float(match)
-                if 0.1 <= val <= 10.0:
-                    all_matches.append((val, 'basic'))
-            except ValueError:
-                continue
-        
-        for match in matches3:
-            try:
-                val = float(match)
-                if 0.1 <= val <= 10.0:
-                    all_matches.append((val, 'maximum'))
-            except ValueError:
-                continue
-        
-        # Return the most appropriate match
-        if all_matches:
-            # Prefer 'basic' or 'explicit' over 'maximum'
-            for val, context in all_matches:
-                if context in ['basic', 'explicit']:
-                    return (val, context)
-            # Otherwise return first match
-            return all_matches[0]
-        
-        return None
+        facts = extract_facts(text).get(FactCategory.FSI, ())
+        return select_fsi(facts)
+    
+    def _cached_lookup(self, key: Hashable, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Memoized lookup result (a private copy, callers may modify it)"""
+        result = self.lookup_cache.get(key)
+        if result is None:
+            generation = self.lookup_cache.generation
+            result = compute()
+            self.lookup_cache.put(key, result, generation)
+        return copy.deepcopy(result)
     
     def get_base_fsi_enhanced(self, use_type: str, plot_area: float, 
                              jurisdiction: str = "maharashtra_udcpr") -> Dict[str, Any]:
         """Enhanced FSI calculation with jurisdiction filtering and rule ranking"""
-        
-        # Get rules for specific jurisdiction first
-        jurisdiction_rules = self.rules_by_jurisdiction.get(jurisdiction, [])
-        
-        # Query FSI rules
-        fsi_rules = []
-        for rule in jurisdiction_rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            if 'fsi' in text or 'floor space index' in text:
-                fsi_rules.append(rule)
+        # Plot area only matters through the mentioned plot areas it matches
+        key = ('fsi', use_type, jurisdiction, self.ranking.plot_area_bucket(plot_area))
+        return self._cached_lookup(key, lambda: self._lookup_base_fsi(use_type, plot_area, jurisdiction))
+    
+    def _lookup_base_fsi(self, use_type: str, plot_area: float, jurisdiction: str) -> Dict[str, Any]:
+        # FSI rules of the specific jurisdiction first
+        fsi_rows = self._candidate_rows(jurisdiction, ['fsi', 'floor space index'])
         
         # If no jurisdiction-specific rules, search all
-        if not fsi_rules:
-            fsi_rules = [r for r in self.rules if 'fsi' in str(r).lower()]
+        if len(fsi_rows) == 0:
+            masks = np.array(self.category_masks, dtype=np.int64)
+            fsi_rows = np.flatnonzero(masks & int(RuleCategory.FSI))
         
-        # Rank rules
-        ranked_rules = self.rank_rules(fsi_rules, use_type, jurisdiction, plot_area)
+        # Rank rules, keeping the top 10
+        ranked_rules = self._rank_rows(self.ranking, self.rules, fsi_rows, use_type, jurisdiction,
+                                       plot_area, top_k=10)
         
         # Extract FSI values from top-ranked rules
-        for ranked_rule in ranked_rules[:10]:  # Check top 10
+        for ranked_rule in ranked_rules:
             rule = ranked_rule.rule
-            text = rule.get('clause_text', '')
-            
-            fsi_result = self.extract_fsi_value(text, use_type)
+            fsi_result = select_fsi(self.facts.get(rule.get('rule_id'), FactCategory.FSI))
             
             if fsi_result:
                 fsi_value, context = fsi_result
+                text = rule.get('clause_text', '')
                 
                 return {
                     'base_fsi': fsi_value,
@@ -269,47 +277,36 @@ class EnhancedRulesDatabase:
     
     def extract_parking_ratio(self, text: str) -> Optional[Tuple[float, str]]:
         """Enhanced parking ratio extraction"""
-        
-        # Pattern 1: "1 ECS per X sqm"
-        pattern1 = r'1\s+(?:ecs|equivalent\s+car\s+space)\s+per\s+(\d+)\s*(?:sq\.?\s*m|sqm)'
-        matches1 = re.findall(pattern1, text.lower())
-        
-        # Pattern 2: "X sqm per ECS"
-        pattern2 = r'(\d+)\s*(?:sq\.?\s*m|sqm)\s+per\s+(?:ecs|equivalent\s+car\s+space)'
-        matches2 = re.findall(pattern2, text.lower())
-        
-        if matches1:
-            return (float(matches1[0]), 'per_ecs')
-        elif matches2:
-            return (float(matches2[0]), 'per_ecs')
-        
-        return None
+        facts = extract_facts(text).get(FactCategory.PARKING, ())
+        return select_parking_ratio(facts)
     
     def get_parking_requirement_enhanced(self, use_type: str, built_up_area: float,
                                         jurisdiction: str = "maharashtra_udcpr") -> Dict[str, Any]:
         """Enhanced parking calculation with jurisdiction filtering"""
-        
-        # Get jurisdiction-specific rules
-        jurisdiction_rules = self.rules_by_jurisdiction.get(jurisdiction, [])
-        
-        parking_rules = []
-        for rule in jurisdiction_rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            if 'parking' in text or 'ecs' in text:
-                parking_rules.append(rule)
-        
-        # Rank rules
-        ranked_rules = self.rank_rules(parking_rules, use_type, jurisdiction)
+        # The ratio does not depend on the area; required ECS is recomputed per call
+        result = self._cached_lookup(
+            ('parking', use_type, jurisdiction),
+            lambda: self._lookup_parking_requirement(use_type, built_up_area, jurisdiction)
+        )
+        ratio = result['ratio']
+        result['required_ecs'] = int(built_up_area / ratio) + (1 if (built_up_area / ratio) % 1 > 0 else 0)
+        return result
+    
+    def _lookup_parking_requirement(self, use_type: str, built_up_area: float,
+                                    jurisdiction: str) -> Dict[str, Any]:
+        # Jurisdiction-specific parking rules, top 5 by rank
+        parking_rows = self._candidate_rows(jurisdiction, ['parking', 'ecs'])
+        ranked_rules = self._rank_rows(self.ranking, self.rules, parking_rows, use_type, jurisdiction,
+                                       None, top_k=5)
         
         # Extract parking ratios
-        for ranked_rule in ranked_rules[:5]:
+        for ranked_rule in ranked_rules:
             rule = ranked_rule.rule
-            text = rule.get('clause_text', '')
-            
-            ratio_result = self.extract_parking_ratio(text)
+            ratio_result = select_parking_ratio(self.facts.get(rule.get('rule_id'), FactCategory.PARKING))
             
             if ratio_result:
                 ratio, context = ratio_result
+                text = rule.get('clause_text', '')
                 required_ecs = int(built_up_area / ratio) + (1 if (built_up_area / ratio) % 1 > 0 else 0)
                 
                 return {
@@ -349,65 +346,36 @@ class EnhancedRulesDatabase:
     
     def extract_setback_values(self, text: str) -> Dict[str, Optional[float]]:
         """Extract setback values from regulation text"""
-        setbacks = {
-            'front': None,
-            'side': None,
-            'rear': None
-        }
-        
-        text_lower = text.lower()
-        
-        # Pattern: "front setback X m" or "front margin X m"
-        front_pattern = r'front\s+(?:setback|margin)\s+(?:of\s+)?(\d+\.?\d*)\s*(?:m|meter)'
-        front_matches = re.findall(front_pattern, text_lower)
-        if front_matches:
-            setbacks['front'] = float(front_matches[0])
-        
-        # Pattern: "side setback X m"
-        side_pattern = r'side\s+(?:setback|margin)\s+(?:of\s+)?(\d+\.?\d*)\s*(?:m|meter)'
-        side_matches = re.findall(side_pattern, text_lower)
-        if side_matches:
-            setbacks['side'] = float(side_matches[0])
-        
-        # Pattern: "rear setback X m"
-        rear_pattern = r'rear\s+(?:setback|margin)\s+(?:of\s+)?(\d+\.?\d*)\s*(?:m|meter)'
-        rear_matches = re.findall(rear_pattern, text_lower)
-        if rear_matches:
-            setbacks['rear'] = float(rear_matches[0])
-        
-        return setbacks
+        facts = extract_facts(text).get(FactCategory.SETBACK, ())
+        return select_setbacks(facts)
     
     def get_setbacks_enhanced(self, zone: str, plot_area: float, road_width: float,
                              building_height: float, jurisdiction: str = "maharashtra_udcpr") -> Dict[str, Any]:
         """Enhanced setback calculation with regulation parsing"""
-        
-        # Get jurisdiction-specific rules
-        jurisdiction_rules = self.rules_by_jurisdiction.get(jurisdiction, [])
-        
-        setback_rules = []
-        for rule in jurisdiction_rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            if 'setback' in text or 'margin' in text or 'building line' in text:
-                setback_rules.append(rule)
-        
-        # Rank rules
-        ranked_rules = self.rank_rules(setback_rules, zone, jurisdiction, plot_area)
+        # Road width and building height do not affect which rule is found
+        key = ('setback', zone, jurisdiction, self.ranking.plot_area_bucket(plot_area))
+        return self._cached_lookup(key, lambda: self._lookup_setbacks(zone, plot_area, jurisdiction))
+    
+    def _lookup_setbacks(self, zone: str, plot_area: float, jurisdiction: str) -> Dict[str, Any]:
+        # Jurisdiction-specific setback rules, top 10 by rank
+        setback_rows = self._candidate_rows(jurisdiction, ['setback', 'margin', 'building line'])
+        ranked_rules = self._rank_rows(self.ranking, self.rules, setback_rows, zone, jurisdiction,
+                                       plot_area, top_k=10)
         
         # Try to extract setback values
-        for ranked_rule in ranked_rules[:10]:
+        for ranked_rule in ranked_rules:
             rule = ranked_rule.rule
-            text = rule.get('clause_text', '')
-            
-            setbacks = self.extract_setback_values(text)
+            setbacks = select_setbacks(self.facts.get(rule.get('rule_id'), FactCategory.SETBACK))
             
             if any(setbacks.values()):
+                text = rule.get('clause_text', '')
                 return {
                     'setbacks': setbacks,
                     'source': 'database_enhanced',
                     'applied_rules': [rule['rule_id']],
                     'rule_text': text[:200],
                     'priority': ranked_rule.priority.name,
-                    'rules_found': len(setback_rules)
+                    'rules_found': len(setback_rows)
                 }
         
         # Fallback to formula-based calculation
@@ -417,59 +385,34 @@ class EnhancedRulesDatabase:
             'applied_rules': [],
             'rule_text': 'Using formula-based calculation',
             'priority': 'FALLBACK',
-            'rules_found': len(setback_rules)
+            'rules_found': len(setback_rows)
         }
     
     def extract_height_limit(self, text: str) -> Optional[Tuple[float, str]]:
         """Extract height limit from regulation text"""
-        text_lower = text.lower()
-        
-        # Pattern 1: "maximum height X m"
-        pattern1 = r'maximum\s+height\s+(?:of\s+)?(\d+\.?\d*)\s*(?:m|meter)'
-        matches1 = re.findall(pattern1, text_lower)
-        
-        # Pattern 2: "height shall not exceed X m"
-        pattern2 = r'height\s+shall\s+not\s+exceed\s+(\d+\.?\d*)\s*(?:m|meter)'
-        matches2 = re.findall(pattern2, text_lower)
-        
-        # Pattern 3: "up to X m height"
-        pattern3 = r'up\s+to\s+(\d+\.?\d*)\s*(?:m|meter)\s+height'
-        matches3 = re.findall(pattern3, text_lower)
-        
-        if matches1:
-            return (float(matches1[0]), 'maximum')
-        elif matches2:
-            return (float(matches2[0]), 'not_exceed')
-        elif matches3:
-            return (float(matches3[0]), 'up_to')
-        
-        return None
+        facts = extract_facts(text).get(FactCategory.HEIGHT, ())
+        return select_height_limit(facts)
     
     def get_height_limit_enhanced(self, zone: str, road_width: float,
                                   jurisdiction: str = "maharashtra_udcpr") -> Dict[str, Any]:
         """Enhanced height calculation with regulation parsing"""
-        
-        # Get jurisdiction-specific rules
-        jurisdiction_rules = self.rules_by_jurisdiction.get(jurisdiction, [])
-        
-        height_rules = []
-        for rule in jurisdiction_rules:
-            text = (rule.get('title', '') + ' ' + rule.get('clause_text', '')).lower()
-            if 'height' in text or 'storey' in text or 'floor' in text:
-                height_rules.append(rule)
-        
-        # Rank rules
-        ranked_rules = self.rank_rules(height_rules, zone, jurisdiction)
+        return self._cached_lookup(('height', zone, jurisdiction),
+                                   lambda: self._lookup_height_limit(zone, jurisdiction))
+    
+    def _lookup_height_limit(self, zone: str, jurisdiction: str) -> Dict[str, Any]:
+        # Jurisdiction-specific height rules, top 10 by rank
+        height_rows = self._candidate_rows(jurisdiction, ['height', 'storey', 'floor'])
+        ranked_rules = self._rank_rows(self.ranking, self.rules, height_rows, zone, jurisdiction,
+                                       None, top_k=10)
         
         # Try to extract height values
-        for ranked_rule in ranked_rules[:10]:
+        for ranked_rule in ranked_rules:
             rule = ranked_rule.rule
-            text = rule.get('clause_text', '')
-            
-            height_result = self.extract_height_limit(text)
+            height_result = select_height_limit(self.facts.get(rule.get('rule_id'), FactCategory.HEIGHT))
             
             if height_result:
                 height_value, context = height_result
+                text = rule.get('clause_text', '')
                 
                 return {
                     'max_height_m': height_value,
@@ -478,7 +421,7 @@ class EnhancedRulesDatabase:
                     'rule_text': text[:200],
                     'priority': ranked_rule.priority.name,
                     'extraction_context': context,
-                    'rules_found': len(height_rules)
+                    'rules_found': len(height_rows)
                 }
         
         # Fallback to formula-based calculation
@@ -488,9 +431,14 @@ class EnhancedRulesDatabase:
             'applied_rules': [],
             'rule_text': 'Using formula-based calculation',
             'priority': 'FALLBACK',
-            'rules_found': len(height_rules)
+            'rules_found': len(height_rows)
         }
     
+    def rules_in_category(self, category: RuleCategory) -> List[Dict[str, Any]]:
+        """Rules whose category mask includes any of the given categories"""
+        bits = int(category)
+        return [rule for rule, mask in zip(self.rules, self.category_masks) if mask & bits]
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
         stats = {
@@ -500,15 +448,16 @@ class EnhancedRulesDatabase:
             }
         }
         
-        # Count by category
-        for category in ['fsi', 'parking', 'setback', 'height']:
-            count = len([r for r in self.rules if category in str(r).lower()])
-            stats[f'{category}_rules'] = count
+        # Count by category (masks computed once at load)
+        for category, count in count_by_category(self.category_masks).items():
+            stats[f'{category.name.lower()}_rules'] = count
         
+        stats['lookup_cache'] = self.lookup_cache.stats()
         return stats
 
 # Singleton instance
 _enhanced_db_instance = None
+_reload_lock = threading.Lock()
 
 def get_enhanced_rules_database() -> EnhancedRulesDatabase:
     """Get or create enhanced rules database singleton"""
@@ -517,6 +466,18 @@ def get_enhanced_rules_database() -> EnhancedRulesDatabase:
         _enhanced_db_instance = EnhancedRulesDatabase()
     return _enhanced_db_instance
 
+def reload_enhanced_rules_database() -> EnhancedRulesDatabase:
+    """
+    Build a new enhanced database snapshot from the changed rule files and
+    swap it in as the singleton; holders of the old snapshot keep using it.
+    """
+    global _enhanced_db_instance
+    with _reload_lock:
+        current = get_enhanced_rules_database()
+        _enhanced_db_instance = EnhancedRulesDatabase(str(current.rules_dir), current.metadata_only,
+                                                      current.lookup_cache.max_size, previous=current)
+        return _enhanced_db_instance
+
 if __name__ == "__main__":
     # Test enhanced database
     db = EnhancedRulesDatabase()
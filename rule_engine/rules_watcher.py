@@ -0,0 +1,90 @@
+"""
+Rules Watcher - Hot reload of the approved rules when their files change
+
+RulesWatcher polls the manifest of the rules directory (name, size and mtime
+of every rule JSON file, the same manifest a rule pack is checked against) and
+calls a reload function once a change has settled. reload_rules_database and
+reload_enhanced_rules_database build the new snapshot next to the current one,
+re-parsing only the changed files, and swap it in; evaluations already running
+keep the snapshot they started with.
+
+    watcher = RulesWatcher("udcpr_master_data/approved_rules", reload_rules_database)
+    watcher.start()
+"""
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+import sys
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rule_pack import PathLike, source_manifest
+
+DEFAULT_INTERVAL_SECONDS = 5.0
+
+class RulesWatcher:
+    """Polls a rules directory and reloads the rules database when it changes"""
+
+    def __init__(self, rules_dir: PathLike, reload: Callable[[], Any],
+                 interval_seconds: float = DEFAULT_INTERVAL_SECONDS):
+        """
+        reload is called from the watcher thread. The rules are assumed to
+        match the directory as it is when the watcher is created.
+        """
+        if interval_seconds <= 0:
+            raise ValueError(f"Watch interval must be > 0, got {interval_seconds}")
+        self.rules_dir = Path(rules_dir)
+        self.reload = reload
+        self.interval_seconds = interval_seconds
+        self.reloads = 0
+        self._loaded: List[List[Any]] = source_manifest(self.rules_dir)
+        self._pending: Optional[List[List[Any]]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """
+        Poll once; returns True if the rules were reloaded.
+
+        A change is reloaded on the first poll that sees the directory the same
+        as the poll before, so a batch of files being approved is picked up in
+        one reload rather than half-written.
+        """
+        manifest = source_manifest(self.rules_dir)
+        if manifest == self._loaded:
+            self._pending = None
+            return False
+        if manifest != self._pending:
+            self._pending = manifest
+            return False
+
+        self._pending = None
+        try:
+            self.reload()
+        except Exception as e:
+            # Keep serving the current snapshot and retry on a later poll
+            print(f"Error reloading rules from {self.rules_dir}: {e}")
+            return False
+        self._loaded = manifest
+        self.reloads += 1
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.check()
+
+    def start(self) -> None:
+        """Start polling in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rules-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for the thread to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
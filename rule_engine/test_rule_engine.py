@@ -444,3 +444,470 @@ def test_calculation_traces_completeness():
     
     # All traces should have rule_ids
     assert all(len(t.rule_ids) > 0 for t in result.calculation_traces)
+
+def test_batch_evaluation_matches_single():
+    """Test batch evaluation agrees with evaluate_project row by row."""
+    projects = [
+        ProjectInput(
+            jurisdiction="maharashtra_udcpr",
+            zone=use_type,
+            plot_area_sqm=plot_area,
+            road_width_m=road_width,
+            corner_plot=corner,
+            frontage_m=frontage,
+            use_type=use_type,
+            proposed_floors=floors,
+            proposed_height_m=height,
+            proposed_built_up_sqm=built_up,
+            tod_zone=tod,
+            slum_rehab=slum
+        )
+        for plot_area, road_width, frontage, use_type, floors, height, built_up, corner, tod, slum in [
+            (100, 5, 10, "Residential", 2, 6, 90, False, False, False),
+            (125, 6, 10, "Commercial", 3, 9, 300, True, False, False),
+            (500, 12, 20, "Residential", 4, 12, 500, False, False, False),
+            (1200, 18, 30, "Mixed", 8, 26, 2000, False, True, False),
+            (5000, 30, 60, "Residential", 20, 66, 4500, True, False, True),
+            (800, 9, 25, "Industrial", 0, 10, 600, False, False, False),
+            (300, 9, 15, "Residential", 10, 30, 600, False, False, False)
+        ]
+    ]
+    
+    engine = RuleEngine(rules_db={})
+    columns = {
+        field: [getattr(p, field) for p in projects]
+        for field in ProjectInput.model_fields
+    }
+    batch = engine.evaluate_batch(columns)
+    
+    for i, project in enumerate(projects):
+        result = engine.evaluate_project(project)
+        assert batch["permissible_fsi"][i] == result.fsi_result["permissible_fsi"]
+        assert batch["proposed_fsi"][i] == result.fsi_result["proposed_fsi"]
+        assert batch["front_m"][i] == result.setback_result["front_m"]
+        assert batch["side_m"][i] == result.setback_result["side_m"]
+        assert batch["rear_m"][i] == result.setback_result["rear_m"]
+        assert batch["open_space_percent"][i] == result.setback_result["open_space_percent"]
+        assert batch["required_ecs"][i] == result.parking_result["required_ecs"]
+        assert batch["permissible_height_m"][i] == result.height_result["permissible_height_m"]
+        assert batch["permissible_floors"][i] == result.height_result["permissible_floors"]
+        assert batch["max_tdr_loadable_fsi"][i] == result.tdr_result["max_tdr_loadable_fsi"]
+        assert bool(batch["compliant"][i]) == result.compliant
+
+def test_batch_evaluation_rejects_missing_columns():
+    """Test batch evaluation requires the core ProjectInput columns."""
+    engine = RuleEngine(rules_db={})
+    
+    with pytest.raises(ValueError):
+        engine.evaluate_batch({"plot_area_sqm": [500], "road_width_m": [12]})
+
+def test_sweep_envelope_frontier():
+    """Test sweep finds the largest compliant built-up area and height."""
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=500,
+        road_width_m=12,
+        corner_plot=False,
+        frontage_m=20,
+        use_type="Residential",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=500
+    )
+    
+    engine = RuleEngine(rules_db={})
+    sweep = engine.sweep_envelope(
+        project,
+        floors=range(1, 16),
+        heights_m=[float(h) for h in range(3, 61, 3)],
+        built_up_sqm=[float(b) for b in range(100, 1001, 50)]
+    )
+    
+    # FSI 1.0 on 500 sqm and 45m height limit on a 12m road
+    assert sweep["grid_size"] == 15 * 20 * 19
+    assert sweep["max_compliant_built_up_sqm"] == 500.0
+    assert sweep["max_compliant_height_m"] == 45.0
+    
+    # Every frontier point must itself evaluate as compliant
+    for point in sweep["frontier"]:
+        candidate = project.model_copy(update={
+            "proposed_floors": point["proposed_floors"],
+            "proposed_height_m": point["proposed_height_m"],
+            "proposed_built_up_sqm": point["proposed_built_up_sqm"]
+        })
+        assert engine.evaluate_project(candidate).compliant
+
+def test_sweep_envelope_rejects_oversized_grid():
+    """Test sweep refuses grids above the point limit."""
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=500,
+        road_width_m=12,
+        frontage_m=20,
+        use_type="Residential",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=500
+    )
+    
+    engine = RuleEngine(rules_db={})
+    
+    with pytest.raises(ValueError):
+        engine.sweep_envelope(project, range(1, 101), range(1, 101), range(1, 101))
+
+def test_trace_levels():
+    """Test trace level controls which calculation steps are recorded."""
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=500,
+        road_width_m=12,
+        corner_plot=True,
+        frontage_m=20,
+        use_type="Residential",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=500,
+        tod_zone=True
+    )
+    
+    engine = RuleEngine(rules_db={})
+    full = engine.evaluate_project(project, trace_level="full")
+    summary = engine.evaluate_project(project, trace_level="summary")
+    off = engine.evaluate_project(project, trace_level="off")
+    
+    full_ids = [t.step_id for t in full.calculation_traces]
+    summary_ids = [t.step_id for t in summary.calculation_traces]
+    assert "fsi_tod_bonus" in full_ids
+    assert "setback_corner_relaxation" in full_ids
+    assert "fsi_tod_bonus" not in summary_ids
+    assert set(summary_ids) < set(full_ids)
+    assert "fsi_total" in summary_ids
+    assert off.calculation_traces == []
+    
+    # Trace level never changes the results
+    assert off.fsi_result == full.fsi_result
+    assert off.violations == full.violations
+
+def test_concurrent_evaluations_share_one_engine():
+    """Test one engine gives the same results and traces across threads."""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    projects = [
+        ProjectInput(
+            jurisdiction="maharashtra_udcpr",
+            zone="Residential",
+            plot_area_sqm=200 + 150 * i,
+            road_width_m=6 + 3 * (i % 8),
+            corner_plot=i % 2 == 0,
+            frontage_m=15 + i,
+            use_type=["Residential", "Commercial", "Mixed"][i % 3],
+            proposed_floors=2 + i % 10,
+            proposed_height_m=6 + 3 * (i % 10),
+            proposed_built_up_sqm=300 + 100 * i,
+            tod_zone=i % 3 == 0
+        )
+        for i in range(40)
+    ]
+    
+    engine = RuleEngine(rules_db={})
+    expected = [engine.evaluate_project(p) for p in projects]
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(engine.evaluate_project, projects * 5))
+    
+    for i, result in enumerate(results):
+        reference = expected[i % len(projects)]
+        assert result.fsi_result == reference.fsi_result
+        assert result.violations == reference.violations
+        assert [t.model_dump() for t in result.calculation_traces] == \
+               [t.model_dump() for t in reference.calculation_traces]
+
+def test_decision_tables_from_rules_db():
+    """Test that a jurisdiction's decision table overrides the default brackets"""
+    project = ProjectInput(
+        jurisdiction="mumbai_dcpr",
+        zone="Residential",
+        plot_area_sqm=1000,
+        road_width_m=12,
+        corner_plot=False,
+        frontage_m=25,
+        use_type="Residential",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=900
+    )
+    
+    default_engine = RuleEngine(rules_db={})
+    custom_engine = RuleEngine(rules_db={
+        "decision_tables": {
+            "mumbai_dcpr": {
+                "front_setback_m": {"closed": "lower", "breaks": [12], "values": [2.0, 5.0]}
+            }
+        }
+    })
+    
+    assert default_engine.calculate_setbacks(project)["front_m"] == 4.5
+    assert custom_engine.calculate_setbacks(project)["front_m"] == 5.0
+    # Tables not in the override keep their defaults
+    assert custom_engine.calculate_height(project)["permissible_height_m"] == 45.0
+    
+    # Other jurisdictions are untouched
+    udcpr_project = project.model_copy(update={"jurisdiction": "maharashtra_udcpr"})
+    assert custom_engine.calculate_setbacks(udcpr_project)["front_m"] == 4.5
+    
+    # Batch evaluation uses the same tables
+    batch = custom_engine.evaluate_batch({
+        **project.model_dump(),
+        "jurisdiction": ["mumbai_dcpr", "maharashtra_udcpr"]
+    })
+    assert batch["front_m"].tolist() == [5.0, 4.5]
+
+def test_load_decision_tables():
+    """Test swapping decision tables on a loaded engine"""
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=1000,
+        road_width_m=12,
+        corner_plot=False,
+        frontage_m=25,
+        use_type="Commercial",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=900
+    )
+    
+    engine = RuleEngine(rules_db={})
+    assert engine.calculate_fsi(project)["base_fsi"] == 1.5
+    
+    engine.load_decision_tables({
+        "maharashtra_udcpr": {"base_fsi": {"Commercial": 2.0, "default": 1.0}}
+    })
+    assert engine.calculate_fsi(project)["base_fsi"] == 2.0
+    
+    # A malformed table is rejected and the previous tables stay in use
+    with pytest.raises(ValueError):
+        engine.load_decision_tables({
+            "maharashtra_udcpr": {"max_height_m": {"breaks": [6, 9], "values": [10.0]}}
+        })
+    assert engine.calculate_fsi(project)["base_fsi"] == 2.0
+
+def test_evaluation_cache_hits_and_invalidation():
+    """Test that repeat submissions hit the cache and a table swap invalidates it"""
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=1000,
+        road_width_m=12,
+        corner_plot=False,
+        frontage_m=25,
+        use_type="Commercial",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=900
+    )
+    
+    engine = RuleEngine(rules_db={})
+    first = engine.evaluate_project(project)
+    # Same fields in a fresh object (int vs float) hit the same entry
+    second = engine.evaluate_project(project.model_copy(update={"plot_area_sqm": 1000.0}))
+    
+    stats = engine.cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert second.fsi_result == first.fsi_result
+    assert second is not first
+    
+    # Each trace level and rule version is cached separately
+    engine.evaluate_project(project, trace_level="off")
+    engine.evaluate_project(project, rule_version="udcpr_2020")
+    assert engine.cache.stats()["size"] == 3
+    
+    # Mutating a returned result does not leak into the cache
+    second.violations.append("edited")
+    assert "edited" not in engine.evaluate_project(project).violations
+    
+    engine.load_decision_tables({
+        "maharashtra_udcpr": {"base_fsi": {"Commercial": 2.0, "default": 1.0}}
+    })
+    assert engine.cache.stats()["size"] == 0
+    assert engine.evaluate_project(project).fsi_result["base_fsi"] == 2.0
+
+def test_evaluation_cache_lru_and_ttl():
+    """Test size-bounded eviction, expiry and stale-generation puts"""
+    from evaluation_cache import EvaluationCache
+    
+    now = [0.0]
+    cache = EvaluationCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+    
+    now[0] = 10.0
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    
+    # A value computed before a clear() is not stored afterwards
+    generation = cache.generation
+    cache.clear()
+    cache.put("d", 4, generation=generation)
+    assert cache.get("d") is None
+
+def test_evaluate_delta_matches_full_evaluation():
+    """Test that a what-if delta equals a full re-evaluation"""
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=1200,
+        road_width_m=12,
+        corner_plot=True,
+        frontage_m=30,
+        use_type="Residential",
+        proposed_floors=5,
+        proposed_height_m=15,
+        proposed_built_up_sqm=1100,
+        tod_zone=True
+    )
+    
+    engine = RuleEngine(rules_db={}, cache_size=0)
+    previous = engine.evaluate_project(project)
+    
+    for changes in [
+        {"proposed_height_m": 24},
+        {"proposed_built_up_sqm": 2500},
+        {"road_width_m": 18, "corner_plot": False},
+        {"use_type": "Commercial"},
+        {"plot_area_sqm": 900},
+        {"zone": "Commercial"}
+    ]:
+        delta = engine.evaluate_delta(project, previous, changes)
+        full = engine.evaluate_project(ProjectInput(**{**project.model_dump(), **changes}))
+        
+        for field in ["fsi_result", "setback_result", "parking_result", "height_result",
+                      "tdr_result", "compliant", "violations", "warnings"]:
+            assert getattr(delta, field) == getattr(full, field), (changes, field)
+        assert [t.model_dump() for t in delta.calculation_traces] == \
+               [t.model_dump() for t in full.calculation_traces]
+
+def test_evaluate_delta_recomputes_only_affected_modules():
+    """Test that untouched modules are reused from the previous evaluation"""
+    from dependency_graph import affected_modules
+    
+    assert affected_modules(["proposed_height_m"]) == {"setbacks", "height"}
+    assert affected_modules(["proposed_built_up_sqm"]) == {"fsi", "parking", "tdr"}
+    assert affected_modules(["zone"]) == set()
+    
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=1000,
+        road_width_m=12,
+        corner_plot=False,
+        frontage_m=25,
+        use_type="Residential",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=900
+    )
+    
+    engine = RuleEngine(rules_db={})
+    previous = engine.evaluate_project(project)
+    
+    calls = []
+    for name in ["calculate_fsi", "calculate_setbacks", "calculate_parking",
+                 "calculate_height", "calculate_tdr"]:
+        original = getattr(engine, name)
+        def spy(*args, _name=name, _original=original, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+        setattr(engine, name, spy)
+    
+    engine.evaluate_delta(project, previous, {"proposed_height_m": 14})
+    assert calls == ["calculate_setbacks", "calculate_height"]
+    
+    with pytest.raises(ValueError):
+        engine.evaluate_delta(project, previous, {"storeys": 5})
+
+def test_phase_timings_and_metrics():
+    """Test per-phase timings in results and the latency histograms"""
+    from evaluation_metrics import LatencyHistogram
+    
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=1000,
+        road_width_m=12,
+        corner_plot=False,
+        frontage_m=25,
+        use_type="Residential",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=900
+    )
+    
+    engine = RuleEngine(rules_db={})
+    assert engine.evaluate_project(project).phase_timings_ms is None
+    
+    other = project.model_copy(update={"proposed_floors": 5})
+    result = engine.evaluate_project(other, include_timings=True)
+    timings = result.phase_timings_ms
+    assert set(timings) == {"fsi", "setbacks", "parking", "height", "tdr", "compliance", "total"}
+    assert sum(v for k, v in timings.items() if k != "total") <= timings["total"]
+    
+    # A cache hit reports the lookup instead of stale module timings
+    assert set(engine.evaluate_project(other, include_timings=True).phase_timings_ms) == {"cache_hit"}
+    
+    snapshot = engine.metrics.snapshot()
+    assert snapshot["total"]["count"] == 2
+    assert snapshot["cache_hit"]["count"] == 1
+    assert snapshot["total"]["buckets"][-1] == {"le": "+Inf", "count": 2}
+    assert 'rule_engine_phase_latency_ms_count{phase="fsi"} 2' in engine.metrics.to_prometheus()
+    
+    histogram = LatencyHistogram(buckets_ms=[1, 10, 100])
+    for value in [0.5] * 50 + [5] * 49 + [50]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) <= 1
+    assert 1 < histogram.quantile(0.99) <= 10
+    assert histogram.quantile(1.0) == 50
+
+def test_response_encoding():
+    """Test the single-pass JSON encoder and the optional MessagePack path"""
+    import json
+    from response_encoding import MSGPACK_SUPPORT, encode_json, encode_response, wants_msgpack
+    
+    project = ProjectInput(
+        jurisdiction="maharashtra_udcpr",
+        zone="Residential",
+        plot_area_sqm=1000,
+        road_width_m=12,
+        corner_plot=True,
+        frontage_m=25,
+        use_type="Residential",
+        proposed_floors=4,
+        proposed_height_m=12,
+        proposed_built_up_sqm=900,
+        tod_zone=True
+    )
+    result = RuleEngine(rules_db={}).evaluate_project(project)
+    
+    decoded = json.loads(encode_json(result))
+    assert decoded == result.model_dump(mode="json")
+    assert decoded["evaluated_at"] == result.evaluated_at.isoformat()
+    assert [t["step_id"] for t in decoded["calculation_traces"]] == \
+           [t.step_id for t in result.calculation_traces]
+    
+    assert encode_response(result, "application/json")[1] == "application/json"
+    assert wants_msgpack("application/x-msgpack;q=0.9, application/json;q=0.5")
+    assert not wants_msgpack("*/*")
+    
+    if MSGPACK_SUPPORT:
+        import msgpack
+        body, media_type = encode_response(result, "application/msgpack")
+        assert media_type == "application/msgpack"
+        assert msgpack.unpackb(body) == decoded
@@ -1,10 +1,24 @@
 """
 Validation Layer - Compare engine results with regulations and flag discrepancies
 Provides confidence scores and warnings for calculation results
+
+The values a validation compares against depend only on the category, use
+type and jurisdiction, so they are gathered once per combination into a
+ValueIndex sorted by value: matches within the tolerance and the closest
+alternatives are then found by binary search instead of re-querying the
+corpus and rescanning its rules on every validation.
 """
-from typing import Dict, List, Any, Optional
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from pathlib import Path
+import sys
+
+# Add current directory to path for sibling modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rule_facts import FactCategory, extract_facts
 
 class ConfidenceLevel(Enum):
     """Confidence level for calculation results"""
@@ -29,50 +43,106 @@ class ValidationResult:
     applied_rules: List[str]
     alternative_values: List[Dict[str, Any]] = None
 
+class ValueIndex:
+    """Values found in the rules a validation checks, sorted for binary search"""
+    
+    def __init__(self, field: str, found: Sequence[Dict[str, Any]], rules_checked: int):
+        """found: one entry per value, in the order the rules state them; field names the value"""
+        self.field = field
+        self.found = tuple(found)
+        self.rules_checked = rules_checked
+        # Positions into found, ordered by (value, position)
+        self._order = sorted(range(len(self.found)), key=lambda i: (self.found[i][field], i))
+        self._values = [self.found[i][field] for i in self._order]
+    
+    def __len__(self) -> int:
+        return len(self.found)
+    
+    def within(self, value: float, tolerance: float) -> List[Dict[str, Any]]:
+        """Entries whose value differs from value by less than tolerance, in found order"""
+        # The window is widened so float rounding cannot drop an entry; the exact test decides
+        lo = bisect_left(self._values, value - 2 * tolerance)
+        hi = bisect_right(self._values, value + 2 * tolerance)
+        positions = sorted(i for i in self._order[lo:hi] if abs(self.found[i][self.field] - value) < tolerance)
+        return [dict(self.found[i]) for i in positions]
+    
+    def closest(self, value: float, count: int) -> List[Dict[str, Any]]:
+        """The count entries nearest to value, nearest first (ties in found order)"""
+        split = bisect_left(self._values, value)
+        # The nearest count on each side, plus entries tied with the last one taken
+        candidates = self._side(range(split - 1, -1, -1), count) + self._side(range(split, len(self._values)), count)
+        candidates.sort(key=lambda i: (abs(self.found[i][self.field] - value), i))
+        return [dict(self.found[i]) for i in candidates[:count]]
+    
+    def _side(self, ranks: range, count: int) -> List[int]:
+        taken: List[int] = []
+        for rank in ranks:
+            if len(taken) >= count and self._values[rank] != self.found[taken[-1]][self.field]:
+                break
+            taken.append(self._order[rank])
+        return taken
+
 class RuleEngineValidator:
     """Validates rule engine calculations against regulations"""
     
     def __init__(self, rules_db):
         self.db = rules_db
         self.validation_results: List[ValidationResult] = []
+        # (category, use type, jurisdiction) -> values to validate against, for one db generation
+        self._value_indexes: Dict[Tuple[FactCategory, str, Optional[str]], ValueIndex] = {}
+        self._indexed_generation = None
     
+    def _fact_values(self, rule: Dict[str, Any], text: str, category: FactCategory) -> List[float]:
+        """Loosely stated FSI or ECS values of a rule, from the database's fact table if it has one"""
+        facts = getattr(self.db, 'facts', None)
+        if facts is not None:
+            return facts.values(rule.get('rule_id'), category, 'mention')
+        return [f.value for f in extract_facts(text).get(category, ()) if f.context == 'mention']
+
+    def _value_index(self, category: FactCategory, use_type: str,
+                     jurisdiction: Optional[str] = None) -> ValueIndex:
+        """FSI values or ECS ratios stated in the top 10 applicable rules, built once per db generation"""
+        generation = getattr(self.db, 'generation', None)
+        if generation != self._indexed_generation:
+            self._value_indexes = {}
+            self._indexed_generation = generation
+        key = (category, use_type.lower(), jurisdiction)
+        index = self._value_indexes.get(key)
+        if index is not None:
+            return index
+
+        found = []
+        if category == FactCategory.FSI:
+            rules = self.db.query_fsi_rules(use_type, None, jurisdiction)
+            for rule in rules[:10]:  # Check top 10 rules
+                text = rule.get('clause_text', '').lower()
+                # Only rules naming the use type
+                if use_type.lower() in text:
+                    found += [{'value': value, 'rule_id': rule['rule_id'], 'rule_text': text[:150]}
+                              for value in self._fact_values(rule, text, category) if 0.5 <= value <= 5.0]
+            index = ValueIndex('value', found, len(rules))
+        else:
+            rules = self.db.query_parking_rules(use_type)
+            for rule in rules[:10]:
+                text = rule.get('clause_text', '')
+                # Pattern: "1 ECS per 100" or "1 ECS per 50"
+                found += [{'ratio': ratio, 'rule_id': rule['rule_id'], 'rule_text': text[:150]}
+                          for ratio in self._fact_values(rule, text, category)]
+            index = ValueIndex('ratio', found, len(rules))
+
+        self._value_indexes[key] = index
+        return index
+
     def validate_fsi_calculation(self, project_input: Dict[str, Any], 
                                  engine_result: Dict[str, Any]) -> ValidationResult:
         """Validate FSI calculation"""
         
-        # Query all applicable FSI rules
-        fsi_rules = self.db.query_fsi_rules(
-            project_input['use_type'],
-            project_input['plot_area_sqm'],
-            project_input['jurisdiction']
-        )
-        
-        # Extract FSI values from rules
-        found_fsi_values = []
-        for rule in fsi_rules[:10]:  # Check top 10 rules
-            text = rule.get('clause_text', '').lower()
-            use_type = project_input['use_type'].lower()
-            
-            if use_type in text:
-                # Look for FSI values
-                import re
-                matches = re.findall(r'fsi.*?(\d+\.?\d*)', text, re.IGNORECASE)
-                for match in matches:
-                    try:
-                        fsi_val = float(match)
-                        if 0.5 <= fsi_val <= 5.0:
-                            found_fsi_values.append({
-                                'value': fsi_val,
-                                'rule_id': rule['rule_id'],
-                                'rule_text': text[:150]
-                            })
-                    except ValueError:
-                        continue
+        values = self._value_index(FactCategory.FSI, project_input['use_type'], project_input['jurisdiction'])
         
         engine_fsi = engine_result.get('base_fsi', 0)
         
         # Check if engine FSI matches any found values
-        matching_rules = [f for f in found_fsi_values if abs(f['value'] - engine_fsi) < 0.1]
+        matching_rules = values.within(engine_fsi, 0.1)
         
         if matching_rules:
             # Engine FSI matches regulations
@@ -83,23 +153,23 @@ class RuleEngineValidator:
                 details={
                     'engine_fsi': engine_fsi,
                     'matching_rules': len(matching_rules),
-                    'total_rules_checked': len(fsi_rules)
+                    'total_rules_checked': values.rules_checked
                 },
                 applied_rules=[r['rule_id'] for r in matching_rules],
                 alternative_values=None
             )
         
-        elif found_fsi_values:
+        elif values:
             # Engine FSI doesn't match, but alternatives exist
-            alternatives = sorted(found_fsi_values, key=lambda x: abs(x['value'] - engine_fsi))[:3]
+            alternatives = values.closest(engine_fsi, 3)
             
             return ValidationResult(
                 status=ValidationStatus.WARNING,
                 confidence=ConfidenceLevel.MEDIUM,
-                message=f"FSI {engine_fsi} doesn't match regulations. Found {len(found_fsi_values)} alternative values",
+                message=f"FSI {engine_fsi} doesn't match regulations. Found {len(values)} alternative values",
                 details={
                     'engine_fsi': engine_fsi,
-                    'alternatives_found': len(found_fsi_values),
+                    'alternatives_found': len(values),
                     'closest_alternative': alternatives[0]['value'] if alternatives else None
                 },
                 applied_rules=engine_result.get('base_fsi_rules', []),
@@ -114,7 +184,7 @@ class RuleEngineValidator:
                 message=f"Could not validate FSI {engine_fsi} - no matching regulations found",
                 details={
                     'engine_fsi': engine_fsi,
-                    'rules_searched': len(fsi_rules)
+                    'rules_searched': values.rules_checked
                 },
                 applied_rules=engine_result.get('base_fsi_rules', []),
                 alternative_values=None
@@ -124,29 +194,12 @@ class RuleEngineValidator:
                                      engine_result: Dict[str, Any]) -> ValidationResult:
         """Validate parking calculation"""
         
-        parking_rules = self.db.query_parking_rules(project_input['use_type'])
-        
-        # Look for ECS ratios
-        found_ratios = []
-        for rule in parking_rules[:10]:
-            text = rule.get('clause_text', '')
-            
-            import re
-            # Pattern: "1 ECS per 100" or "1 ECS per 50"
-            matches = re.findall(r'1\s+ECS\s+per\s+(\d+)', text, re.IGNORECASE)
-            
-            for match in matches:
-                ratio = float(match)
-                found_ratios.append({
-                    'ratio': ratio,
-                    'rule_id': rule['rule_id'],
-                    'rule_text': text[:150]
-                })
+        values = self._value_index(FactCategory.PARKING, project_input['use_type'])
         
         engine_ratio = engine_result.get('ratio', 0)
         
         # Check if engine ratio matches
-        matching = [r for r in found_ratios if abs(r['ratio'] - engine_ratio) < 1]
+        matching = values.within(engine_ratio, 1)
         
         if matching:
             return ValidationResult(
@@ -161,8 +214,8 @@ class RuleEngineValidator:
                 alternative_values=None
             )
         
-        elif found_ratios:
-            alternatives = sorted(found_ratios, key=lambda x: abs(x['ratio'] - engine_ratio))[:3]
+        elif values:
+            alternatives = values.closest(engine_ratio, 3)
             
             return ValidationResult(
                 status=ValidationStatus.WARNING,
@@ -170,7 +223,7 @@ class RuleEngineValidator:
                 message=f"Parking ratio {engine_ratio} doesn't match regulations",
                 details={
                     'engine_ratio': engine_ratio,
-                    'alternatives_found': len(found_ratios)
+                    'alternatives_found': len(values)
                 },
                 applied_rules=engine_result.get('parking_rules', []),
                 alternative_values=alternatives
@@ -183,7 +236,7 @@ class RuleEngineValidator:
                 message=f"Could not validate parking ratio {engine_ratio}",
                 details={
                     'engine_ratio': engine_ratio,
-                    'rules_searched': len(parking_rules)
+                    'rules_searched': values.rules_checked
                 },
                 applied_rules=engine_result.get('parking_rules', []),
                 alternative_values=None
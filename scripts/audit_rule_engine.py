@@ -10,6 +10,24 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import json
 from pathlib import Path
 from rule_engine.rule_engine import RuleEngine
+from rule_engine.rule_pack import load_rules
+from rule_engine.keyword_matcher import KeywordClassifier
+
+# Substrings of str(rule).lower() that select the rules each audit compares against,
+# and (*_count) the ones counted in the summary
+AUDIT_KEYWORDS = {
+    "fsi": ("fsi", "floor space index"),
+    "setback": ("setback", "margin"),
+    "coverage": ("coverage", "ground coverage"),
+    "height": ("height", "storey"),
+    "parking": ("parking", "ecs"),
+    "fsi_count": ("fsi",),
+    "setback_count": ("setback",),
+    "coverage_count": ("coverage",),
+    "height_count": ("height",),
+    "parking_count": ("parking",)
+}
+AUDIT_CLASSIFIER = KeywordClassifier(AUDIT_KEYWORDS)
 
 class RuleEngineAuditor:
     def __init__(self):
@@ -23,22 +41,24 @@ class RuleEngineAuditor:
             "parking_rules": [],
             "summary": {}
         }
+        self.rule_texts = {}
+        self.rules_by_category = {}
+        self._categorized = None
     
     def load_real_rules(self):
-        """Load all extracted rules from JSON files"""
-        all_rules = []
-        for json_file in self.rules_dir.glob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        all_rules.extend(data)
-                    elif isinstance(data, dict):
-                        # Each file contains a single rule object
-                        all_rules.append(data)
-            except Exception as e:
-                print(f"Error loading {json_file}: {e}")
-        return all_rules
+        """Load all extracted rules from the rule pack or JSON files"""
+        return load_rules(self.rules_dir)
+    
+    def categorize_rules(self, real_rules):
+        """Rules in each audit category; each rule is stringified and classified once"""
+        if self._categorized is not real_rules:
+            self.rule_texts = {id(rule): str(rule).lower() for rule in real_rules}
+            self.rules_by_category = {category: [] for category in AUDIT_KEYWORDS}
+            for rule in real_rules:
+                for category in AUDIT_CLASSIFIER.classify(self.rule_texts[id(rule)]):
+                    self.rules_by_category[category].append(rule)
+            self._categorized = real_rules
+        return self.rules_by_category
     
     def audit_fsi_calculations(self, real_rules):
         """Audit FSI calculation logic"""
@@ -47,7 +67,7 @@ class RuleEngineAuditor:
         print("="*80)
         
         # Find FSI-related rules
-        fsi_rules = [r for r in real_rules if 'fsi' in str(r).lower() or 'floor space index' in str(r).lower()]
+        fsi_rules = self.categorize_rules(real_rules)["fsi"]
         print(f"\nFound {len(fsi_rules)} FSI-related rules in extracted data")
         
         # Test cases
@@ -76,7 +96,7 @@ class RuleEngineAuditor:
             
             # Find matching real rules
             zone_lower = test['zone'].lower()
-            matching = [r for r in fsi_rules if zone_lower in str(r).lower()]
+            matching = [r for r in fsi_rules if zone_lower in self.rule_texts[id(r)]]
             if matching:
                 print(f"Matching Real Rules ({len(matching)}):")
                 for rule in matching[:3]:  # Show first 3
@@ -95,7 +115,7 @@ class RuleEngineAuditor:
         print("="*80)
         
         # Find setback-related rules
-        setback_rules = [r for r in real_rules if 'setback' in str(r).lower() or 'margin' in str(r).lower()]
+        setback_rules = self.categorize_rules(real_rules)["setback"]
         print(f"\nFound {len(setback_rules)} setback-related rules in extracted data")
         
         # Test cases
@@ -124,7 +144,7 @@ class RuleEngineAuditor:
             
             # Find matching real rules
             zone_lower = test['zone'].lower()
-            matching = [r for r in setback_rules if zone_lower in str(r).lower()]
+            matching = [r for r in setback_rules if zone_lower in self.rule_texts[id(r)]]
             if matching:
                 print(f"Matching Real Rules ({len(matching)}):")
                 for rule in matching[:3]:
@@ -143,7 +163,7 @@ class RuleEngineAuditor:
         print("="*80)
         
         # Find coverage-related rules
-        coverage_rules = [r for r in real_rules if 'coverage' in str(r).lower() or 'ground coverage' in str(r).lower()]
+        coverage_rules = self.categorize_rules(real_rules)["coverage"]
         print(f"\nFound {len(coverage_rules)} coverage-related rules in extracted data")
         
         print("\nNote: Current RuleEngine calculates coverage via setbacks (open space)")
@@ -176,7 +196,7 @@ class RuleEngineAuditor:
             
             # Find matching real rules
             zone_lower = test['zone'].lower()
-            matching = [r for r in coverage_rules if zone_lower in str(r).lower()]
+            matching = [r for r in coverage_rules if zone_lower in self.rule_texts[id(r)]]
             if matching:
                 print(f"Matching Real Rules ({len(matching)}):")
                 for rule in matching[:3]:
@@ -195,7 +215,7 @@ class RuleEngineAuditor:
         print("="*80)
         
         # Find height-related rules
-        height_rules = [r for r in real_rules if 'height' in str(r).lower() or 'storey' in str(r).lower()]
+        height_rules = self.categorize_rules(real_rules)["height"]
         print(f"\nFound {len(height_rules)} height-related rules in extracted data")
         
         # Test cases
@@ -224,7 +244,7 @@ class RuleEngineAuditor:
             
             # Find matching real rules
             zone_lower = test['zone'].lower()
-            matching = [r for r in height_rules if zone_lower in str(r).lower()]
+            matching = [r for r in height_rules if zone_lower in self.rule_texts[id(r)]]
             if matching:
                 print(f"Matching Real Rules ({len(matching)}):")
                 for rule in matching[:3]:
@@ -243,7 +263,7 @@ class RuleEngineAuditor:
         print("="*80)
         
         # Find parking-related rules
-        parking_rules = [r for r in real_rules if 'parking' in str(r).lower() or 'ecs' in str(r).lower()]
+        parking_rules = self.categorize_rules(real_rules)["parking"]
         print(f"\nFound {len(parking_rules)} parking-related rules in extracted data")
         
         # Test cases
@@ -271,7 +291,7 @@ class RuleEngineAuditor:
             
             # Find matching real rules
             zone_lower = test['zone'].lower()
-            matching = [r for r in parking_rules if zone_lower in str(r).lower()]
+            matching = [r for r in parking_rules if zone_lower in self.rule_texts[id(r)]]
             if matching:
                 print(f"Matching Real Rules ({len(matching)}):")
                 for rule in matching[:3]:
@@ -292,11 +312,11 @@ class RuleEngineAuditor:
         total_rules = len(real_rules)
         
         # Count rules by category
-        fsi_count = len([r for r in real_rules if 'fsi' in str(r).lower()])
-        setback_count = len([r for r in real_rules if 'setback' in str(r).lower()])
-        coverage_count = len([r for r in real_rules if 'coverage' in str(r).lower()])
-        height_count = len([r for r in real_rules if 'height' in str(r).lower()])
-        parking_count = len([r for r in real_rules if 'parking' in str(r).lower()])
+        fsi_count = len(self.categorize_rules(real_rules)["fsi_count"])
+        setback_count = len(self.categorize_rules(real_rules)["setback_count"])
+        coverage_count = len(self.categorize_rules(real_rules)["coverage_count"])
+        height_count = len(self.categorize_rules(real_rules)["height_count"])
+        parking_count = len(self.categorize_rules(real_rules)["parking_count"])
         
         summary = {
             "total_extracted_rules": total_rules,
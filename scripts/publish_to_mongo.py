@@ -3,6 +3,7 @@
 Publish approved rules to MongoDB.
 """
 import os
+import sys
 import json
 from pathlib import Path
 from pymongo import MongoClient
@@ -10,10 +11,14 @@ from datetime import datetime
 from dotenv import load_dotenv
 import hashlib
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rule_engine.rule_versions import archive_rule_version
+
 load_dotenv()
 
 WORK_DIR = Path("udcpr_master_data")
 APPROVED_DIR = WORK_DIR / "approved_rules"
+VERSIONS_DIR = WORK_DIR / "rule_versions"
 
 def connect_mongo():
     """Connect to MongoDB."""
@@ -80,12 +85,16 @@ def publish_rules():
     checksum_data = json.dumps(all_rules, sort_keys=True, default=str)
     checksum = hashlib.sha256(checksum_data.encode()).hexdigest()
     
+    # Archive the published files so evaluations can be pinned to this version
+    archive_dir = archive_rule_version(APPROVED_DIR, version_id, VERSIONS_DIR)
+    
     version_doc = {
         'version_id': version_id,
         'source_files': [f.name for f in approved_files],
         'rule_count': total_inserted,
         'created_at': datetime.now(),
-        'checksum': checksum
+        'checksum': checksum,
+        'archive_dir': str(archive_dir)
     }
     
     db.rule_versions.insert_one(version_doc)
@@ -109,6 +118,7 @@ def publish_rules():
     print(f"✓ Published {total_inserted} rules to MongoDB")
     print(f"  Version: {version_id}")
     print(f"  Checksum: {checksum[:16]}...")
+    print(f"  Archived: {archive_dir}")
     print("="*60)
     
     # Log to file
@@ -0,0 +1,73 @@
+"""
+Synthetic Project Generator - Realistic random ProjectInput populations for benchmarks
+
+Projects are returned as plain field dicts so each engine can build its own
+ProjectInput model. The first projects walk every jurisdiction x use type x
+bonus-flag combination, so even a small population covers every code path.
+"""
+import itertools
+import math
+import random
+from typing import Any, Dict, List
+
+JURISDICTIONS = ["maharashtra_udcpr", "mumbai_dcpr"]
+USE_TYPES = ["Residential", "Commercial", "Industrial", "Mixed"]
+BONUS_FLAGS = ["tod_zone", "redevelopment", "slum_rehab"]
+
+# Common DP road widths (m), weighted towards narrow urban roads
+ROAD_WIDTHS = [4.5, 6, 7.5, 9, 12, 15, 18, 24, 30, 36, 45]
+ROAD_WIDTH_WEIGHTS = [3, 8, 6, 10, 10, 6, 6, 4, 3, 2, 1]
+
+def _random_project(rng: random.Random, jurisdiction: str, use_type: str,
+                    flags: Dict[str, bool]) -> Dict[str, Any]:
+    """One plausible project for the given jurisdiction, use type and bonus flags"""
+    # Plot areas are roughly log-normal: many small plots, a long tail of large ones
+    plot_area = round(min(max(rng.lognormvariate(math.log(800), 1.0), 60), 40000), 1)
+    road_width = rng.choices(ROAD_WIDTHS, weights=ROAD_WIDTH_WEIGHTS)[0]
+    frontage = round(min(math.sqrt(plot_area) * rng.uniform(0.5, 1.5), plot_area / 4), 1)
+
+    # Taller buildings on wider roads, with some deliberately over the limit
+    floors = max(1, min(int(rng.expovariate(1 / (2 + road_width / 3))) + 1, 40))
+    floor_height = rng.uniform(2.6, 4.2)
+
+    # Built-up area around the typical FSI band, sometimes exceeding it
+    target_fsi = rng.uniform(0.3, 2.5) + (0.5 if flags["tod_zone"] else 0.0)
+
+    return {
+        "jurisdiction": jurisdiction,
+        "zone": use_type,
+        "plot_area_sqm": plot_area,
+        "road_width_m": float(road_width),
+        "corner_plot": rng.random() < 0.2,
+        "frontage_m": max(frontage, 3.0),
+        "use_type": use_type,
+        "proposed_floors": floors,
+        "proposed_height_m": round(floors * floor_height, 1),
+        "proposed_built_up_sqm": round(plot_area * target_fsi, 1),
+        **flags
+    }
+
+def generate_projects(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate count ProjectInput field dicts.
+
+    The same seed always gives the same population, so benchmark runs are
+    comparable across commits.
+    """
+    rng = random.Random(seed)
+    combinations = list(itertools.product(
+        JURISDICTIONS, USE_TYPES, itertools.product([False, True], repeat=len(BONUS_FLAGS))
+    ))
+
+    projects = []
+    for i in range(count):
+        if i < len(combinations):
+            jurisdiction, use_type, flag_values = combinations[i]
+        else:
+            jurisdiction = rng.choice(JURISDICTIONS)
+            use_type = rng.choice(USE_TYPES)
+            # Bonus flags are uncommon in practice
+            flag_values = [rng.random() < p for p in (0.15, 0.10, 0.05)]
+        flags = dict(zip(BONUS_FLAGS, flag_values))
+        projects.append(_random_project(rng, jurisdiction, use_type, flags))
+    return projects
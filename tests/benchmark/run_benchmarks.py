@@ -0,0 +1,220 @@
+"""
+Rule Engine Benchmarks - Throughput and latency for the engines and rule lookups
+
+Run from the repository root:
+
+    python tests/benchmark/run_benchmarks.py
+    python tests/benchmark/run_benchmarks.py --baseline tests/benchmark/baseline.json
+
+Results are written as JSON (one entry per benchmark with throughput, mean,
+p50 and p99 latency). With --baseline, any benchmark whose p50 latency is more
+than --threshold slower than the baseline is reported and the exit code is 1.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Add project root and this directory to path
+benchmark_dir = Path(__file__).resolve().parent
+project_root = benchmark_dir.parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(benchmark_dir))
+
+from project_generator import generate_projects
+
+DEFAULT_OUTPUT = benchmark_dir / "results" / "latest.json"
+DEFAULT_THRESHOLD = 0.25  # Fail when p50 latency is more than 25% above baseline
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def measure(name: str, func: Callable[[Any], Any], inputs: Sequence[Any],
+            warmup: int = 10, items_per_call: int = 1) -> Dict[str, Any]:
+    """Time func over every input; throughput counts items_per_call items per call"""
+    for item in inputs[:warmup]:
+        func(item)
+
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        t0 = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    calls = len(latencies)
+    result = {
+        "name": name,
+        "calls": calls,
+        "items": calls * items_per_call,
+        "total_s": total,
+        "throughput_per_s": calls * items_per_call / total if total > 0 else 0.0,
+        "mean_ms": sum(latencies) / calls * 1000 if calls else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if calls else 0.0
+    }
+    print(f"  {name:<48} {result['throughput_per_s']:>10.1f}/s  "
+          f"p50 {result['p50_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms")
+    return result
+
+def bench_rule_engine(projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """RuleEngine single and batch evaluation (cache disabled)"""
+    from rule_engine.rule_engine import RuleEngine, ProjectInput
+
+    engine = RuleEngine(rules_db={}, cache_size=0)
+    inputs = [ProjectInput(**p) for p in projects]
+    results = [
+        measure(f"rule_engine.evaluate_project[{level}]",
+                lambda p, level=level: engine.evaluate_project(p, trace_level=level), inputs)
+        for level in ("full", "summary", "off")
+    ]
+
+    columns = {name: [p[name] for p in projects] for name in projects[0]}
+    results.append(measure("rule_engine.evaluate_batch", engine.evaluate_batch,
+                           [columns] * 20, warmup=2, items_per_call=len(projects)))
+    return results
+
+def bench_database_engine(projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """DatabaseDrivenRuleEngine evaluation over the approved rules (cache disabled)"""
+    from rule_engine.rule_engine_v2 import DatabaseDrivenRuleEngine, ProjectInput
+
+    engine = DatabaseDrivenRuleEngine(cache_size=0)
+    inputs = [ProjectInput(**p) for p in projects]
+    # "full" prints per-step diagnostics, so time the summary trace level
+    return [measure("database_engine.evaluate_project[summary]",
+                    lambda p: engine.evaluate_project(p, trace_level="summary"), inputs, warmup=3)]
+
+def bench_enhanced_database(projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """EnhancedRulesDatabase ranked lookups (lookup cache disabled)"""
+    from rule_engine.rules_database_v2 import EnhancedRulesDatabase
+
+    db = EnhancedRulesDatabase(lookup_cache_size=0)
+    return [
+        measure("enhanced_db.get_base_fsi_enhanced",
+                lambda p: db.get_base_fsi_enhanced(p["use_type"], p["plot_area_sqm"], p["jurisdiction"]),
+                projects, warmup=3),
+        measure("enhanced_db.get_parking_requirement_enhanced",
+                lambda p: db.get_parking_requirement_enhanced(
+                    p["use_type"], p["proposed_built_up_sqm"], p["jurisdiction"]),
+                projects, warmup=3),
+        measure("enhanced_db.get_setbacks_enhanced",
+                lambda p: db.get_setbacks_enhanced(
+                    p["zone"], p["plot_area_sqm"], p["road_width_m"], p["proposed_height_m"],
+                    p["jurisdiction"]),
+                projects, warmup=3),
+        measure("enhanced_db.get_height_limit_enhanced",
+                lambda p: db.get_height_limit_enhanced(p["zone"], p["road_width_m"], p["jurisdiction"]),
+                projects, warmup=3)
+    ]
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+                        threshold: float) -> List[Dict[str, Any]]:
+    """Benchmarks whose p50 latency regressed by more than threshold"""
+    baseline_by_name = {b["name"]: b for b in baseline.get("benchmarks", [])}
+    regressions = []
+    for result in results:
+        previous = baseline_by_name.get(result["name"])
+        if previous is None or previous["p50_ms"] <= 0:
+            continue
+        change = result["p50_ms"] / previous["p50_ms"] - 1
+        if change > threshold:
+            regressions.append({
+                "name": result["name"],
+                "baseline_p50_ms": previous["p50_ms"],
+                "p50_ms": result["p50_ms"],
+                "change_percent": change * 100
+            })
+    return regressions
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=project_root, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(projects: int = 2000, db_projects: int = 200, seed: int = 0,
+                   suites: Sequence[str] = ("rule_engine", "database_engine", "enhanced_db")) -> Dict[str, Any]:
+    """Run the selected suites and return the machine-readable report"""
+    # The rules databases load approved_rules relative to the repository root
+    os.chdir(project_root)
+
+    population = generate_projects(projects, seed=seed)
+    benchmarks = []
+    if "rule_engine" in suites:
+        benchmarks += bench_rule_engine(population)
+    if "database_engine" in suites:
+        benchmarks += bench_database_engine(population[:db_projects])
+    if "enhanced_db" in suites:
+        benchmarks += bench_enhanced_database(population[:db_projects])
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "projects": projects,
+        "db_projects": db_projects,
+        "benchmarks": benchmarks
+    }
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the UDCPR rule engines")
+    parser.add_argument("--projects", type=int, default=2000, help="Projects for RuleEngine benchmarks")
+    parser.add_argument("--db-projects", type=int, default=200,
+                        help="Projects for the (slower) database-driven benchmarks")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic population seed")
+    parser.add_argument("--suite", action="append", choices=["rule_engine", "database_engine", "enhanced_db"],
+                        help="Suite to run (repeatable, default all)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--baseline", type=Path, help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed p50 slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*80)
+    print("UDCPR MASTER - RULE ENGINE BENCHMARKS")
+    print("="*80 + "\n")
+
+    report = run_benchmarks(args.projects, args.db_projects, args.seed,
+                            args.suite or ("rule_engine", "database_engine", "enhanced_db"))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report["benchmarks"], baseline, args.threshold)
+        report["baseline"] = str(args.baseline)
+        report["threshold"] = args.threshold
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"✗ REGRESSION {r['name']}: p50 {r['baseline_p50_ms']:.3f} -> {r['p50_ms']:.3f} ms "
+                  f"(+{r['change_percent']:.1f}%)")
+        if regressions:
+            exit_code = 1
+        else:
+            print(f"✓ No benchmark slower than baseline by more than {args.threshold:.0%}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}\n")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
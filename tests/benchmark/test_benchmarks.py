@@ -0,0 +1,52 @@
+"""
+Smoke tests for the benchmark suite (generator coverage and regression check)
+"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from project_generator import generate_projects, JURISDICTIONS, USE_TYPES, BONUS_FLAGS
+from run_benchmarks import compare_to_baseline, measure, percentile
+
+class TestBenchmarkSuite:
+    """Test the synthetic population and result handling"""
+    
+    def test_generator_covers_every_combination(self):
+        """Test every jurisdiction x use type x bonus flag combination is present"""
+        projects = generate_projects(100, seed=1)
+        
+        combinations = {
+            (p["jurisdiction"], p["use_type"], tuple(p[f] for f in BONUS_FLAGS))
+            for p in projects
+        }
+        assert len(combinations) == len(JURISDICTIONS) * len(USE_TYPES) * 2 ** len(BONUS_FLAGS)
+    
+    def test_generator_is_deterministic_and_valid(self):
+        """Test the same seed gives the same valid population"""
+        from rule_engine.rule_engine import ProjectInput
+        
+        projects = generate_projects(200, seed=7)
+        assert projects == generate_projects(200, seed=7)
+        
+        for p in projects:
+            project = ProjectInput(**p)
+            assert project.plot_area_sqm > 0
+            assert 0 < project.frontage_m <= project.plot_area_sqm
+            assert project.proposed_floors >= 1
+    
+    def test_measure_and_regression_threshold(self):
+        """Test latency stats and baseline comparison"""
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+        assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+        
+        result = measure("noop", lambda x: x, list(range(50)), warmup=0)
+        assert result["calls"] == 50
+        assert result["p50_ms"] <= result["p99_ms"] <= result["max_ms"]
+        
+        baseline = {"benchmarks": [{"name": "a", "p50_ms": 1.0}, {"name": "b", "p50_ms": 1.0}]}
+        current = [{"name": "a", "p50_ms": 1.2}, {"name": "b", "p50_ms": 1.5}, {"name": "c", "p50_ms": 9.0}]
+        regressions = compare_to_baseline(current, baseline, threshold=0.25)
+        assert [r["name"] for r in regressions] == ["b"]
+        assert regressions[0]["change_percent"] == pytest.approx(50.0)
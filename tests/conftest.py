@@ -54,3 +54,24 @@ def rule_engine():
     """Get rule engine instance"""
     from rule_engine.rule_engine_v2 import DatabaseDrivenRuleEngine
     return DatabaseDrivenRuleEngine()
+
+@pytest.fixture
+def write_rules(tmp_path):
+    """
+    Write approved rule files to tmp_path/approved_rules and return the directory.
+    
+    Rules are numbered from start as rule_NNN.json; a string is the clause text
+    of rule RNNN (titled "Rule N", with any extra fields), a dict is written as is.
+    """
+    import json
+    rules_dir = tmp_path / "approved_rules"
+    
+    def write(rules, start=0, **fields):
+        rules_dir.mkdir(exist_ok=True)
+        for i, rule in enumerate(rules, start):
+            if isinstance(rule, str):
+                rule = {"rule_id": f"R{i:03d}", "title": f"Rule {i}", "clause_text": rule, **fields}
+            (rules_dir / f"rule_{i:03d}.json").write_text(json.dumps(rule), encoding='utf-8')
+        return rules_dir
+    
+    return write
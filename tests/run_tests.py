@@ -81,13 +81,20 @@ def run_quick_tests():
     
     return pytest.main(args)
 
+def run_benchmarks():
+    """Run the rule engine benchmarks (see tests/benchmark/run_benchmarks.py)"""
+    sys.path.insert(0, str(Path(__file__).parent / "benchmark"))
+    from run_benchmarks import main
+    
+    return main([])
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Run UDCPR Master tests")
     parser.add_argument(
         "--mode",
-        choices=["all", "unit", "integration", "quick"],
+        choices=["all", "unit", "integration", "quick", "benchmark"],
         default="all",
         help="Test mode to run"
     )
@@ -102,5 +109,7 @@ if __name__ == "__main__":
         exit_code = run_integration_tests()
     elif args.mode == "quick":
         exit_code = run_quick_tests()
+    elif args.mode == "benchmark":
+        exit_code = run_benchmarks()
     
     sys.exit(exit_code)
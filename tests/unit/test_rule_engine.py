@@ -103,6 +103,9 @@ class TestRuleEngine:
         
         assert result['bonus_fsi'] > 0
         assert len(result['bonus_details']) > 0
+        # Each bonus counts once, however many clauses cite it
+        assert result['bonus_fsi'] == pytest.approx(0.5 + 0.5)
+        assert result['bonus_details'] == ["TOD Zone: +0.5", "Green Building: +0.5"]
     
     def test_calculation_traces(self, rule_engine, sample_project_input):
         """Test calculation traces are generated"""
@@ -117,6 +120,70 @@ class TestRuleEngine:
         assert hasattr(trace, 'rule_ids')
         assert hasattr(trace, 'result')
 
+    def test_trace_levels(self, rule_engine, sample_project_input):
+        """Test trace level controls recorded steps without changing results"""
+        full = rule_engine.evaluate_project(sample_project_input, trace_level="full")
+        summary = rule_engine.evaluate_project(sample_project_input, trace_level="summary")
+        off = rule_engine.evaluate_project(sample_project_input, trace_level="off")
+        
+        full_ids = [t.step_id for t in full.calculation_traces]
+        summary_ids = [t.step_id for t in summary.calculation_traces]
+        
+        assert "fsi_base_database" in full_ids
+        assert "fsi_base_database" not in summary_ids
+        assert "fsi_total" in summary_ids
+        assert off.calculation_traces == []
+        assert off.fsi_result == full.fsi_result
+        assert off.compliant == full.compliant
+    
+    def test_phase_timings(self, rule_engine, sample_residential_project):
+        """Test phase timings separate database queries from calculations"""
+        result = rule_engine.evaluate_project(sample_residential_project, trace_level="off",
+                                              include_timings=True)
+        
+        timings = result.phase_timings_ms
+        for phase in ["fsi", "setbacks", "parking", "height", "tdr", "rules_db", "compliance", "total"]:
+            assert phase in timings
+        # Database queries run inside the module phases
+        assert timings["rules_db"] <= timings["fsi"] + timings["setbacks"] + timings["parking"] + timings["height"]
+        assert rule_engine.metrics.snapshot()["rules_db"]["count"] >= 1
+    
+    def test_pinned_rule_version(self, tmp_path, write_rules, sample_project_input):
+        """Test evaluations run against the archived rule version they ask for"""
+        from rule_engine.rule_versions import VersionedRuleStore, archive_rule_version
+        
+        rules_dir = write_rules(["Commercial FSI shall be 3.5"])
+        archive_rule_version(rules_dir, "udcpr_20200101_000000", tmp_path / "rule_versions")
+        engine = DatabaseDrivenRuleEngine(rule_store=VersionedRuleStore(tmp_path / "rule_versions"))
+        
+        pinned = engine.evaluate_project(sample_project_input, rule_version="udcpr_20200101_000000",
+                                         trace_level="off")
+        current = engine.evaluate_project(sample_project_input, trace_level="off")
+        
+        assert pinned.rule_version == "udcpr_20200101_000000"
+        assert pinned.fsi_result["base_fsi"] == 3.5
+        assert current.fsi_result["base_fsi"] != 3.5
+        with pytest.raises(ValueError):
+            engine.evaluate_project(sample_project_input, rule_version="udcpr_19990101_000000")
+    
+    def test_reload_does_not_serve_old_results(self, tmp_path, write_rules, sample_project_input):
+        """Test cached results are keyed by the rules snapshot they were computed against"""
+        from rule_engine.rule_versions import VersionedRuleStore
+        from rule_engine.rules_database import RulesDatabase
+        
+        rules_dir = write_rules(["Commercial FSI shall be 3.5"])
+        snapshots = [RulesDatabase(str(rules_dir))]
+        engine = DatabaseDrivenRuleEngine(rule_store=VersionedRuleStore(tmp_path / "rule_versions",
+                                                                        current=lambda: snapshots[-1]))
+        
+        assert engine.evaluate_project(sample_project_input, trace_level="off").fsi_result["base_fsi"] == 3.5
+        write_rules(["Commercial FSI shall be 2.25"])
+        snapshots.append(RulesDatabase(str(rules_dir), previous=snapshots[-1]))
+        
+        assert engine.db is snapshots[-1]
+        assert engine.evaluate_project(sample_project_input, trace_level="off").fsi_result["base_fsi"] == 2.25
+        assert engine.cache.stats()["hits"] == 0
+
 class TestProjectInput:
     """Test project input validation"""
     
@@ -157,5 +224,46 @@ class TestProjectInput:
         assert project.slum_rehab == False
         assert project.corner_plot == False
 
+class TestValidator:
+    """Test validation against the indexed rule values"""
+    
+    def test_value_index_matches_scan(self):
+        """Test within() and closest() agree with a scan of the found values"""
+        from rule_engine.validation_layer import ValueIndex
+        
+        found = [{'value': v, 'rule_id': f'r{i}'} for i, v in enumerate([2.0, 1.0, 1.5, 1.0, 2.5, 0.5, 1.5])]
+        index = ValueIndex('value', found, rules_checked=4)
+        for target in [0.0, 0.95, 1.0, 1.25, 1.5, 2.2, 3.0]:
+            assert index.within(target, 0.1) == [f for f in found if abs(f['value'] - target) < 0.1]
+            assert index.closest(target, 3) == sorted(found, key=lambda f: abs(f['value'] - target))[:3]
+    
+    def test_values_indexed_once_per_generation(self):
+        """Test the rules are queried once per use type until the database reloads"""
+        from rule_engine.validation_layer import RuleEngineValidator, ValidationStatus
+        
+        class FakeDatabase:
+            generation = 1
+            queries = 0
+            def query_fsi_rules(self, use_type, plot_area=None, jurisdiction=None):
+                self.queries += 1
+                return [{'rule_id': 'r1', 'clause_text': 'Residential FSI of 1.1'},
+                        {'rule_id': 'r2', 'clause_text': 'Residential zone FSI up to 2.5'}]
+        
+        db = FakeDatabase()
+        validator = RuleEngineValidator(db)
+        project = {'use_type': 'Residential', 'plot_area_sqm': 500, 'jurisdiction': 'maharashtra_udcpr'}
+        
+        result = validator.validate_fsi_calculation(project, {'base_fsi': 1.1})
+        assert result.status == ValidationStatus.PASS
+        assert result.applied_rules == ['r1']
+        result = validator.validate_fsi_calculation(project, {'base_fsi': 2.0, 'base_fsi_rules': []})
+        assert result.status == ValidationStatus.WARNING
+        assert [alt['value'] for alt in result.alternative_values] == [2.5, 1.1]
+        assert db.queries == 1
+        
+        db.generation = 2
+        validator.validate_fsi_calculation(project, {'base_fsi': 1.1})
+        assert db.queries == 2
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--cov=rule_engine", "--cov-report=html"])
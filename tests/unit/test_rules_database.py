@@ -64,6 +64,36 @@ class TestRulesDatabase:
         for i in range(len(ranked) - 1):
             assert ranked[i].priority.value <= ranked[i + 1].priority.value
     
+    def test_rank_rules_top_k(self, rules_database):
+        """Test top-k ranking is the head of the full ranking, for indexed and ad-hoc rules"""
+        sample_rules = rules_database.rules[:400]
+        full = rules_database.rank_rules(sample_rules, "Residential", "mumbai_dcpr", 1000)
+        top = rules_database.rank_rules(sample_rules, "Residential", "mumbai_dcpr", 1000, top_k=10)
+        adhoc = rules_database.rank_rules([dict(r) for r in sample_rules], "Residential",
+                                          "mumbai_dcpr", 1000, top_k=10)
+        
+        assert [r.rule['rule_id'] for r in top] == [r.rule['rule_id'] for r in full[:10]]
+        assert [r.rule['rule_id'] for r in adhoc] == [r.rule['rule_id'] for r in full[:10]]
+        assert [r.relevance_score for r in top] == [r.relevance_score for r in full[:10]]
+        keys = [(r.priority.value, -r.relevance_score) for r in full]
+        assert keys == sorted(keys)
+    
+    def test_lookup_cache(self, rules_database):
+        """Test enhanced lookups are memoized per normalized arguments"""
+        rules_database.lookup_cache.clear()
+        first = rules_database.get_parking_requirement_enhanced("Residential", 1000, "maharashtra_udcpr")
+        second = rules_database.get_parking_requirement_enhanced("Residential", 2500, "maharashtra_udcpr")
+        
+        stats = rules_database.lookup_cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        assert second['ratio'] == first['ratio']
+        assert second['required_ecs'] >= first['required_ecs']
+        
+        # Results are private copies
+        fsi = rules_database.get_base_fsi_enhanced("Residential", 1000)
+        fsi['applied_rules'].append("mutated")
+        assert "mutated" not in rules_database.get_base_fsi_enhanced("Residential", 1000)['applied_rules']
+    
     def test_fsi_extraction(self, rules_database):
         """Test FSI value extraction"""
         # Test various FSI patterns
@@ -193,5 +223,410 @@ class TestRulePriority:
         assert sorted_priorities[0] == RulePriority.EXACT_MATCH
         assert sorted_priorities[-1] == RulePriority.FALLBACK
 
+class TestKeywordIndex:
+    """Test the inverted keyword index keeps substring query semantics"""
+    
+    def test_matches_substring_scan(self):
+        """Test index lookups equal a plain substring scan"""
+        from rule_engine.rule_index import KeywordIndex, rule_search_text
+        
+        rules = [
+            {"title": "FSI for Residential", "clause_text": "The FSI shall be 1.1 for all plots."},
+            {"title": "Side margin", "clause_text": "Building line of 3 m; no parking in margins."},
+            {"title": "Floor Space Index", "clause_text": "Commercial floors: floor space index 2.0"},
+            {"title": None, "clause_text": "TOD zone; custodian of the plot (E.C.S. 1 per 100 sqm)"}
+        ]
+        texts = [rule_search_text(r) for r in rules]
+        index = KeywordIndex(texts)
+        
+        for keyword in ["fsi", "all", "margin", "building line", "floor space index", "floor",
+                        "tod", "e.c.s.", "ecs", "1.1", "commercial", "", "  ", "missing", "s. 1 per"]:
+            expected = {i for i, text in enumerate(texts) if keyword in text}
+            assert index.containing(keyword) == expected, keyword
+        
+        assert index.any_of(["tod", "margin"]) == {1, 3}
+    
+    def test_category_queries_match_full_scan(self):
+        """Test RulesDatabase category queries return the same rules as a scan"""
+        from rule_engine.rules_database import get_rules_database
+        from rule_engine.rule_index import rule_search_text
+        
+        db = get_rules_database()
+        texts = [rule_search_text(r) for r in db.rules]
+        
+        def scan(required, also=None):
+            return [r["rule_id"] for r, text in zip(db.rules, texts)
+                    if any(k in text for k in required) and (also is None or any(k in text for k in also))]
+        
+        ids = lambda rules: [r["rule_id"] for r in rules]
+        assert ids(db.query_fsi_rules("Commercial")) == scan(["fsi", "floor space index"], ["commercial", "all"])
+        assert ids(db.query_parking_rules("Residential")) == scan(["parking", "ecs"], ["residential", "all"])
+        assert ids(db.query_setback_rules("Residential")) == scan(["setback", "margin", "building line"])
+        assert ids(db.query_height_rules("Residential")) == scan(["height", "storey", "floor"])
+        assert ids(db.search_rules("side margin", limit=5)) == scan(["side margin"])[:5]
+
+class TestRuleCategories:
+    """Test load-time category bitmasks"""
+    
+    def test_classify_rule(self):
+        """Test categories come from the whole rule record"""
+        from rule_engine.rule_index import RuleCategory, classify_rule
+        
+        rule = {
+            "title": "Parking for TOD zone",
+            "clause_text": "1 ECS per 100 sqm",
+            "parsed": {"max_height_m": 24}
+        }
+        mask = classify_rule(rule)
+        
+        assert mask & RuleCategory.PARKING
+        assert mask & RuleCategory.BONUS
+        assert mask & RuleCategory.HEIGHT  # From the nested parsed field
+        assert not mask & (RuleCategory.FSI | RuleCategory.SETBACK | RuleCategory.COVERAGE)
+    
+    def test_category_counts_and_filters(self, rules_database):
+        """Test mask counts and filters agree with each other"""
+        from rule_engine.rule_index import RuleCategory
+        
+        stats = rules_database.get_statistics()
+        assert len(rules_database.category_masks) == len(rules_database.rules)
+        
+        fsi_rules = rules_database.rules_in_category(RuleCategory.FSI)
+        assert len(fsi_rules) == stats['fsi_rules']
+        assert all('fsi' in str(r).lower() for r in fsi_rules[:50])
+        assert stats['bonus_rules'] > 0
+
+class TestRulePack:
+    """Test the packed rule corpus"""
+    
+    # Non-ASCII text exercises the pack's encoding
+    TEXTS = ["FSI shall be 1.1 – ≤ 2"] * 5
+    
+    def test_pack_round_trip(self, tmp_path, write_rules):
+        """Test the pack gives the same rules, in order, as the JSON files"""
+        from rule_engine.rule_pack import RulePack, build_rule_pack, load_rules, read_rule_files
+        
+        rules_dir = write_rules(self.TEXTS)
+        pack_path = build_rule_pack(rules_dir)
+        
+        assert pack_path == tmp_path / "approved_rules.pack"
+        expected = [rule for _, rule in read_rule_files(rules_dir)]
+        assert load_rules(rules_dir) == expected
+        with RulePack(pack_path) as pack:
+            assert pack.rule_ids() == [f"R{i:03d}" for i in range(5)]
+            assert pack.record(3) == expected[3]
+    
+    def test_stale_or_corrupt_pack_falls_back(self, write_rules):
+        """Test loaders ignore a pack that is out of date or fails its checksum"""
+        from rule_engine.rule_pack import RulePack, RulePackError, build_rule_pack, load_rules
+        
+        rules_dir = write_rules(self.TEXTS)
+        pack_path = build_rule_pack(rules_dir)
+        
+        # A new approved rule makes the pack stale
+        write_rules([{"rule_id": "R999"}], start=999)
+        assert [r["rule_id"] for r in load_rules(rules_dir)][-1] == "R999"
+        
+        # Flipping a payload byte fails the checksum
+        data = bytearray(pack_path.read_bytes())
+        data[-10] ^= 0xFF
+        pack_path.write_bytes(bytes(data))
+        with pytest.raises(RulePackError):
+            RulePack(pack_path)
+        assert len(load_rules(rules_dir)) == 6
+    
+    def test_metadata_only_rules(self, write_rules):
+        """Test metadata-only rules read non-resident fields from the pack"""
+        from rule_engine.rule_pack import build_rule_pack, load_rules
+        from rule_engine.rules_database import RulesDatabase
+        
+        rules_dir = write_rules(self.TEXTS)
+        build_rule_pack(rules_dir)
+        expected = load_rules(rules_dir)
+        
+        db = RulesDatabase(str(rules_dir), metadata_only=True)
+        # rules_database imports rule_pack as a sibling module, so compare by name
+        assert all(type(rule).__name__ == "LazyRule" for rule in db.rules)
+        assert 'clause_text' not in db.rules[0]._resident
+        assert [dict(rule) for rule in db.rules] == expected
+        assert str(db.rules[2]) == str(expected[2])
+        assert db.rules_by_id["R004"]["clause_text"] == expected[4]["clause_text"]
+        assert [r["rule_id"] for r in db.search_rules("fsi shall")] == [f"R{i:03d}" for i in range(5)]
+
+class TestRuleFacts:
+    """Test load-time numeric fact extraction"""
+    
+    def test_extract_facts(self):
+        """Test facts keep their category and context"""
+        from rule_engine.rule_facts import FactCategory, extract_facts, select_fsi, select_height_limit
+        
+        facts = extract_facts("FSI up to 2.5. Basic FSI 1.1. Maximum height of 24 m; "
+                              "front setback 3 m, provide 1 ECS per 100 sq m")
+        assert select_fsi(facts[FactCategory.FSI]) == (1.1, 'basic')
+        assert [f.context for f in facts[FactCategory.FSI]][:2] == ['basic', 'maximum']
+        assert select_height_limit(facts[FactCategory.HEIGHT]) == (24.0, 'maximum')
+        assert facts[FactCategory.SETBACK][0].context == 'front'
+        assert {f.context for f in facts[FactCategory.PARKING]} == {'per_ecs', 'mention'}
+        assert extract_facts("No numbers here") == {}
+    
+    def test_fact_table_matches_extractors(self, rules_database):
+        """Test the fact table gives what the text extractors find"""
+        from rule_engine.rule_facts import FactCategory, select_fsi, select_height_limit
+        
+        for rule in rules_database.rules[:1000]:
+            text = rule.get('clause_text', '')
+            facts = rules_database.facts
+            assert select_fsi(facts.get(rule['rule_id'], FactCategory.FSI)) == \
+                rules_database.extract_fsi_value(text)
+            assert select_height_limit(facts.get(rule['rule_id'], FactCategory.HEIGHT)) == \
+                rules_database.extract_height_limit(text)
+
+class TestHotReload:
+    """Test incremental rule snapshots and the rules watcher"""
+    
+    TEXTS = ["Basic FSI 1.1 for all"] * 5
+    
+    def test_snapshot_reparses_only_changed_files(self, write_rules):
+        """Test a new snapshot carries unchanged rules over and leaves the old one intact"""
+        from rule_engine.rule_facts import FactCategory
+        from rule_engine.rule_pack import build_rule_pack
+        from rule_engine.rules_database import RulesDatabase
+        
+        rules_dir = write_rules(self.TEXTS)
+        build_rule_pack(rules_dir)
+        old = RulesDatabase(str(rules_dir))
+        assert sorted(old.sources) == [f"rule_{i:03d}.json" for i in range(5)]
+        
+        write_rules([{"rule_id": "R002", "clause_text": "Basic FSI 2.5 amended"}], start=2)
+        write_rules([{"rule_id": "R005"}], start=5)
+        new = RulesDatabase(str(rules_dir), previous=old)
+        
+        assert new.generation == old.generation + 1
+        assert [r["rule_id"] for r in new.rules] == [f"R{i:03d}" for i in range(6)]
+        assert all(new.rules_by_id[f"R{i:03d}"] is old.rules_by_id[f"R{i:03d}"] for i in (0, 1, 3, 4))
+        assert new.facts.values("R002", FactCategory.FSI, 'basic') == [2.5]
+        assert new.facts.values("R003", FactCategory.FSI, 'basic') == [1.1]
+        # Readers of the old snapshot still see the old rules
+        assert old.facts.values("R002", FactCategory.FSI, 'basic') == [1.1]
+        assert len(old.rules) == 5
+    
+    def test_watcher_reloads_once_change_settles(self, write_rules):
+        """Test the watcher reloads on the poll after a change stops changing"""
+        from rule_engine.rules_watcher import RulesWatcher
+        
+        rules_dir = write_rules(self.TEXTS)
+        reloads = []
+        watcher = RulesWatcher(rules_dir, lambda: reloads.append(1))
+        
+        assert not watcher.check()
+        write_rules([{"rule_id": "R005"}], start=5)
+        assert not watcher.check()  # Changed since the last poll: wait for it to settle
+        assert watcher.check()
+        assert not watcher.check()
+        assert len(reloads) == 1
+
+class TestSQLiteRulesDatabase:
+    """Test the SQLite-backed rules database against the in-memory one"""
+    
+    TEXTS = ["Basic FSI 1.1 for all residential buildings",
+             "Commercial FSI shall be 2.0; 1 ECS per 50 sqm parking",
+             "Front setback 3 m; the side margin shall be 1.5 m",
+             "Maximum height of 24 m for TOD zone redevelopment",
+             "Residential parking: 1 ECS per 100 sqm"]
+    
+    def test_queries_match_rules_database(self, tmp_path, write_rules):
+        """Test every public query gives the same answer as RulesDatabase"""
+        from rule_engine.rules_database import RulesDatabase
+        from rule_engine.rules_database_sqlite import FTS5_TRIGRAM_SUPPORT, SQLiteRulesDatabase
+        from rule_engine.rule_index import RuleCategory
+        if not FTS5_TRIGRAM_SUPPORT:
+            pytest.skip("SQLite FTS5 trigram tokenizer not available")
+        
+        rules_dir = write_rules(self.TEXTS, jurisdiction="maharashtra_udcpr")
+        memory_db = RulesDatabase(str(rules_dir))
+        sqlite_db = SQLiteRulesDatabase(str(rules_dir))
+        assert (tmp_path / "approved_rules.sqlite").exists()
+        
+        for use_type in ["Residential", "Commercial"]:
+            assert sqlite_db.query_fsi_rules(use_type) == memory_db.query_fsi_rules(use_type)
+            assert sqlite_db.get_base_fsi(use_type, 1000) == memory_db.get_base_fsi(use_type, 1000)
+            assert sqlite_db.get_parking_requirement(use_type, 1000) == \
+                memory_db.get_parking_requirement(use_type, 1000)
+        assert sqlite_db.query_setback_rules("R1") == memory_db.query_setback_rules("R1")
+        assert sqlite_db.query_height_rules("R1") == memory_db.query_height_rules("R1")
+        assert sqlite_db.get_all_fsi_bonuses({"tod_zone": True, "redevelopment": True}) == \
+            memory_db.get_all_fsi_bonuses({"tod_zone": True, "redevelopment": True})
+        for query in ["side margin", "all", "1.", "ecs per", "missing"]:
+            assert sqlite_db.search_rules(query) == memory_db.search_rules(query), query
+        assert sqlite_db.get_rule_by_id("R003") == memory_db.get_rule_by_id("R003")
+        assert sqlite_db.get_rule_by_id("R999") is None
+        assert sqlite_db.rules_in_category(RuleCategory.PARKING) == memory_db.rules_in_category(RuleCategory.PARKING)
+        assert sqlite_db.get_statistics() == memory_db.get_statistics()
+    
+    def test_stale_database_is_rebuilt(self, write_rules):
+        """Test a new rule file triggers a rebuild on load"""
+        from rule_engine.rules_database_sqlite import FTS5_TRIGRAM_SUPPORT, SQLiteRulesDatabase
+        if not FTS5_TRIGRAM_SUPPORT:
+            pytest.skip("SQLite FTS5 trigram tokenizer not available")
+        
+        rules_dir = write_rules(self.TEXTS, jurisdiction="maharashtra_udcpr")
+        db = SQLiteRulesDatabase(str(rules_dir))
+        write_rules([{"rule_id": "R005", "clause_text": "FSI"}], start=5)
+        reloaded = SQLiteRulesDatabase(str(rules_dir), previous=db)
+        
+        assert reloaded.generation == db.generation + 1
+        assert reloaded.get_statistics()['total_rules'] == 6
+        assert reloaded.get_rule_by_id("R005")["clause_text"] == "FSI"
+
+class TestRuleVersions:
+    """Test archived rule versions served next to the current rules"""
+    
+    def test_versions_share_unchanged_rules(self, tmp_path, write_rules):
+        """Test an archived version keeps its rules and shares unchanged ones"""
+        from rule_engine.rules_database import RulesDatabase
+        from rule_engine.rule_versions import VersionedRuleStore, archive_rule_version
+        
+        rules_dir = write_rules([f"Basic FSI 1.{i}" for i in range(3)])
+        archive_rule_version(rules_dir, "v1", tmp_path / "rule_versions")
+        write_rules([{"rule_id": "R001", "clause_text": "Basic FSI 2.5 amended"}], start=1)
+        
+        current = RulesDatabase(str(rules_dir))
+        store = VersionedRuleStore(tmp_path / "rule_versions", current=lambda: current)
+        archived = store.get("v1")
+        
+        assert store.versions() == ["v1"]
+        assert store.get("latest") is current
+        assert store.get("v1") is archived
+        assert archived.get_rule_by_id("R001")["clause_text"] == "Basic FSI 1.1"
+        assert current.get_rule_by_id("R001")["clause_text"] == "Basic FSI 2.5 amended"
+        assert archived.get_rule_by_id("R000") is current.get_rule_by_id("R000")
+        assert archived.get_rule_by_id("R002") is current.get_rule_by_id("R002")
+        for version in ["v2", "../approved_rules"]:
+            with pytest.raises(ValueError):
+                store.get(version)
+
+class TestRuleRecord:
+    """Test compact Rule records behave like the rule dicts they replace"""
+    
+    def test_rule_matches_dict(self):
+        """Test the mapping view, key order, repr and interned fields"""
+        import copy
+        from rule_engine.rule_record import Rule
+        
+        record = {"rule_id": "R001", "title": "Parking", "jurisdiction": "maharashtra_udcpr",
+                  "clause_text": "1 ECS per 100 sqm", "custom": [1, 2],
+                  "source_pdf": {"filename": "UDCPR.docx", "text_snippet": "1 ECS per 100 sqm"}}
+        rule = Rule(record)
+        other = Rule({**record, "jurisdiction": "".join(["maharashtra", "_udcpr"])})
+        
+        assert rule == record and record == rule
+        assert list(rule) == list(record) and str(rule) == str(record)
+        assert rule["custom"] == [1, 2] and rule.get("chapter", "none") == "none"
+        assert "title" in rule and "chapter" not in rule
+        with pytest.raises(KeyError):
+            rule["chapter"]
+        with pytest.raises(AttributeError):
+            rule.title = "changed"
+        assert rule["jurisdiction"] is other["jurisdiction"]
+        assert rule["source_pdf"]["text_snippet"] is rule["clause_text"]
+        assert copy.deepcopy(rule) == record
+    
+    def test_database_rules_are_compact(self, rules_database):
+        """Test loaded rules are Rule records (compared by name; flat sibling import)"""
+        assert all(type(rule).__name__ == "Rule" for rule in rules_database.rules[:100])
+
+class TestPrefork:
+    """Test the pre-fork loading helpers"""
+    
+    def test_preload_targets(self, monkeypatch):
+        """Test PRELOAD_RULES parsing"""
+        from rule_engine.prefork import preload_targets
+        
+        monkeypatch.delenv("PRELOAD_RULES", raising=False)
+        assert preload_targets() == ()
+        monkeypatch.setenv("PRELOAD_RULES", "rules")
+        assert preload_targets() == ("rules",)
+        assert preload_targets("rules, enhanced") == ("rules", "enhanced")
+        assert preload_targets("") == ()
+        with pytest.raises(ValueError):
+            preload_targets("rules,everything")
+    
+    def test_freeze_and_after_fork(self):
+        """Test loaded objects are frozen out of the GC and the GC comes back on"""
+        import gc
+        from rule_engine.prefork import after_fork, freeze_for_fork, prepare_master, preload_rule_corpus
+        
+        prepare_master()
+        try:
+            loaded = preload_rule_corpus(["rules"])
+            freeze_for_fork()
+            assert gc.get_freeze_count() > 0
+            assert len(loaded["rules"].rules) > 0
+        finally:
+            gc.unfreeze()
+            after_fork()
+        assert gc.isenabled()
+
+class TestBonusTable:
+    """Test the precomputed FSI bonus table"""
+    
+    def test_one_bonus_per_type_with_citations(self):
+        """Test bonuses are deduplicated per type and cite every matching rule"""
+        from rule_engine.bonus_table import BonusTable
+        
+        table = BonusTable([
+            {"rule_id": "R1", "clause_text": "TOD zone: additional FSI of 0.5"},
+            {"rule_id": "R2", "clause_text": "Within TOD influence zone 500 m"},
+            {"rule_id": "R3", "clause_text": "Redevelopment of cessed buildings"},
+            {"rule_id": "R4", "clause_text": "TOD without numbers"}
+        ])
+        
+        bonuses = table.lookup({"tod_zone": True, "redevelopment": True, "green_building": True})
+        assert [(b["type"], b["value"], b["rule_id"]) for b in bonuses] == \
+            [("TOD Zone", 0.5, "R1"), ("Redevelopment", 0.3, "R3")]
+        assert bonuses[0]["rule_ids"] == ("R1", "R2")
+        assert table.lookup({}) == ()
+        
+        # Lookups share read-only records instead of copying them
+        assert table.lookup({"tod_zone": 1})[0] is bonuses[0]
+        with pytest.raises(TypeError):
+            bonuses[0]["value"] = 1.0
+
+class TestKeywordMatcher:
+    """Test the shared multi-keyword matcher"""
+    
+    def test_found_matches_substring_semantics(self):
+        """Test found() reports exactly the keywords `in` would, overlaps included"""
+        from rule_engine.keyword_matcher import KeywordMatcher
+        
+        keywords = ['fsi', 'additional fsi', 'premium fsi', 'all', 'tod', 'building line']
+        matcher = KeywordMatcher(keywords)
+        for text in ["additional fsi shall be granted", "premium fsi", "tod zone",
+                     "the building shall stand behind the line", "", "setback"]:
+            assert matcher.found(text) == {k for k in keywords if k in text}
+            assert matcher.any_in(text) == any(k in text for k in keywords)
+    
+    def test_classifier_labels(self):
+        """Test classify() returns every label with a keyword in the text"""
+        from rule_engine.keyword_matcher import KeywordClassifier
+        
+        classifier = KeywordClassifier({
+            'fsi': ('fsi',),
+            'bonus': ('bonus', 'additional fsi'),
+            'setback': ('setback', 'margin')
+        })
+        assert classifier.classify("additional fsi of 0.5") == {'fsi', 'bonus'}
+        assert classifier.classify("front margin 3 m") == {'setback'}
+        assert classifier.classify("parking") == frozenset()
+    
+    def test_rejects_empty_keywords(self):
+        """Test an empty keyword set or keyword is rejected"""
+        from rule_engine.keyword_matcher import KeywordMatcher
+        
+        with pytest.raises(ValueError):
+            KeywordMatcher([])
+        with pytest.raises(ValueError):
+            KeywordMatcher(['fsi', ''])
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--cov=rule_engine.rules_database_v2", "--cov-report=html"])